@@ -1,3 +1,12 @@
-from analysis import preprocessing, plots
+import importlib
 
-__all__ = ['preprocessing', 'plots']
\ No newline at end of file
+__all__ = ['preprocessing', 'plots']
+
+
+def __getattr__(name):
+    # Sous-modules chargés à la première utilisation (PEP 562)
+    if name in __all__:
+        module = importlib.import_module(f"analysis.{name}")
+        globals()[name] = module
+        return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,132 @@
+"""
+Agrégats annuels mondiaux précalculés (somme, moyenne, effectif, min, max)
+Les séries mondiales des tables par pays (CO2, Liste Rouge, plastique) sont stockées sous
+PROCESSED_DATA_DIR/aggregates et recalculées uniquement pour les années dont les lignes
+ont changé dans la source ; les tables sont parcourues par blocs (analysis/streaming.py)
+"""
+
+import json
+import os
+import threading
+
+from loguru import logger
+import numpy as np
+import pandas as pd
+
+from .config import PROCESSED_DATA_DIR
+from .locks import file_lock
+from .materialize import dataset_version
+from .registry import datasets
+from .streaming import iter_processed, partial_aggregate
+
+AGGREGATES_DIR = PROCESSED_DATA_DIR / "aggregates"
+AGGREGATES_DIR.mkdir(parents=True, exist_ok=True)
+
+# Indicateurs agrégés par jeu de données
+INDICATORS = {
+    "CO2_emission": ["emissions_total"],
+    "red_list_index": ["_15_5_1__er_rsk_lst"],
+    "platic_production": ["plastic_production"],
+}
+
+STATS = ["sum", "mean", "count", "min", "max"]
+
+_lock = threading.Lock()
+
+
+def _paths(name):
+    return AGGREGATES_DIR / f"{name}.parquet", AGGREGATES_DIR / f"{name}.json"
+
+
+def _empty() -> pd.DataFrame:
+    return pd.DataFrame({
+        "Year": pd.Series(dtype="int16"),
+        "indicator": pd.Series(dtype=object),
+        **{stat: pd.Series(dtype="float64") for stat in STATS},
+    })
+
+
+def _year_hashes(chunks) -> pd.Series:
+    """Empreinte des lignes de chaque année (somme des empreintes de lignes, bloc par bloc)."""
+    partials = [
+        pd.util.hash_pandas_object(chunk, index=False).groupby(chunk["Year"].to_numpy()).sum()
+        for chunk in chunks
+    ]
+    if not partials:
+        return pd.Series(dtype="uint64")
+    return pd.concat(partials).groupby(level=0).sum()
+
+
+def _aggregate(chunks, indicators) -> pd.DataFrame:
+    partial = partial_aggregate(chunks, "Year", indicators, STATS)
+    frames = []
+    for indicator in indicators:
+        agg = partial[indicator].copy()
+        agg.insert(0, "indicator", indicator)
+        frames.append(agg)
+    result = pd.concat(frames).rename_axis("Year").reset_index()
+    result["Year"] = result["Year"].astype("int16")
+    return result
+
+
+def build(name: str) -> pd.DataFrame:
+    """Met à jour (incrémentalement) les agrégats annuels de `name` et les renvoie."""
+    indicators = INDICATORS[name]
+    version = dataset_version(name)
+    data_path, meta_path = _paths(name)
+
+    # Verrou entre threads et entre processus (lots multiprocessus, workers du serveur)
+    with _lock, file_lock(AGGREGATES_DIR / f".{name}.lock"):
+        meta = json.loads(meta_path.read_text()) if meta_path.exists() else {}
+        if meta.get("source_version") == version and data_path.exists():
+            return pd.read_parquet(data_path)
+
+        columns = ["Year", *indicators]
+        hashes = _year_hashes(iter_processed(name, columns))
+        old_hashes = {int(k): v for k, v in meta.get("year_hashes", {}).items()}
+
+        changed = [year for year, h in hashes.items() if old_hashes.get(int(year)) != str(h)]
+        if data_path.exists() and meta.get("indicators") == indicators:
+            previous = pd.read_parquet(data_path)
+            kept = previous[previous["Year"].isin(hashes.index) & ~previous["Year"].isin(changed)]
+        else:
+            kept, changed = None, list(hashes.index)
+
+        # Seules les lignes des années modifiées sont relues
+        filters = [("Year", "in", [int(year) for year in changed])] if kept is not None else None
+        fresh = _aggregate(iter_processed(name, columns, filters), indicators) if changed else None
+        frames = [frame for frame in (kept, fresh) if frame is not None]
+        result = pd.concat(frames) if frames else _empty()
+        result = result.sort_values(["indicator", "Year"]).reset_index(drop=True)
+
+        tmp = data_path.with_suffix(f".{os.getpid()}.tmp")
+        result.to_parquet(tmp, index=False)
+        os.replace(tmp, data_path)
+        tmp = meta_path.with_name(f"{meta_path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({
+            "source_version": version,
+            "indicators": indicators,
+            "year_hashes": {str(int(k)): str(v) for k, v in hashes.items()},
+        }, indent=2))
+        os.replace(tmp, meta_path)
+
+    logger.info(f"Agrégats '{name}' mis à jour ({len(changed)} années recalculées)")
+    return result
+
+
+def build_all() -> dict:
+    return {name: build(name) for name in INDICATORS}
+
+
+def yearly_series(name: str, indicator: str, stat: str = "sum") -> pd.DataFrame:
+    """
+    Série mondiale annuelle d'un indicateur
+    Returns: DataFrame [Year, <indicator>] où la valeur est la statistique `stat`
+    """
+    version = dataset_version(name)
+    aggregates = datasets.get(f"aggregates:{name}", version, lambda: build(name))
+    series = aggregates[aggregates["indicator"] == indicator][["Year", stat]]
+    series = series.rename(columns={stat: indicator}).reset_index(drop=True)
+    if stat == "count":
+        series[indicator] = series[indicator].astype(np.int64)
+    return series
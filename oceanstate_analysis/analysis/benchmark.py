@@ -0,0 +1,443 @@
+"""
+Benchmarks du pipeline : chargeurs, agrégats, corrélations, rapports et graphiques
+Chaque échelle est mesurée dans un processus isolé dont le répertoire de données
+(OCEANSTATE_DATA_DIR) est temporaire et alimenté par les fichiers de référence de
+BENCHMARKS_DIR/fixtures ; les tables CO2 et Liste Rouge peuvent être multipliées
+(10x à 1000x lignes) pour observer le passage à l'échelle
+
+Utilisation :
+    python -m analysis.benchmark fixtures
+    python -m analysis.benchmark run --scale 1 --scale 100 --baseline results/ref.json
+    python -m analysis.benchmark imports
+"""
+
+from datetime import datetime
+import inspect
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import List, Optional
+
+from loguru import logger
+import numpy as np
+import pandas as pd
+import typer
+
+from analysis.config import BENCHMARKS_DIR, ROOT_DIR
+
+app = typer.Typer()
+
+FIXTURES_DIR = BENCHMARKS_DIR / "fixtures"
+RESULTS_DIR = BENCHMARKS_DIR / "results"
+MANIFEST = "manifest.json"
+
+# Tables agrandies synthétiquement (pays fictifs ajoutés) lors des runs à l'échelle > 1
+SCALABLE = ["CO2_emission", "red_list_index"]
+
+# Graphique construit par chaque rapport (la donnée du rapport sert d'entrée)
+REPORT_PLOTS = {
+    "report_acidification": "plot_ph_evolution",
+    "report_heat": "plot_heat",
+    "report_glaciermelting_sealevel_correlation": "plot_relation_glaciermelting_sealevel",
+    "report_glaciermelting": "plot_glaciermelting",
+    "report_sealevel": "plot_sealevel",
+    "report_redlist": "plot_redlist",
+    "report_acidification_redlist_correlation": "plot_relation_acidification_redlist",
+    "report_global_warn": "plot_globalwarn",
+    "report_acidification_co2_correlation": "plot_relation_acidification_co2",
+    "report_plastic_evolution": "plot_micro_macro_plastic",
+    "report_plastic_waste_countries": "plot_evolution_emission_plastic",
+    "report_plastic_production_global": "plot_production_plastic",
+    "report_plastic_ocean_distribution": "plot_repartition_plastic",
+    "report_plastic_co2_correlation": "plot_relation_plastic_co2",
+    "report_glacier_heat_correlation": "plot_relation_glaciermelting_heat",
+    "report_variation_heat": "plot_heat_variation",
+}
+
+# Modules mesurés par défaut par `imports` (points d'entrée de l'application et des CLI)
+IMPORT_TARGETS = [
+    "reports", "reports.reports", "reports.ui", "analysis.plots",
+    "analysis.correlations", "analysis.modeling.batch", "analysis.benchmark",
+]
+# Bibliothèques lourdes dont le chargement est signalé
+HEAVY_MODULES = ["pandas", "matplotlib", "seaborn", "scipy", "plotly", "statsmodels", "streamlit"]
+
+
+# ---- Fichiers de référence ----
+
+def _project_dir() -> Path:
+    return ROOT_DIR.parent
+
+
+def scale_csv(source: Path, target: Path, factor: int, seed: int = 0):
+    """
+    Écrit dans `target` la table `source` répétée `factor` fois : chaque copie porte des
+    pays fictifs ("<Entity> #i") et des valeurs légèrement bruitées
+    """
+    df = pd.read_csv(source)
+    numeric = [c for c in df.select_dtypes("number").columns if c not in ("Year", "year")]
+    rng = np.random.default_rng(seed)
+
+    df.to_csv(target, index=False)
+    for i in range(1, factor):
+        copy = df.copy()
+        copy["Entity"] = copy["Entity"].astype(str) + f" #{i}"
+        if "Code" in copy.columns:
+            copy["Code"] = copy["Code"].where(copy["Code"].isna(), copy["Code"].astype(str) + f"_{i}")
+        for col in numeric:
+            copy[col] = copy[col] * rng.normal(1.0, 0.01, len(copy))
+        copy.to_csv(target, mode="a", header=False, index=False)
+
+
+@app.command()
+def fixtures(output_dir: Path = FIXTURES_DIR):
+    """Copie les sources brutes actuelles comme fichiers de référence des benchmarks."""
+    from analysis.config import RAW_DATA_FILES, URLS
+    from analysis.materialize import dataset_names, raw_path
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest = {}
+    for name in [*dataset_names(), "depth_file"]:
+        try:
+            source = raw_path(name) if name in URLS else Path(RAW_DATA_FILES[name])
+        except Exception as e:
+            logger.warning(f"Source '{name}' indisponible : {e}")
+            continue
+        if not source.exists():
+            logger.warning(f"Source '{name}' absente : {source}")
+            continue
+        suffix = ".csv" if name in URLS else source.suffix
+        shutil.copyfile(source, output_dir / f"{name}{suffix}")
+        manifest[name] = f"{name}{suffix}"
+        logger.info(f"Fichier de référence '{name}' ({source.stat().st_size / 1e6:.1f} Mo)")
+
+    (output_dir / MANIFEST).write_text(json.dumps(manifest, indent=2))
+    logger.success(f"{len(manifest)} fichiers de référence écrits dans {output_dir}")
+
+
+def _seed_sources(fixtures_dir: Path, scale: int):
+    """Installe les fichiers de référence comme sources brutes du répertoire de données courant."""
+    from analysis.cache import store
+    from analysis.config import RAW_DATA_FILES, URLS
+
+    manifest = json.loads((fixtures_dir / MANIFEST).read_text())
+    for name, filename in manifest.items():
+        source = fixtures_dir / filename
+        if name in SCALABLE and scale > 1:
+            scaled = Path(tempfile.mkdtemp()) / filename
+            scale_csv(source, scaled, scale)
+            source = scaled
+        if name in URLS:
+            store(URLS[name], source)
+        elif name in RAW_DATA_FILES:
+            target = Path(RAW_DATA_FILES[name])
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(source, target)
+    return manifest
+
+
+# ---- Mesures ----
+
+def measure(func, repeat: int = 5, setup=None) -> dict:
+    """
+    Temps d'exécution (min / médiane / moyenne sur `repeat` appels) et pic d'allocation
+    mesuré par tracemalloc sur un appel supplémentaire
+    """
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    if setup:
+        setup()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "repeat": repeat,
+        "min": min(times),
+        "median": statistics.median(times),
+        "mean": statistics.fmean(times),
+        "peak_mb": peak / 1024 ** 2,
+    }
+
+
+def _benchmarks(manifest: dict, groups=None):
+    """Liste des (groupe, nom, fonction, préparation) à mesurer."""
+    import matplotlib
+    matplotlib.use("Agg")
+
+    from analysis import aggregates, correlations, plots, preprocessing
+    from analysis.config import PROCESSED_DATA_DIR
+    from analysis.registry import datasets
+    from analysis.render_cache import figure_cache
+    import reports.reports as reports
+
+    def cold():
+        # Ni registre en mémoire ni Parquet : la source brute est relue et matérialisée
+        datasets.invalidate()
+        for path in PROCESSED_DATA_DIR.glob("*.parquet"):
+            path.unlink()
+
+    def disk():
+        datasets.invalidate()
+
+    loaders = inspect.getmembers(preprocessing, inspect.isfunction)
+    for name, func in loaders:
+        if not name.startswith("load_and_clean_"):
+            continue
+        if name == "load_and_clean_depth_data":
+            if "depth_file" in manifest:
+                yield "loader", name, func, None
+            continue
+        yield "loader", f"{name}[cold]", func, cold
+        yield "loader", f"{name}[parquet]", func, disk
+        yield "loader", f"{name}[memory]", func, None
+
+    for name in aggregates.INDICATORS:
+        data_path, meta_path = aggregates._paths(name)
+
+        def rebuild(data_path=data_path, meta_path=meta_path):
+            data_path.unlink(missing_ok=True)
+            meta_path.unlink(missing_ok=True)
+
+        yield "aggregate", f"build[{name}]", lambda name=name: aggregates.build(name), rebuild
+
+    yield "correlation", "build_matrix", correlations.build_matrix, None
+    if not groups or "correlation" in groups:
+        matrix = correlations.build_matrix()
+        yield "correlation", "compute", lambda: correlations.compute(matrix), None
+
+    for report_name, plot_name in REPORT_PLOTS.items():
+        report = getattr(reports, report_name)
+        yield "report", report_name, report, figure_cache.clear
+        if groups and "plot" not in groups:
+            continue
+
+        # Graphique seul, sans passer par le cache des figures
+        result = report()
+        builder = getattr(plots, plot_name).__wrapped__
+        args = (result[0],)
+        if len(result) > 2 and "correlation" in inspect.signature(builder).parameters:
+            # Les rapports renvoient une RobustCorrelation ; les graphiques attendent (r, p)
+            correlation = result[2]
+            args += (getattr(correlation, "point", correlation),)
+
+        def render(builder=builder, args=args):
+            fig = builder(*args)
+            if type(fig).__module__.startswith("matplotlib"):
+                import matplotlib.pyplot as plt
+                plt.close(fig)
+
+        yield "plot", plot_name, render, None
+
+
+@app.command("measure", hidden=True)
+def measure_scale(
+    fixtures_dir: Path,
+    output: Path,
+    scale: int = 1,
+    repeat: int = 5,
+    only: Optional[List[str]] = typer.Option(None),
+):
+    """Mesure toutes les cibles à une échelle donnée (processus enfant de `run`)."""
+    manifest = _seed_sources(fixtures_dir, scale)
+    results = []
+    for group, name, func, setup in _benchmarks(manifest, only):
+        if only and group not in only:
+            continue
+        try:
+            stats = measure(func, repeat, setup)
+        except Exception as e:
+            logger.error(f"{group}:{name} : échec ({e})")
+            stats = {"error": str(e)}
+        results.append({"group": group, "name": name, "scale": scale, **stats})
+        if "median" in stats:
+            logger.info(f"[{scale}x] {group}:{name} : {stats['median'] * 1000:.1f} ms, "
+                        f"pic {stats['peak_mb']:.1f} Mo")
+    output.write_text(json.dumps(results, indent=2))
+
+
+# ---- Exécution et comparaison ----
+
+def _environment() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=_project_dir(),
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "commit": commit,
+    }
+
+
+def result_key(result: dict) -> str:
+    return f"{result['group']}:{result['name']}@{result['scale']}x"
+
+
+def compare(results: list, baseline: list, max_time_regression: float,
+            max_memory_regression: float, min_seconds: float = 0.005) -> list:
+    """
+    Régressions par rapport à `baseline` : médiane ou pic mémoire dépassant le seuil
+    relatif (les écarts de moins de `min_seconds` sont ignorés, trop bruités)
+    """
+    reference = {result_key(r): r for r in baseline if "median" in r}
+    regressions = []
+    for result in results:
+        before = reference.get(result_key(result))
+        if before is None or "median" not in result:
+            continue
+        slower = result["median"] / before["median"] - 1 if before["median"] else 0.0
+        if slower > max_time_regression and result["median"] - before["median"] > min_seconds:
+            regressions.append(f"{result_key(result)} : temps +{slower:.0%} "
+                               f"({before['median'] * 1000:.1f} -> {result['median'] * 1000:.1f} ms)")
+        heavier = result["peak_mb"] / before["peak_mb"] - 1 if before["peak_mb"] else 0.0
+        if heavier > max_memory_regression and result["peak_mb"] - before["peak_mb"] > 1:
+            regressions.append(f"{result_key(result)} : mémoire +{heavier:.0%} "
+                               f"({before['peak_mb']:.1f} -> {result['peak_mb']:.1f} Mo)")
+    return regressions
+
+
+@app.command()
+def run(
+    scale: List[int] = typer.Option([1, 10], help="Facteurs d'agrandissement des tables CO2 / Liste Rouge"),
+    repeat: int = 5,
+    only: Optional[List[str]] = typer.Option(None, help="Groupes : loader, aggregate, correlation, report, plot"),
+    fixtures_dir: Path = FIXTURES_DIR,
+    output: Path = None,
+    baseline: Path = typer.Option(None, help="Résultats de référence (JSON) pour détecter les régressions"),
+    max_time_regression: float = 0.25,
+    max_memory_regression: float = 0.25,
+):
+    """Lance les benchmarks à chaque échelle et écrit les résultats en JSON."""
+    if not (fixtures_dir / MANIFEST).exists():
+        logger.info("Pas de fichiers de référence, création à partir des sources actuelles...")
+        fixtures(fixtures_dir)
+
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    output = output or RESULTS_DIR / f"{datetime.now():%Y-%m-%d_%H%M%S}.json"
+    results = []
+    for factor in scale:
+        with tempfile.TemporaryDirectory(prefix="oceanstate-bench-") as data_dir:
+            partial = Path(data_dir) / "results.json"
+            command = [
+                sys.executable, "-m", "analysis.benchmark", "measure",
+                str(fixtures_dir.resolve()), str(partial),
+                "--scale", str(factor), "--repeat", str(repeat),
+                *[arg for group in only or [] for arg in ("--only", group)],
+            ]
+            env = {**os.environ, "OCEANSTATE_DATA_DIR": data_dir}
+            logger.info(f"Benchmarks à l'échelle {factor}x...")
+            subprocess.run(command, cwd=_project_dir(), env=env, check=True)
+            results += json.loads(partial.read_text())
+
+    output.write_text(json.dumps({
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "environment": _environment(),
+        "scales": scale,
+        "results": results,
+    }, indent=2))
+    logger.success(f"Résultats écrits dans {output}")
+
+    failures = [result_key(r) for r in results if "error" in r]
+    if failures:
+        logger.error(f"Benchmarks en échec : {', '.join(failures)}")
+        raise typer.Exit(code=1)
+
+    if baseline:
+        regressions = compare(results, json.loads(baseline.read_text())["results"],
+                              max_time_regression, max_memory_regression)
+        for regression in regressions:
+            logger.error(f"Régression {regression}")
+        if regressions:
+            raise typer.Exit(code=1)
+        logger.success(f"Aucune régression par rapport à {baseline}")
+
+
+# ---- Temps d'import ----
+
+def import_profile(module: str) -> dict:
+    """Temps d'import à froid de `module` (processus neuf, python -X importtime)."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=_project_dir(), capture_output=True, text=True,
+    )
+    if completed.returncode:
+        return {"module": module, "error": completed.stderr.strip().splitlines()[-1]}
+
+    timings = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            depth = (len(name) - len(name.lstrip())) // 2
+            timings.append((name.strip(), depth, int(cumulative)))
+    loaded = {name.split(".")[0] for name, _, _ in timings}
+    # Imports de premier niveau (déclenchés directement par la cible ou l'interpréteur)
+    top = sorted(((name, us) for name, depth, us in timings if depth == 0 and name != module),
+                 key=lambda item: item[1], reverse=True)
+    total = next((us for name, _, us in reversed(timings) if name == module), 0)
+    return {
+        "module": module,
+        "seconds": total / 1e6,
+        "modules": len(timings),
+        "heavy": [name for name in HEAVY_MODULES if name in loaded],
+        "slowest": {name: us / 1e6 for name, us in top[:5]},
+    }
+
+
+@app.command()
+def imports(
+    module: Optional[List[str]] = typer.Option(None, help="Modules à mesurer (points d'entrée par défaut)"),
+    output: Path = None,
+    max_seconds: float = typer.Option(None, help="Échec si un import dépasse ce temps"),
+):
+    """Rapport des temps d'import à froid et des bibliothèques lourdes chargées."""
+    results = [import_profile(name) for name in module or IMPORT_TARGETS]
+    for result in results:
+        if "error" in result:
+            logger.error(f"{result['module']} : {result['error']}")
+            continue
+        logger.info(f"{result['module']} : {result['seconds'] * 1000:.1f} ms, {result['modules']} modules, "
+                    f"lourds : {', '.join(result['heavy']) or 'aucun'}")
+
+    if output:
+        output.write_text(json.dumps({
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "environment": _environment(),
+            "results": results,
+        }, indent=2))
+        logger.success(f"Résultats écrits dans {output}")
+
+    slow = [r["module"] for r in results if max_seconds is not None and r.get("seconds", 0) > max_seconds]
+    if slow or any("error" in r for r in results):
+        if slow:
+            logger.error(f"Imports plus lents que {max_seconds}s : {', '.join(slow)}")
+        raise typer.Exit(code=1)
+
+
+if __name__ == "__main__":
+    app()
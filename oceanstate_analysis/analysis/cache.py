@@ -0,0 +1,258 @@
+"""
+Cache local des jeux de données distants (Our World In Data)
+Les réponses HTTP sont stockées sous RAW_DATA_DIR/cache :
+- index/<clé>.json : métadonnées d'une requête (URL + en-têtes, ETag, Last-Modified...)
+- blobs/<sha256>   : contenu téléchargé, adressé par son empreinte
+L'index et les blobs ne sont modifiés que sous un verrou partagé par tous les processus
+(workers du serveur, lots), et une entrée utilisée récemment n'est jamais évincée
+"""
+
+from contextlib import contextmanager
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+
+from loguru import logger
+import requests
+
+from .config import (
+    CACHE_DIR,
+    CACHE_MAX_BYTES,
+    CACHE_TTL,
+    HTTP_TIMEOUT,
+    PREFETCH_WORKERS,
+    REQUEST_OPTIONS,
+)
+from .locks import file_lock
+
+INDEX_DIR = CACHE_DIR / "index"
+BLOBS_DIR = CACHE_DIR / "blobs"
+
+# Session partagée : les connexions vers ourworldindata.org sont réutilisées entre les threads
+_session = requests.Session()
+_adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=PREFETCH_WORKERS)
+_session.mount("https://", _adapter)
+_session.mount("http://", _adapter)
+_lock = threading.RLock()
+
+# Une entrée utilisée il y a moins de EVICT_GRACE secondes n'est pas évincée : un autre
+# processus peut être en train de lire le blob que fetch() vient de lui renvoyer
+EVICT_GRACE = 300
+
+
+@contextmanager
+def _cache_lock():
+    # Un seul thread, tous processus confondus, lit-modifie-écrit l'index et les blobs
+    with _lock, file_lock(CACHE_DIR / ".lock"):
+        yield
+
+
+def cache_key(url: str, options: dict = REQUEST_OPTIONS) -> str:
+    """Clé de cache : empreinte de l'URL et des options de requête."""
+    payload = json.dumps({"url": url, "options": options or {}}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _entry_path(key: str) -> Path:
+    return INDEX_DIR / f"{key}.json"
+
+
+def _read_entry(key: str):
+    path = _entry_path(key)
+    if not path.exists():
+        return None
+    try:
+        entry = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not (BLOBS_DIR / entry["digest"]).exists():
+        return None
+    return entry
+
+
+def _write_atomic(path: Path, data: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def _write_entry(key: str, entry: dict):
+    _write_atomic(_entry_path(key), json.dumps(entry, indent=2).encode("utf-8"))
+
+
+def _touch(key: str):
+    """Met à jour la date d'accès d'une entrée (utilisée pour l'éviction LRU)."""
+    try:
+        os.utime(_entry_path(key))
+    except OSError:
+        pass
+
+
+def cached_path(url: str, options: dict = REQUEST_OPTIONS):
+    """Chemin local d'une réponse déjà en cache, sans accès réseau (None si absente)."""
+    key = cache_key(url, options)
+    with _cache_lock():
+        entry = _read_entry(key)
+        if entry is None:
+            return None
+        _touch(key)
+    return BLOBS_DIR / entry["digest"]
+
+
+def fetch(url: str, options: dict = REQUEST_OPTIONS, ttl: float = CACHE_TTL,
+          session: requests.Session = None) -> Path:
+    """
+    Renvoie le chemin local du contenu de `url`, en le téléchargeant si nécessaire.
+    - entrée plus récente que `ttl` : servie directement depuis le disque
+    - entrée expirée : revalidée avec If-None-Match / If-Modified-Since
+    - réseau indisponible : la dernière copie connue est servie (mode hors-ligne)
+    """
+    key = cache_key(url, options)
+    now = time.time()
+    with _cache_lock():
+        entry = _read_entry(key)
+        if entry is not None and now - entry["fetched_at"] < ttl:
+            _touch(key)
+            return BLOBS_DIR / entry["digest"]
+
+    headers = dict(options or {})
+    if entry is not None:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    try:
+        response = (session or _session).get(url, headers=headers, timeout=HTTP_TIMEOUT)
+        if response.status_code != 304:
+            response.raise_for_status()
+    except requests.RequestException as e:
+        with _cache_lock():
+            entry = _read_entry(key)
+            if entry is not None:
+                _touch(key)
+        if entry is None:
+            raise
+        logger.warning(f"Téléchargement impossible ({e}), copie en cache utilisée pour {url}")
+        return BLOBS_DIR / entry["digest"]
+
+    if response.status_code == 304:
+        with _cache_lock():
+            # L'entrée a pu être évincée par un autre processus pendant la requête
+            entry = _read_entry(key)
+            if entry is not None:
+                entry["fetched_at"] = now
+                _write_entry(key, entry)
+                return BLOBS_DIR / entry["digest"]
+        # Plus rien à revalider : téléchargement complet
+        return fetch(url, options, ttl, session)
+
+    content = response.content
+    digest = hashlib.sha256(content).hexdigest()
+    blob = BLOBS_DIR / digest
+    with _cache_lock():
+        previous = _read_entry(key)
+        if not blob.exists():
+            _write_atomic(blob, content)
+
+        _write_entry(key, {
+            "url": url,
+            "options": options or {},
+            "digest": digest,
+            "size": len(content),
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "fetched_at": now,
+        })
+        if previous is not None and previous["digest"] != digest:
+            _remove_orphan_blob(previous["digest"])
+        _evict(CACHE_MAX_BYTES, keep={key})
+
+    return blob
+
+
+def store(url: str, source: Path, options: dict = REQUEST_OPTIONS) -> Path:
+    """Enregistre un fichier local comme réponse fraîche de `url` (amorçage hors-ligne)."""
+    digest = hashlib.sha256()
+    with open(source, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    digest = digest.hexdigest()
+
+    with _cache_lock():
+        blob = BLOBS_DIR / digest
+        if not blob.exists():
+            BLOBS_DIR.mkdir(parents=True, exist_ok=True)
+            tmp = blob.with_name(f".{blob.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            shutil.copyfile(source, tmp)
+            os.replace(tmp, blob)
+        _write_entry(cache_key(url, options), {
+            "url": url,
+            "options": options or {},
+            "digest": digest,
+            "size": blob.stat().st_size,
+            "etag": None,
+            "last_modified": None,
+            "fetched_at": time.time(),
+        })
+    return blob
+
+
+def _entries():
+    """Liste des entrées (clé, métadonnées, date d'accès)."""
+    entries = []
+    for path in INDEX_DIR.glob("*.json"):
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+            entries.append((path.stem, entry, path.stat().st_mtime))
+        except (OSError, ValueError):
+            continue
+    return entries
+
+
+def _remove_orphan_blob(digest: str):
+    if not any(entry["digest"] == digest for _, entry, _ in _entries()):
+        (BLOBS_DIR / digest).unlink(missing_ok=True)
+
+
+def evict(max_bytes: int = CACHE_MAX_BYTES, keep=()):
+    """
+    Supprime les entrées les moins récemment utilisées tant que le cache dépasse `max_bytes`
+    (les entrées `keep`, ex. celle qui vient d'être écrite, celles utilisées depuis moins de
+    EVICT_GRACE secondes et leurs blobs sont conservés)
+    """
+    with _cache_lock():
+        return _evict(max_bytes, keep)
+
+
+def _evict(max_bytes: int, keep=()):
+    entries = sorted(_entries(), key=lambda item: item[2])
+    sizes = {entry["digest"]: entry["size"] for _, entry, _ in entries}
+    total = sum(sizes.values())
+    recent = time.time() - EVICT_GRACE
+    keep = set(keep) | {key for key, _, used in entries if used >= recent}
+    kept = {entry["digest"] for key, entry, _ in entries if key in keep}
+    entries = [item for item in entries if item[0] not in keep]
+
+    while entries and total > max_bytes:
+        key, entry, _ = entries.pop(0)
+        _entry_path(key).unlink(missing_ok=True)
+        # Un blob peut être partagé par plusieurs entrées (même contenu)
+        shared = any(other["digest"] == entry["digest"] for _, other, _ in entries)
+        if entry["digest"] not in kept and not shared:
+            (BLOBS_DIR / entry["digest"]).unlink(missing_ok=True)
+            total -= sizes[entry["digest"]]
+        logger.debug(f"Entrée de cache évincée : {entry['url']}")
+    return total
+
+
+def clear():
+    """Vide entièrement le cache."""
+    with _cache_lock():
+        for path in list(INDEX_DIR.glob("*.json")) + list(BLOBS_DIR.glob("*")):
+            path.unlink(missing_ok=True)
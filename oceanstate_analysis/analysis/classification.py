@@ -0,0 +1,78 @@
+"""
+Classification des indicateurs en niveaux d'alerte à partir de tables de seuils
+Les colonnes sont découpées en une seule opération vectorisée (np.digitize), dans leur
+propre type flottant, et renvoyées en catégories ordonnées, du niveau correspondant aux
+plus faibles valeurs au plus élevé
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class Thresholds:
+    """
+    Table de seuils
+    - edges : seuils croissants séparant les niveaux
+    - labels : un libellé de plus que de seuils, des valeurs basses aux valeurs hautes
+    - right : True si un seuil appartient au niveau inférieur (x > seuil pour monter d'un niveau),
+      False s'il appartient au niveau supérieur (x < seuil pour rester en dessous)
+    """
+    edges: tuple
+    labels: tuple
+    right: bool = False
+
+
+THRESHOLDS = {
+    # Anomalie de température (°C)
+    "temperature_alert": Thresholds(
+        edges=(0.0, 0.5, 1.0, 1.5),
+        labels=("🟢 Normal", "🟡 Surveillance", "🟠 Préoccupant", "🔴 Alarmant", "🚨 Critique"),
+        right=True,
+    ),
+    # Index de la Liste Rouge (risque d'extinction, 1 = aucune espèce menacée)
+    "red_list_risk": Thresholds(
+        edges=(0.6, 0.7, 0.8),
+        labels=("🔴 Critique", "🟠 Élevé", "🟡 Modéré", "🟢 Faible"),
+    ),
+    # pH océanique
+    "acidification": Thresholds(
+        edges=(7.9, 8.0, 8.1),
+        labels=("🔴 Critique", "🟠 Préoccupant", "🟡 Surveillance", "🟢 Normal"),
+    ),
+    # Index de la Liste Rouge lu comme niveau de menace sur la biodiversité
+    "biodiversity": Thresholds(
+        edges=(0.4, 0.6, 0.8),
+        labels=("🟢 Stable", "🟡 Vulnérable", "🟠 Menacé", "🔴 Très menacé"),
+        right=True,
+    ),
+}
+
+
+def classify(values, scheme) -> pd.Series:
+    """
+    Niveau de chaque valeur selon la table `scheme` (nom dans THRESHOLDS ou Thresholds)
+    Returns: Series catégorielle ordonnée (valeurs manquantes laissées vides)
+    """
+    thresholds = THRESHOLDS[scheme] if isinstance(scheme, str) else scheme
+    series = values if isinstance(values, pd.Series) else pd.Series(values)
+    # Seuils comparés dans le type de la colonne : une mesure stockée en float32 (0.7 lu
+    # 0.69999999) tombe du même côté du seuil 0.7 qu'avant la conversion
+    dtype = "float32" if str(series.dtype).lower() == "float32" else "float64"
+    numbers = series.to_numpy(dtype=dtype, na_value=np.nan)
+    edges = np.asarray(thresholds.edges, dtype=dtype)
+
+    codes = np.digitize(numbers, edges, right=thresholds.right)
+    codes[np.isnan(numbers)] = -1
+    categories = pd.Categorical.from_codes(codes, categories=list(thresholds.labels), ordered=True)
+    return pd.Series(categories, index=series.index, name=series.name)
+
+
+def classify_columns(df: pd.DataFrame, schemes: dict) -> pd.DataFrame:
+    """Ajoute une colonne de niveaux par entrée {colonne produite: (colonne source, table)}."""
+    return df.assign(**{
+        target: classify(df[source], scheme).to_numpy()
+        for target, (source, scheme) in schemes.items()
+    })
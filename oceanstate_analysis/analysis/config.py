@@ -1,15 +1,25 @@
+import os
 from pathlib import Path
 from dotenv import load_dotenv
 
 load_dotenv()
 
 ROOT_DIR = Path(__file__).resolve().parent
-DATA_DIR = ROOT_DIR / ".." / "data"
+# Répertoire des données (surchargeable, par exemple pour les benchmarks)
+DATA_DIR = Path(os.getenv("OCEANSTATE_DATA_DIR", ROOT_DIR / ".." / "data"))
 RAW_DATA_DIR = DATA_DIR / "raw"
 PROCESSED_DATA_DIR = DATA_DIR / "processed"
+INTERIM_DATA_DIR = DATA_DIR / "interim"
+CACHE_DIR = RAW_DATA_DIR / "cache"
+FIGURES_CACHE_DIR = INTERIM_DATA_DIR / "figures"
+REPORTS_OUTPUT_DIR = DATA_DIR / "reports"
+BENCHMARKS_DIR = DATA_DIR / "benchmarks"
+SHARED_STORE_DIR = INTERIM_DATA_DIR / "arrow"
+RESAMPLING_CACHE_DIR = INTERIM_DATA_DIR / "resampling"
+MODELS_DIR = Path(os.getenv("OCEANSTATE_MODELS_DIR", ROOT_DIR / ".." / "models"))
 
 # Création des répertoires s'ils n'existent pas
-for dir_path in [RAW_DATA_DIR, PROCESSED_DATA_DIR]:
+for dir_path in [RAW_DATA_DIR, PROCESSED_DATA_DIR, CACHE_DIR, FIGURES_CACHE_DIR]:
     dir_path.mkdir(parents=True, exist_ok=True)
 
 # URLs des données
@@ -30,6 +40,76 @@ REQUEST_OPTIONS = {
     'User-Agent': 'Our World In Data data fetch/1.0'
 }
 
+# Cache local des téléchargements (durée de validité en secondes, taille max en octets)
+CACHE_TTL = int(os.getenv("OCEANSTATE_CACHE_TTL", 24 * 3600))
+CACHE_MAX_BYTES = int(os.getenv("OCEANSTATE_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+HTTP_TIMEOUT = float(os.getenv("OCEANSTATE_HTTP_TIMEOUT", 30))
+
+# Nombre de téléchargements simultanés au préchargement (et taille du pool de connexions)
+PREFETCH_WORKERS = int(os.getenv("OCEANSTATE_PREFETCH_WORKERS", 8))
+
+# Mémoire maximale occupée par les jeux de données partagés en mémoire (octets)
+REGISTRY_MAX_BYTES = int(os.getenv("OCEANSTATE_REGISTRY_MAX_BYTES", 1024 * 1024 * 1024))
+
+# Cache des figures rendues : taille max en mémoire et sur disque (octets)
+FIGURES_CACHE_MEMORY_BYTES = int(os.getenv("OCEANSTATE_FIGURES_MEMORY_BYTES", 64 * 1024 * 1024))
+FIGURES_CACHE_DISK_BYTES = int(os.getenv("OCEANSTATE_FIGURES_DISK_BYTES", 256 * 1024 * 1024))
+
+# Grandes tables par pays ingérées par blocs (nombre de lignes par bloc)
+STREAMING_DATASETS = ["plastic_waste", "CO2_emission", "red_list_index"]
+STREAMING_CHUNK_ROWS = int(os.getenv("OCEANSTATE_CHUNK_ROWS", 100_000))
+
+# Séries qui ne font que s'allonger : quand la source n'a reçu que des lignes en fin de
+# fichier, seules ces lignes sont lues et écrites dans un fichier Parquet supplémentaire
+INCREMENTAL_DATASETS = [
+    "seawater_ph",
+    "heat",
+    "CO2_emission",
+    "red_list_index",
+    "global_warning",
+    "platic_production",
+]
+# Au-delà de INCREMENTAL_MAX_PARTS fichiers ajoutés, la copie est recompactée en un seul fichier
+INCREMENTAL_MAX_PARTS = int(os.getenv("OCEANSTATE_INCREMENTAL_MAX_PARTS", 16))
+
+# Jeux de données partagés entre processus (workers Streamlit) par fichiers Arrow mappés
+# en mémoire ; activé par le lanceur multi-workers (analysis/serve.py)
+SHARED_STORE = os.getenv("OCEANSTATE_SHARED_STORE", "0") == "1"
+
+# Tables stockées partitionnées par entité (colonne de partition) : une série se lit
+# sans charger les autres entités
+PARTITIONED_DATASETS = {
+    "global_warning": "Entity",
+}
+
+# Nombre maximal de points par trace envoyés au navigateur (graphiques Plotly)
+PLOT_MAX_POINTS = int(os.getenv("OCEANSTATE_PLOT_MAX_POINTS", 1500))
+
+# Intervalles de confiance et tests des corrélations par rééchantillonnage par blocs :
+# nombre de rééchantillonnages, processus de calcul, et taille (rééchantillonnages x
+# années) en dessous de laquelle le calcul reste dans le processus courant
+RESAMPLES = int(os.getenv("OCEANSTATE_RESAMPLES", 10000))
+RESAMPLING_WORKERS = int(os.getenv("OCEANSTATE_RESAMPLING_WORKERS", os.cpu_count() or 1))
+RESAMPLING_POOL_MIN_SIZE = int(os.getenv("OCEANSTATE_RESAMPLING_POOL_MIN_SIZE", 20_000_000))
+
+# Tendances des séries annuelles (python -m analysis.trends) : part des années de chaque
+# lissage LOWESS et nombre minimal d'années de part et d'autre d'une rupture de pente
+TRENDS_DIR = INTERIM_DATA_DIR / "trends"
+TREND_LOWESS_FRAC = float(os.getenv("OCEANSTATE_TREND_LOWESS_FRAC", 0.3))
+TREND_MIN_SEGMENT = int(os.getenv("OCEANSTATE_TREND_MIN_SEGMENT", 10))
+
+# File des rapports calculés en arrière-plan : nombre de threads de calcul, durée de
+# conservation des résultats (secondes) et intervalle de rafraîchissement de la progression
+JOB_WORKERS = int(os.getenv("OCEANSTATE_JOB_WORKERS", 4))
+JOB_TTL = int(os.getenv("OCEANSTATE_JOB_TTL", 600))
+JOB_POLL_SECONDS = float(os.getenv("OCEANSTATE_JOB_POLL_SECONDS", 0.5))
+
+# Service de prévision : scénarios regroupés en lots d'au plus PREDICT_MAX_BATCH lignes,
+# en attendant au plus PREDICT_MAX_WAIT secondes après la première demande
+PREDICT_MAX_BATCH = int(os.getenv("OCEANSTATE_PREDICT_MAX_BATCH", 512))
+PREDICT_MAX_WAIT = float(os.getenv("OCEANSTATE_PREDICT_MAX_WAIT", 0.005))
+PREDICT_PORT = int(os.getenv("OCEANSTATE_PREDICT_PORT", 8502))
+
 # Noms des fichiers de données brutes
 RAW_DATA_FILES = {
     "sea_level": RAW_DATA_DIR / "sea-level.csv",
@@ -41,12 +121,16 @@ RAW_DATA_FILES = {
 
 }
 
+# Copies colonnaires (Parquet) des données brutes, écrites par analysis/materialize.py
 PROCESSED_DATA_FILES = {
-    "sea_level": PROCESSED_DATA_DIR / "sea-level.csv",
-    "plastics": PROCESSED_DATA_DIR / "plastics.csv",
-    "glaciers_melting": PROCESSED_DATA_DIR / "glaciers_fig-1.csv"
+    name: PROCESSED_DATA_DIR / f"{name}.parquet"
+    for name in [*URLS, *RAW_DATA_FILES]
+    if name != "depth_file"
 }
 
+# Registre des schémas des jeux de données matérialisés
+SCHEMA_REGISTRY_FILE = PROCESSED_DATA_DIR / "schemas.json"
+
 # Noms des colonnes importantes
 COLUMN_NAMES = {
     "seawater_ph": {
@@ -0,0 +1,242 @@
+"""
+Moteur de corrélations entre indicateurs mondiaux annuels
+Toutes les séries (pH, CO2, chaleur océanique, glaciers, niveau de la mer, Liste Rouge,
+production de plastique, anomalie de température) sont alignées dans une matrice indexée
+par année ; les matrices r / p-value de Pearson et Spearman sont calculées en une passe
+sur les observations disponibles par paire, puis gardées en cache par version des données ;
+chaque série n'est reconstruite que si la version de ses propres sources a changé
+"""
+
+from collections import namedtuple
+from dataclasses import dataclass
+import hashlib
+import threading
+
+from loguru import logger
+import numpy as np
+import pandas as pd
+
+from .aggregates import yearly_series
+from .materialize import dataset_version
+from .partitions import read_partition
+from .preprocessing import (
+    load_and_clean_acid_data,
+    load_and_clean_glaciers_data,
+    load_and_clean_heat_data,
+    load_and_clean_sealevel_data,
+)
+
+Correlation = namedtuple("Correlation", ["statistic", "pvalue"])
+
+HEAT_COLUMNS = [
+    "ocean_heat_content_noaa_2000m",
+    "ocean_heat_content_mri_2000m",
+    "ocean_heat_content_iap_2000m",
+]
+SEA_LEVEL_COLUMNS = [
+    "sea_level_church_and_white_2011",
+    "sea_level_uhslc",
+    "sea_level_average",
+]
+
+
+def _ph():
+    df = load_and_clean_acid_data(columns=["year", "Ocean_acidification(in_PH)"]).dropna()
+    return df.set_index("year")["Ocean_acidification(in_PH)"]
+
+
+def _co2():
+    return yearly_series("CO2_emission", "emissions_total", "sum").set_index("Year")["emissions_total"]
+
+
+def _ohc():
+    df = load_and_clean_heat_data(columns=["Year", *HEAT_COLUMNS])
+    return df.set_index("Year")[HEAT_COLUMNS].mean(axis=1)
+
+
+def _glacier():
+    df = load_and_clean_glaciers_data(columns=["Year", "Mean cumulative mass balance"])
+    return df.set_index("Year")["Mean cumulative mass balance"]
+
+
+def _sea_level():
+    df = load_and_clean_sealevel_data(columns=["Day", *SEA_LEVEL_COLUMNS])
+    years = pd.to_datetime(df["Day"]).dt.year
+    return df[SEA_LEVEL_COLUMNS].mean(axis=1).groupby(years).mean()
+
+
+def _red_list():
+    series = yearly_series("red_list_index", "_15_5_1__er_rsk_lst", "mean")
+    return series.set_index("Year")["_15_5_1__er_rsk_lst"]
+
+
+def _plastic_production():
+    series = yearly_series("platic_production", "plastic_production", "sum")
+    return series.set_index("Year")["plastic_production"]
+
+
+def _temperature_anomaly():
+    df = read_partition("global_warning", "World", columns=["Year", "near_surface_temperature_anomaly"])
+    return df.set_index("Year")["near_surface_temperature_anomaly"]
+
+
+# Série -> (jeux de données sources, fonction de construction)
+SERIES = {
+    "ph": (["acid"], _ph),
+    "co2": (["CO2_emission"], _co2),
+    "ohc": (["heat"], _ohc),
+    "glacier": (["glaciers_melting"], _glacier),
+    "sea_level": (["sea_level"], _sea_level),
+    "red_list": (["red_list_index"], _red_list),
+    "plastic_production": (["platic_production"], _plastic_production),
+    "temperature_anomaly": (["global_warning"], _temperature_anomaly),
+}
+
+SERIES_LABELS = {
+    "ph": "pH de l'océan",
+    "co2": "Émissions de CO2",
+    "ohc": "Chaleur océanique",
+    "glacier": "Masse cumulée des glaciers",
+    "sea_level": "Niveau de la mer",
+    "red_list": "Indice Liste Rouge",
+    "plastic_production": "Production de plastique",
+    "temperature_anomaly": "Anomalie de température",
+}
+
+
+@dataclass
+class CorrelationMatrix:
+    data: pd.DataFrame
+    n: pd.DataFrame
+    pearson_r: pd.DataFrame
+    pearson_p: pd.DataFrame
+    spearman_r: pd.DataFrame
+    spearman_p: pd.DataFrame
+
+    def get(self, a: str, b: str, method: str = "pearson") -> Correlation:
+        r = getattr(self, f"{method}_r").loc[a, b]
+        p = getattr(self, f"{method}_p").loc[a, b]
+        if np.isnan(r):
+            raise KeyError(f"Pas d'observations communes entre '{a}' et '{b}'")
+        return Correlation(float(r), float(p))
+
+
+def series_versions(names=None) -> dict:
+    """Version des sources de chaque série (les séries indisponibles sont omises)."""
+    versions = {}
+    for name in names or SERIES:
+        sources = SERIES[name][0]
+        try:
+            versions[name] = "-".join(dataset_version(source) for source in sources)
+        except Exception as e:
+            logger.warning(f"Série '{name}' indisponible : {e}")
+    return versions
+
+
+_series_cache = {}  # série -> (version des sources, valeurs)
+
+
+def _build_series(name: str, version: str = None) -> pd.Series:
+    cached = _series_cache.get(name)
+    if version is not None and cached is not None and cached[0] == version:
+        return cached[1]
+    series = SERIES[name][1]()
+    series.index = series.index.astype(int)
+    series = series.astype("float64")
+    if version is not None:
+        _series_cache[name] = (version, series)
+    return series
+
+
+def build_matrix(names=None, versions=None) -> pd.DataFrame:
+    """Aligne les séries demandées dans une matrice indexée par année."""
+    versions = versions or {}
+    columns = {name: _build_series(name, versions.get(name)) for name in names or SERIES}
+    return pd.DataFrame(columns).sort_index().rename_axis("Year")
+
+
+def pairwise_pearson(values: np.ndarray):
+    """
+    Corrélations de Pearson de toutes les paires de colonnes en une passe,
+    sur les lignes où les deux colonnes sont renseignées
+    Returns: (r, p-value, effectifs) sous forme de matrices k x k
+    """
+    from scipy import stats
+
+    mask = ~np.isnan(values)
+    x = np.where(mask, values, 0.0)
+    m = mask.astype("float64")
+
+    n = m.T @ m
+    sx = x.T @ m            # sx[i, j] = somme de x_i sur les lignes communes à i et j
+    sxx = (x * x).T @ m
+    sxy = x.T @ x
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = n * sxy - sx * sx.T
+        var = (n * sxx - sx ** 2) * (n * sxx.T - sx.T ** 2)
+        r = np.clip(cov / np.sqrt(var), -1.0, 1.0)
+        r[n < 3] = np.nan
+        t = r * np.sqrt((n - 2) / (1 - r ** 2))
+        p = 2 * stats.t.sf(np.abs(t), n - 2)
+    p[np.abs(r) == 1] = 0.0
+    return r, p, n
+
+
+def pairwise_spearman(values: np.ndarray):
+    """Corrélations de Spearman : rangs recalculés sur le support commun de chaque paire."""
+    from scipy import stats
+
+    k = values.shape[1]
+    r = np.full((k, k), np.nan)
+    p = np.full((k, k), np.nan)
+    for i in range(k):
+        for j in range(i, k):
+            both = ~np.isnan(values[:, i]) & ~np.isnan(values[:, j])
+            ranks = np.column_stack([
+                stats.rankdata(values[both, i]),
+                stats.rankdata(values[both, j]),
+            ])
+            r_ij, p_ij, _ = pairwise_pearson(ranks)
+            r[i, j] = r[j, i] = r_ij[0, 1]
+            p[i, j] = p[j, i] = p_ij[0, 1]
+    return r, p
+
+
+def compute(matrix: pd.DataFrame) -> CorrelationMatrix:
+    values = matrix.to_numpy(dtype="float64")
+    names = matrix.columns
+
+    def frame(a):
+        return pd.DataFrame(a, index=names, columns=names)
+
+    pearson_r, pearson_p, n = pairwise_pearson(values)
+    spearman_r, spearman_p = pairwise_spearman(values)
+    return CorrelationMatrix(
+        data=matrix,
+        n=frame(n.astype(int)),
+        pearson_r=frame(pearson_r),
+        pearson_p=frame(pearson_p),
+        spearman_r=frame(spearman_r),
+        spearman_p=frame(spearman_p),
+    )
+
+
+_cache = {}
+_lock = threading.Lock()
+
+
+def correlation_matrix() -> CorrelationMatrix:
+    """Matrices de corrélation de toutes les séries, recalculées seulement si une source change."""
+    versions = series_versions()
+    key = hashlib.sha256(repr(sorted(versions.items())).encode()).hexdigest()
+    with _lock:
+        if key not in _cache:
+            _cache.clear()
+            _cache[key] = compute(build_matrix(list(versions), versions))
+        return _cache[key]
+
+
+def correlation(a: str, b: str, method: str = "pearson") -> Correlation:
+    """Corrélation (r, p-value) entre deux séries, lue dans la matrice en cache."""
+    return correlation_matrix().get(a, b, method)
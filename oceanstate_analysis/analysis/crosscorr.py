@@ -0,0 +1,204 @@
+"""
+Corrélations décalées et glissantes entre deux séries annuelles
+- Décalage : la corrélation de Pearson exacte pour chaque décalage (sur les seules années
+  observées dans les deux séries) est obtenue à partir de corrélations croisées par FFT des
+  valeurs et des masques d'observation, soit O(n log n) pour tous les décalages à la fois
+- Fenêtre glissante : les sommes cumulées donnent la corrélation de chaque fenêtre en
+  O(1), pour toutes les tailles de fenêtre en une opération (matrice tailles x années)
+Seules les lacunes d'au plus MAX_INTERPOLATED_GAP années sont interpolées ; les années
+des lacunes plus longues restent manquantes et sont exclues des corrélations
+Les profils complets d'une paire sont calculés une fois par version des séries ; les
+curseurs du tableau de bord ne font qu'en extraire une partie
+"""
+
+from dataclasses import dataclass
+import itertools
+import threading
+
+import numpy as np
+import pandas as pd
+
+from .correlations import build_matrix, series_versions
+
+MIN_OVERLAP = 3
+# Nombre maximal d'années manquantes consécutives comblées par interpolation linéaire
+MAX_INTERPOLATED_GAP = 2
+
+
+def _standardize(values: np.ndarray) -> tuple:
+    # Pearson est invariant par changement d'échelle : on travaille sur des séries
+    # centrées réduites pour éviter les pertes de précision des sommes cumulées.
+    # Les années manquantes (NaN) valent 0 et sont écartées par le masque renvoyé
+    observed = ~np.isnan(values)
+    if not observed.any():
+        return np.zeros_like(values), observed
+    std = values[observed].std()
+    values = (values - values[observed].mean()) / (std if std > 0 else 1.0)
+    return np.where(observed, values, 0.0), observed
+
+
+def _prefix(values: np.ndarray) -> np.ndarray:
+    return np.concatenate([[0.0], np.cumsum(values)])
+
+
+def _pearson_from_sums(m, sx, sy, sxx, syy, sxy) -> np.ndarray:
+    with np.errstate(invalid="ignore", divide="ignore"):
+        r = (m * sxy - sx * sy) / np.sqrt((m * sxx - sx ** 2) * (m * syy - sy ** 2))
+    return np.clip(r, -1.0, 1.0)
+
+
+def lagged_pearson(x: np.ndarray, y: np.ndarray, max_lag: int = None, interpolated=None) -> pd.DataFrame:
+    """
+    Corrélation de x[t] et y[t + lag] pour lag dans [-max_lag, max_lag], sur les seuls
+    couples d'années observés dans les deux séries (NaN : année manquante)
+    (lag > 0 : x précède y de `lag` années)
+    - interpolated : masques (x, y) des années interpolées, comptées dans la colonne `interpolated`
+    Returns: DataFrame lag, r, n (couples d'années communs), interpolated (couples comportant
+    au moins une valeur interpolée) ; les décalages à moins de MIN_OVERLAP couples sont omis
+    """
+    x, mx = _standardize(np.asarray(x, dtype="float64"))
+    y, my = _standardize(np.asarray(y, dtype="float64"))
+    n = len(x)
+    max_lag = n - MIN_OVERLAP if max_lag is None else min(max_lag, n - MIN_OVERLAP)
+    lags = np.arange(-max_lag, max_lag + 1)
+
+    ix, iy = interpolated if interpolated is not None else (np.zeros(n, bool), np.zeros(n, bool))
+    mx, my = mx.astype("float64"), my.astype("float64")
+    ix, iy = ix * mx, iy * my
+    # Corrélations croisées sans repliement (zéros jusqu'à 2n - 1), toutes en un seul lot :
+    # sum_t u[t] * v[t + lag] pour chaque couple (u, v) ci-dessous
+    left = np.stack([x, mx, x, mx, x * x, mx, ix, mx, ix])
+    right = np.stack([y, my, my, y, my, y * y, my, iy, iy])
+    nfft = 1 << (2 * n - 1).bit_length()
+    cross = np.fft.irfft(np.conj(np.fft.rfft(left, nfft)) * np.fft.rfft(right, nfft), nfft)
+    sxy, m, sx, sy, sxx, syy, ix_y, x_iy, ix_iy = cross[:, np.where(lags >= 0, lags, nfft + lags)]
+    m = np.rint(m)
+    r = _pearson_from_sums(m, sx, sy, sxx, syy, sxy)
+    filled = np.rint(ix_y + x_iy - ix_iy)
+
+    profile = pd.DataFrame({"lag": lags, "r": r, "n": m.astype(int), "interpolated": filled.astype(int)})
+    return profile[profile["n"] >= MIN_OVERLAP].reset_index(drop=True)
+
+
+def rolling_pearson(x: np.ndarray, y: np.ndarray, windows) -> np.ndarray:
+    """
+    Corrélation glissante pour chaque taille de fenêtre de `windows`, sur les seules années
+    de la fenêtre observées dans les deux séries
+    Returns: matrice (tailles x années), NaN tant que la fenêtre n'est pas pleine ou compte
+    moins de MIN_OVERLAP années observées ; la colonne t correspond à la fenêtre qui se
+    termine à l'année t
+    """
+    x, mx = _standardize(np.asarray(x, dtype="float64"))
+    y, my = _standardize(np.asarray(y, dtype="float64"))
+    both = (mx & my).astype("float64")
+    x, y = x * both, y * both
+    n = len(x)
+    windows = np.asarray(windows)[:, None]
+    ends = np.arange(1, n + 1)[None, :]
+    starts = ends - windows
+    full = starts >= 0
+    starts = np.where(full, starts, 0)
+
+    def window_sum(prefix):
+        return prefix[ends] - prefix[starts]
+
+    m = np.rint(window_sum(_prefix(both)))
+    r = _pearson_from_sums(
+        m,
+        window_sum(_prefix(x)), window_sum(_prefix(y)),
+        window_sum(_prefix(x * x)), window_sum(_prefix(y * y)),
+        window_sum(_prefix(x * y)),
+    )
+    return np.where(full & (m >= MIN_OVERLAP), r, np.nan)
+
+
+@dataclass
+class CrossCorrelation:
+    """Profils complets d'une paire de séries sur leur période commune."""
+    a: str
+    b: str
+    years: np.ndarray
+    lags: pd.DataFrame
+    windows: np.ndarray
+    rolling: np.ndarray  # tailles de fenêtre x années
+    observed: int = 0  # années observées (ou interpolées) dans les deux séries
+    interpolated: int = 0  # dont années où au moins une des deux valeurs est interpolée
+
+    def lag_profile(self, max_lag: int) -> pd.DataFrame:
+        return self.lags[self.lags["lag"].abs() <= max_lag].reset_index(drop=True)
+
+    def best_lag(self, max_lag: int) -> pd.Series:
+        profile = self.lag_profile(max_lag)
+        return profile.loc[profile["r"].abs().idxmax()]
+
+    def rolling_window(self, window: int) -> pd.DataFrame:
+        """Corrélation glissante sur `window` années (année = fin de la fenêtre)."""
+        row = int(np.searchsorted(self.windows, window))
+        if row >= len(self.windows) or self.windows[row] != window:
+            raise ValueError(f"Fenêtre de {window} ans hors de [{self.windows[0]} ; {self.windows[-1]}]")
+        return pd.DataFrame({"Year": self.years, "r": self.rolling[row]}).dropna().reset_index(drop=True)
+
+
+def _fill_short_gaps(values: pd.Series, max_gap: int = MAX_INTERPOLATED_GAP) -> pd.Series:
+    """Interpole les seules lacunes intérieures d'au plus `max_gap` années consécutives."""
+    missing = values.isna()
+    gap = missing.groupby((missing != missing.shift()).cumsum()).transform("sum")
+    filled = values.interpolate(limit_area="inside")
+    return values.where(~missing | (gap > max_gap), filled)
+
+
+def _overlap(a: str, b: str, versions: dict) -> tuple:
+    """
+    Période commune de (a, b), année par année : les courtes lacunes sont interpolées,
+    les autres années manquantes restent NaN
+    Returns: (DataFrame indexé par année, masque DataFrame des valeurs interpolées)
+    """
+    pair = build_matrix([a, b], versions)
+    years = np.arange(pair.index.min(), pair.index.max() + 1)
+    raw = pair.reindex(years)
+    pair = raw.apply(_fill_short_gaps)
+    both = pair.notna().all(axis=1).to_numpy()
+    if not both.any():
+        return pair.iloc[:0], pair.iloc[:0].notna()
+    first, last = np.flatnonzero(both)[[0, -1]]
+    pair = pair.iloc[first:last + 1]
+    return pair, (raw.iloc[first:last + 1].isna() & pair.notna())
+
+
+_cache = {}
+_lock = threading.Lock()
+
+
+def cross_correlation(a: str, b: str) -> CrossCorrelation:
+    """Profils décalés et glissants de (a, b), recalculés seulement si une source change."""
+    versions = series_versions([a, b])
+    key = (a, b, tuple(sorted(versions.items())))
+    with _lock:
+        if key in _cache:
+            return _cache[key]
+
+    pair, interpolated = _overlap(a, b, versions)
+    both = pair.notna().all(axis=1)
+    if both.sum() < MIN_OVERLAP:
+        raise ValueError(f"Pas assez d'années communes entre '{a}' et '{b}'")
+    x, y = pair[a].to_numpy(), pair[b].to_numpy()
+    masks = (interpolated[a].to_numpy(), interpolated[b].to_numpy())
+    windows = np.arange(MIN_OVERLAP, len(pair) + 1)
+    result = CrossCorrelation(a, b, pair.index.to_numpy(), lagged_pearson(x, y, interpolated=masks), windows,
+                              rolling_pearson(x, y, windows), observed=int(both.sum()),
+                              interpolated=int((interpolated.any(axis=1) & both).sum()))
+    with _lock:
+        _cache[key] = result
+    return result
+
+
+def build_all() -> dict:
+    """Profils de toutes les paires de séries disponibles (préchauffage)."""
+    names = list(series_versions())
+    results = {}
+    for a, b in itertools.combinations(names, 2):
+        try:
+            results[(a, b)] = cross_correlation(a, b)
+        except ValueError:
+            continue
+    return results
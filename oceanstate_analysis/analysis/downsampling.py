@@ -0,0 +1,95 @@
+"""
+Sous-échantillonnage des longues séries temporelles avant tracé
+Chaque trace est réduite à un budget de points (de l'ordre de la largeur du graphique
+en pixels) en conservant sa forme : LTTB (Largest-Triangle-Three-Buckets) ou min/max par
+intervalle. Une plage d'abscisses peut être fournie pour ne garder que la fenêtre zoomée,
+qui est alors restituée avec plus de détail
+"""
+
+import numpy as np
+import pandas as pd
+
+from .config import PLOT_MAX_POINTS
+
+
+def _numeric(values) -> np.ndarray:
+    values = pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.to_numpy(dtype="datetime64[ns]").astype("int64").astype("float64")
+    return values.to_numpy(dtype="float64")
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Indices des points retenus par LTTB (le premier et le dernier sont toujours gardés)."""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # n_out - 2 intervalles entre le premier et le dernier point
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        # Aire du triangle (point retenu précédent, candidat, moyenne de l'intervalle suivant)
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def minmax_indices(y: np.ndarray, n_out: int) -> np.ndarray:
+    """Indices des minimum et maximum de chaque intervalle (extrêmes toujours visibles)."""
+    n = len(y)
+    if n_out >= n or n_out < 4:
+        return np.arange(n)
+
+    buckets = n_out // 2 - 1
+    edges = np.linspace(1, n - 1, buckets + 1).astype(np.int64)
+    bucket = np.repeat(np.arange(buckets), np.diff(edges))
+    positions = np.arange(1, n - 1)
+
+    order = np.lexsort((y[1:n - 1], bucket))
+    first = np.r_[0, np.flatnonzero(np.diff(bucket[order])) + 1]
+    last = np.r_[first[1:] - 1, len(order) - 1]
+    kept = np.concatenate([[0, n - 1], positions[order[first]], positions[order[last]]])
+    return np.unique(kept)
+
+
+def _clip(df: pd.DataFrame, x: str, x_range) -> pd.DataFrame:
+    """Points de la fenêtre `x_range`, plus un voisin de chaque côté pour atteindre les bords."""
+    values = df[x]
+    start, end = x_range
+    if pd.api.types.is_datetime64_any_dtype(values):
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+    first = max(int(values.searchsorted(start, side="left")) - 1, 0)
+    last = min(int(values.searchsorted(end, side="right")) + 1, len(df))
+    return df.iloc[first:last]
+
+
+def downsample(df: pd.DataFrame, x: str, y: str, max_points: int = PLOT_MAX_POINTS,
+               method: str = "lttb", by: str = None, x_range=None) -> pd.DataFrame:
+    """
+    Réduit chaque trace de `df` (une par valeur de `by`) à au plus `max_points` points
+    - method : "lttb" (forme générale) ou "minmax" (extrêmes de chaque intervalle)
+    - x_range : (début, fin) de la fenêtre affichée ; seuls ses points sont échantillonnés
+    """
+    groups = df.groupby(by, sort=False, observed=True) if by else [(None, df)]
+    frames = []
+    for _, group in groups:
+        group = group.dropna(subset=[x, y]).sort_values(x, kind="stable")
+        if x_range is not None:
+            group = _clip(group, x, x_range)
+        if method == "minmax":
+            indices = minmax_indices(_numeric(group[y]), max_points)
+        else:
+            indices = lttb_indices(_numeric(group[x]), _numeric(group[y]), max_points)
+        frames.append(group.iloc[indices])
+    if not frames:
+        return df.iloc[0:0]
+    return pd.concat(frames)
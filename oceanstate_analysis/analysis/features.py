@@ -0,0 +1,53 @@
+"""
+Matrices de variables décalées pour la prévision des séries mondiales annuelles
+Les séries du moteur de corrélations sont alignées sur une grille d'années continue ;
+une ligne du plan d'expérience de l'année t contient la cible aux années t-1..t-p et
+chaque variable explicative aux années t..t-q. Les fenêtres sont construites en une
+opération (sliding_window_view), sans boucle sur les années
+"""
+
+import numpy as np
+import pandas as pd
+
+from .correlations import build_matrix, series_versions
+
+
+def yearly_frame(names) -> tuple:
+    """
+    Séries `names` alignées sur des années consécutives (années manquantes en NaN)
+    Returns: (DataFrame indexé par année, version des sources de chaque série)
+    """
+    versions = series_versions(names)
+    missing = set(names) - set(versions)
+    if missing:
+        raise ValueError(f"Séries indisponibles : {', '.join(sorted(missing))}")
+    frame = build_matrix(names, versions)
+    years = np.arange(frame.index.min(), frame.index.max() + 1)
+    return frame.reindex(years).rename_axis("Year"), versions
+
+
+def feature_names(target: str, drivers, p: int, q: int) -> list:
+    return ([f"{target}_lag{k}" for k in range(1, p + 1)]
+            + [f"{driver}_lag{k}" for driver in drivers for k in range(q + 1)])
+
+
+def _windows(values: np.ndarray, lags, width: int) -> np.ndarray:
+    # Ligne i : valeurs aux positions i + width - lag (fenêtre finissant à l'année de la ligne)
+    windows = np.lib.stride_tricks.sliding_window_view(values, width + 1)
+    return windows[:, [width - lag for lag in lags]]
+
+
+def lagged_design(frame: pd.DataFrame, target: str, drivers, p: int, q: int) -> tuple:
+    """
+    Plan d'expérience (X, y, années) de la cible `target` : p retards de la cible et
+    retards 0..q de chaque variable explicative ; les lignes incomplètes sont écartées
+    """
+    width = max(p, q)
+    blocks = [_windows(frame[target].to_numpy("float64"), range(1, p + 1), width)]
+    blocks += [_windows(frame[driver].to_numpy("float64"), range(q + 1), width) for driver in drivers]
+    X = np.hstack(blocks)
+    y = frame[target].to_numpy("float64")[width:]
+    years = frame.index.to_numpy()[width:]
+
+    complete = ~np.isnan(X).any(axis=1) & ~np.isnan(y)
+    return X[complete], y[complete], years[complete]
@@ -0,0 +1,130 @@
+"""
+File de calcul des rapports en arrière-plan
+Les rapports sont exécutés par un pool borné de threads partagé par toutes les sessions :
+deux demandes identiques (même fonction, mêmes paramètres, mêmes versions des données)
+partagent le même calcul, et le résultat reste disponible pendant JOB_TTL secondes ou
+jusqu'au rafraîchissement d'un jeu de données. La progression est estimée à partir
+de la durée des exécutions précédentes du même rapport
+"""
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+import threading
+import time
+
+from loguru import logger
+
+from .config import JOB_TTL, JOB_WORKERS
+from .materialize import registered_versions
+from .render_cache import figure_key
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+@dataclass
+class Job:
+    key: str
+    name: str
+    future: Future
+    submitted: float = field(default_factory=time.monotonic)
+    started: float = None
+    finished: float = None
+    expected: float = None  # durée attendue (dernière exécution de ce rapport)
+
+    @property
+    def status(self) -> str:
+        if not self.future.done():
+            return RUNNING if self.started is not None else QUEUED
+        return FAILED if self.future.exception() is not None else DONE
+
+    def done(self) -> bool:
+        return self.future.done()
+
+    @property
+    def elapsed(self) -> float:
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.monotonic()) - self.started
+
+    def progress(self) -> float:
+        """Avancement estimé entre 0 et 1 (1 seulement une fois le calcul terminé)."""
+        if self.done():
+            return 1.0
+        if self.started is None:
+            return 0.0
+        if not self.expected:
+            return 0.1
+        return min(self.elapsed / self.expected, 0.95)
+
+    def result(self, timeout: float = None):
+        """Résultat du rapport (relève l'exception en cas d'échec)."""
+        return self.future.result(timeout)
+
+
+class JobQueue:
+    def __init__(self, max_workers: int = JOB_WORKERS, ttl: float = JOB_TTL):
+        self.ttl = ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="report-job")
+        self._jobs = {}        # clé -> Job
+        self._durations = {}   # nom du rapport -> durée de la dernière exécution réussie
+        self._lock = threading.Lock()
+
+    def _run(self, job: Job, func, args, kwargs):
+        job.started = time.monotonic()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            job.finished = time.monotonic()
+
+    def _on_done(self, job: Job):
+        if job.future.exception() is not None:
+            logger.warning(f"Échec du rapport '{job.name}' : {job.future.exception()}")
+            # Une nouvelle demande relance le calcul
+            with self._lock:
+                if self._jobs.get(job.key) is job:
+                    del self._jobs[job.key]
+            return
+        logger.info(f"Rapport '{job.name}' calculé en {job.elapsed:.2f}s")
+        with self._lock:
+            self._durations[job.name] = job.elapsed
+
+    def _purge(self, now: float):
+        expired = [key for key, job in self._jobs.items()
+                   if job.finished is not None and job.done() and now - job.finished > self.ttl]
+        for key in expired:
+            del self._jobs[key]
+
+    def submit(self, func, *args, **kwargs) -> Job:
+        """Job calculant func(*args, **kwargs) : existant s'il est en cours ou encore valide, sinon nouveau."""
+        # Les versions des jeux de données font partie de la clé : après un rafraîchissement,
+        # le rapport est recalculé au lieu de servir l'ancien résultat
+        key = figure_key(func, (args, registered_versions()), kwargs)
+        with self._lock:
+            self._purge(time.monotonic())
+            job = self._jobs.get(key)
+            if job is not None:
+                return job
+            name = func.__name__
+            job = Job(key, name, None, expected=self._durations.get(name))
+            job.future = self._executor.submit(self._run, job, func, args, kwargs)
+            self._jobs[key] = job
+
+        job.future.add_done_callback(lambda _: self._on_done(job))
+        return job
+
+    def get(self, key: str) -> Job:
+        with self._lock:
+            self._purge(time.monotonic())
+            return self._jobs.get(key)
+
+    def jobs(self) -> list:
+        """Jobs en cours ou conservés, du plus récent au plus ancien."""
+        with self._lock:
+            self._purge(time.monotonic())
+            return sorted(self._jobs.values(), key=lambda job: job.submitted, reverse=True)
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,222 @@
+"""
+Génération de charge sur l'application Streamlit (un worker ou le répartiteur de serve.py)
+Chaque utilisateur virtuel ouvre sa propre session sur le flux WebSocket de Streamlit et
+rejoue le parcours d'un visiteur : page d'accueil, page des analyses puis génération d'un
+rapport, jusqu'à la fin de son calcul en arrière-plan. La latence d'une page est le temps
+entre l'envoi de l'action et la fin du script (ou du rapport) ; les p50/p95 sont donnés
+par étape
+
+Utilisation : python -m analysis.loadgen --url http://127.0.0.1:8501 --users 20 --iterations 3
+"""
+
+import asyncio
+from dataclasses import dataclass, field
+import json
+from pathlib import Path
+import time
+from typing import Optional
+from urllib.parse import urlparse
+
+from loguru import logger
+import numpy as np
+import typer
+
+app = typer.Typer()
+
+ANALYSES_PAGE = "📊 Projet & Analyses"
+STEP_TIMEOUT = 120
+
+
+@dataclass
+class StepResult:
+    step: str
+    seconds: float
+    ok: bool = True
+    error: str = None
+
+
+@dataclass
+class Session:
+    """Session Streamlit vue par un client : widgets affichés et valeurs envoyées au serveur."""
+    websocket: object
+    widgets: dict = field(default_factory=dict)  # libellé ou clé -> (type, id)
+    values: dict = field(default_factory=dict)  # id -> valeur de selectbox
+    fragment: Optional[tuple] = None  # (fragment_id, intervalle) du dernier rafraîchissement auto
+
+    async def _send(self, triggers=(), fragment_id: str = ""):
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+
+        msg = BackMsg()
+        state = msg.rerun_script
+        state.fragment_id = fragment_id
+        state.is_auto_rerun = bool(fragment_id)
+        for widget_id, value in self.values.items():
+            widget = state.widget_states.widgets.add()
+            widget.id = widget_id
+            widget.string_value = value
+        for widget_id in triggers:
+            widget = state.widget_states.widgets.add()
+            widget.id = widget_id
+            widget.trigger_value = True
+        await self.websocket.send(msg.SerializeToString())
+
+    async def _wait(self) -> bool:
+        """Lit les messages jusqu'à la fin du script ; True si une barre de progression est affichée."""
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        progress = False
+        while True:
+            msg = ForwardMsg()
+            msg.ParseFromString(await self.websocket.recv())
+            kind = msg.WhichOneof("type")
+            if kind == "delta" and msg.delta.WhichOneof("type") == "new_element":
+                element = msg.delta.new_element
+                element_type = element.WhichOneof("type")
+                if element_type == "progress":
+                    progress = True
+                elif element_type in ("selectbox", "button"):
+                    widget = getattr(element, element_type)
+                    self.widgets[widget.label] = (element_type, widget.id)
+                elif element_type == "exception":
+                    raise RuntimeError(element.exception.message)
+            elif kind == "auto_rerun":
+                self.fragment = (msg.auto_rerun.fragment_id, msg.auto_rerun.interval)
+            elif kind == "script_finished":
+                if msg.script_finished == ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+                    raise RuntimeError("Erreur de compilation du script")
+                if msg.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    return progress
+                progress = False
+
+    async def rerun(self, triggers=()):
+        """Relance le script et attend la fin des rapports en cours (fragments de progression)."""
+        await self._send(triggers)
+        progress = await self._wait()
+        while progress and self.fragment is not None:
+            fragment_id, interval = self.fragment
+            await asyncio.sleep(interval)
+            await self._send(fragment_id=fragment_id)
+            progress = await self._wait()
+
+    async def select(self, label: str, value: str):
+        self.values[self.widgets[label][1]] = value
+        await self.rerun()
+
+    async def click(self, key: str):
+        widget_id = next(widget_id for kind, widget_id in self.widgets.values()
+                         if kind == "button" and widget_id.endswith(f"-{key}"))
+        await self.rerun(triggers=[widget_id])
+
+
+async def _timed(results: list, step: str, action):
+    start = time.perf_counter()
+    try:
+        await asyncio.wait_for(action, STEP_TIMEOUT)
+    except Exception as e:
+        results.append(StepResult(step, time.perf_counter() - start, ok=False, error=repr(e)))
+        return False
+    results.append(StepResult(step, time.perf_counter() - start))
+    return True
+
+
+async def _http_get(host: str, port: int, path: str = "/"):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f"GET {path} HTTP/1.0\r\nHost: {host}\r\n\r\n".encode())
+    status = await reader.readline()
+    await reader.read()
+    writer.close()
+    if b" 200 " not in status:
+        raise RuntimeError(status.decode().strip())
+
+
+async def virtual_user(index: int, url: str, report: str, iterations: int, results: list):
+    """Parcours d'un utilisateur ; chaque utilisateur a sa propre adresse source (127.0.0.x)."""
+    import websockets
+
+    parsed = urlparse(url)
+    host, port = parsed.hostname, parsed.port or 80
+    # Adresse source distincte par utilisateur : l'affinité par client du répartiteur
+    # les répartit comme des visiteurs différents
+    local = (f"127.0.{index // 250}.{index % 250 + 2}", 0) if host in ("127.0.0.1", "localhost") else None
+
+    for _ in range(iterations):
+        if not await _timed(results, "http", _http_get(host, port)):
+            continue
+        try:
+            websocket = await websockets.connect(
+                f"ws://{host}:{port}/_stcore/stream", subprotocols=["streamlit"],
+                max_size=None, local_addr=local)
+        except Exception as e:
+            results.append(StepResult("connect", 0.0, ok=False, error=repr(e)))
+            continue
+        session = Session(websocket)
+        try:
+            if not await _timed(results, "home", session.rerun()):
+                continue
+            if not await _timed(results, "analyses", session.select("Choisir une section", ANALYSES_PAGE)):
+                continue
+            await _timed(results, "report", session.click(report))
+        finally:
+            await websocket.close()
+
+
+def summarize(results: list, elapsed: float) -> dict:
+    """p50/p95/max par étape, débit et erreurs."""
+    summary = {"elapsed": elapsed, "steps": {}}
+    for step in dict.fromkeys(result.step for result in results):
+        timings = np.array([r.seconds for r in results if r.step == step and r.ok])
+        errors = [r.error for r in results if r.step == step and not r.ok]
+        summary["steps"][step] = {
+            "count": int(len(timings)),
+            "errors": len(errors),
+            "p50": float(np.percentile(timings, 50)) if len(timings) else None,
+            "p95": float(np.percentile(timings, 95)) if len(timings) else None,
+            "max": float(timings.max()) if len(timings) else None,
+            "per_second": float(len(timings) / elapsed) if elapsed else None,
+        }
+        if errors:
+            summary["steps"][step]["first_error"] = errors[0]
+    return summary
+
+
+async def run_load(url: str, users: int, iterations: int, report: str, ramp_up: float) -> dict:
+    results = []
+    start = time.perf_counter()
+
+    async def delayed(index):
+        await asyncio.sleep(ramp_up * index / max(users, 1))
+        await virtual_user(index, url, report, iterations, results)
+
+    await asyncio.gather(*(delayed(i) for i in range(users)))
+    return summarize(results, time.perf_counter() - start)
+
+
+@app.command()
+def main(
+    url: str = typer.Option("http://127.0.0.1:8501", help="Adresse de l'application ou du répartiteur"),
+    users: int = typer.Option(10, help="Utilisateurs virtuels simultanés"),
+    iterations: int = typer.Option(3, help="Parcours complets par utilisateur"),
+    report: str = typer.Option("global_warming", help="Clé du bouton de rapport cliqué"),
+    ramp_up: float = typer.Option(2.0, help="Durée d'arrivée des utilisateurs (secondes)"),
+    output: Optional[Path] = typer.Option(None, help="Fichier JSON des résultats"),
+):
+    summary = asyncio.run(run_load(url, users, iterations, report, ramp_up))
+
+    for step, stats in summary["steps"].items():
+        if stats["count"]:
+            logger.info(f"{step:<9} n={stats['count']:<4} p50={stats['p50'] * 1000:7.1f}ms "
+                        f"p95={stats['p95'] * 1000:7.1f}ms max={stats['max'] * 1000:7.1f}ms "
+                        f"erreurs={stats['errors']}")
+        else:
+            logger.warning(f"{step:<9} aucune réponse ({stats['errors']} erreurs)")
+        if stats.get("first_error"):
+            logger.warning(f"{step:<9} première erreur : {stats['first_error']}")
+
+    if output is not None:
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(dict(summary, url=url, users=users, iterations=iterations), indent=2))
+        logger.success(f"Résultats écrits dans {output}")
+
+
+if __name__ == "__main__":
+    app()
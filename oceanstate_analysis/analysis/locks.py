@@ -0,0 +1,41 @@
+"""
+Verrous exclusifs entre processus (workers du serveur, lots multiprocessus) et entre
+threads, posés sur un fichier verrou (flock, ou msvcrt sous Windows)
+"""
+
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+
+    def _lock_file(handle):
+        fcntl.flock(handle, fcntl.LOCK_EX)
+
+    def _unlock_file(handle):
+        fcntl.flock(handle, fcntl.LOCK_UN)
+except ImportError:  # Windows
+    import msvcrt
+
+    def _lock_file(handle):
+        handle.seek(0)
+        msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+
+    def _unlock_file(handle):
+        handle.seek(0)
+        msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+@contextmanager
+def file_lock(path: Path):
+    """
+    Verrou exclusif sur `path` entre processus et entre threads
+    Non réentrant : un thread qui le détient ne doit pas le redemander
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a+b") as handle:
+        _lock_file(handle)
+        try:
+            yield
+        finally:
+            _unlock_file(handle)
@@ -0,0 +1,470 @@
+"""
+Matérialisation colonnaire des jeux de données
+Chaque source brute (CSV/XLSX local ou distant) est convertie en Parquet typé sous
+PROCESSED_DATA_DIR, et son schéma est enregistré dans le registre SCHEMA_REGISTRY_FILE
+Pour les séries de INCREMENTAL_DATASETS, la taille et l'empreinte de la source déjà lue
+sont conservées : quand la source n'a reçu que des lignes en fin de fichier, seules ces
+lignes sont lues et écrites dans un fichier Parquet supplémentaire (part)
+"""
+
+from contextlib import contextmanager
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from loguru import logger
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from .cache import fetch
+from .config import (
+    COLUMN_NAMES,
+    INCREMENTAL_DATASETS,
+    INCREMENTAL_MAX_PARTS,
+    PROCESSED_DATA_FILES,
+    RAW_DATA_FILES,
+    REQUEST_OPTIONS,
+    SCHEMA_REGISTRY_FILE,
+    STREAMING_CHUNK_ROWS,
+    STREAMING_DATASETS,
+    URLS,
+)
+from .locks import file_lock
+
+YEAR_COLUMNS = ("Year", "year")
+DATE_COLUMNS = ("Day", "Date")
+TIME_COLUMNS = (*YEAR_COLUMNS, *DATE_COLUMNS)
+CATEGORY_COLUMNS = ("Entity", "Code")
+
+_lock = threading.RLock()
+
+
+@contextmanager
+def _registry_lock():
+    # Lecture-modification-écriture du registre : aucune entrée ni watermark perdus
+    with _lock, file_lock(SCHEMA_REGISTRY_FILE.with_suffix(".lock")):
+        yield
+
+
+def dataset_names():
+    """Noms des jeux de données matérialisables (hors fichier NetCDF)."""
+    return [name for name in [*URLS, *RAW_DATA_FILES] if name != "depth_file"]
+
+
+def raw_path(name: str) -> Path:
+    """Chemin local de la source brute (téléchargée via le cache si distante)."""
+    if name in URLS:
+        return fetch(URLS[name], REQUEST_OPTIONS)
+    return Path(RAW_DATA_FILES[name])
+
+
+_digests = {}
+
+
+def source_version(name: str, path: Path = None) -> str:
+    """Empreinte du contenu de la source brute."""
+    path = Path(path or raw_path(name))
+    if name in URLS and path.parent.name == "blobs":
+        # Les blobs du cache sont déjà nommés par leur empreinte
+        return path.name
+
+    # Empreinte recalculée seulement si le fichier a changé
+    stat = path.stat()
+    key = (str(path), stat.st_mtime_ns, stat.st_size)
+    if key not in _digests:
+        _digests[key] = hashlib.sha256(path.read_bytes()).hexdigest()
+    return _digests[key]
+
+
+def read_raw(name: str, path: Path = None) -> pd.DataFrame:
+    """Lit la source brute et applique les renommages de COLUMN_NAMES."""
+    path = Path(path or raw_path(name))
+    if path.suffix in (".xlsx", ".xls"):
+        df = pd.read_excel(path)
+    else:
+        df = pd.read_csv(path)
+    return df.rename(columns=COLUMN_NAMES.get(name, {}))
+
+
+def read_raw_chunks(name: str, path: Path, chunksize: int = STREAMING_CHUNK_ROWS, offset: int = 0):
+    """
+    Blocs successifs de la source CSV brute, avec les renommages de COLUMN_NAMES
+    offset > 0 : seules les lignes qui commencent après cet octet sont lues (en-tête conservé)
+    """
+    renames = COLUMN_NAMES.get(name, {})
+    source = path
+    if offset:
+        with open(path, "rb") as handle:
+            header = handle.readline()
+            handle.seek(offset)
+            source = io.BytesIO(header + handle.read())
+    for chunk in pd.read_csv(source, chunksize=chunksize):
+        yield chunk.rename(columns=renames)
+
+
+def compact_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Types compacts : années en int16, dates en datetime, Entity/Code en catégories
+    et mesures numériques en float32
+    """
+    df = df.copy()
+    for col in df.columns:
+        series = df[col]
+        if col in YEAR_COLUMNS and pd.api.types.is_numeric_dtype(series):
+            if series.notna().all():
+                df[col] = series.astype("int16")
+        elif col in DATE_COLUMNS:
+            df[col] = pd.to_datetime(series, errors="coerce")
+        elif col in CATEGORY_COLUMNS:
+            df[col] = series.astype("category")
+        elif pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            df[col] = series.astype("float32")
+    return df
+
+
+def load_schema_registry() -> dict:
+    if not SCHEMA_REGISTRY_FILE.exists():
+        return {}
+    try:
+        return json.loads(SCHEMA_REGISTRY_FILE.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_schema_registry(registry: dict):
+    tmp = SCHEMA_REGISTRY_FILE.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_text(json.dumps(registry, indent=2, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, SCHEMA_REGISTRY_FILE)
+
+
+def _register(name: str, path: Path, version: str, rows: int, columns: dict, **extra):
+    with _registry_lock():
+        registry = load_schema_registry()
+        registry[name] = {
+            "source": URLS.get(name) or str(RAW_DATA_FILES[name]),
+            "source_version": version,
+            "path": path.name,
+            "rows": rows,
+            "columns": columns,
+            "materialized_at": time.time(),
+            **extra,
+        }
+        _save_schema_registry(registry)
+
+
+def _update_entry(name: str, **fields):
+    with _registry_lock():
+        registry = load_schema_registry()
+        registry[name].update(fields)
+        _save_schema_registry(registry)
+
+
+def _tmp_path(path: Path) -> Path:
+    return path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+
+
+def write_processed(name: str, df: pd.DataFrame, version: str, **extra) -> Path:
+    """Écrit la copie Parquet d'un jeu de données et met à jour le registre des schémas."""
+    path = PROCESSED_DATA_FILES[name]
+    tmp = _tmp_path(path)
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+    _register(name, path, version, len(df), {col: str(dtype) for col, dtype in df.dtypes.items()}, **extra)
+    return path
+
+
+def _chunk_schema(table: pa.Table) -> pa.Schema:
+    """Schéma commun aux blocs : index des catégories élargis (chaque bloc a son dictionnaire)."""
+    schema = table.schema
+    for i, field in enumerate(schema):
+        if pa.types.is_dictionary(field.type):
+            schema = schema.set(i, pa.field(field.name, pa.dictionary(pa.int32(), field.type.value_type)))
+    return schema
+
+
+def _write_chunks(path: Path, chunks, schema: pa.Schema = None) -> tuple:
+    """
+    Écrit `chunks` dans `path` (un groupe de lignes par bloc, remplacement atomique), au
+    schéma `schema` s'il est donné. Aucun fichier n'est écrit si les blocs sont vides
+    Returns: (nombre de lignes, types des colonnes)
+    """
+    tmp = _tmp_path(path)
+    writer, rows, columns = None, 0, {}
+    try:
+        for chunk in chunks:
+            if chunk.empty:
+                continue
+            chunk = compact_dtypes(chunk)
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                schema = schema or _chunk_schema(table)
+                writer = pq.ParquetWriter(tmp, schema)
+                columns = {col: str(dtype) for col, dtype in chunk.dtypes.items()}
+            writer.write_table(table.cast(schema))
+            rows += len(chunk)
+    except Exception:
+        if writer is not None:
+            writer.close()
+        tmp.unlink(missing_ok=True)
+        raise
+    if writer is not None:
+        writer.close()
+        os.replace(tmp, path)
+    return rows, columns
+
+
+def write_processed_chunks(name: str, chunks, version: str, **extra) -> Path:
+    """
+    Écrit la copie Parquet bloc par bloc (un groupe de lignes par bloc), sans jamais
+    charger la source entière en mémoire
+    """
+    path = PROCESSED_DATA_FILES[name]
+    rows, columns = _write_chunks(path, chunks)
+    if not rows:
+        raise ValueError(f"Source '{name}' vide")
+    _register(name, path, version, rows, columns, **extra)
+    return path
+
+
+# ---- Rafraîchissement incrémental ----
+
+def _time_column(columns):
+    return next((col for col in TIME_COLUMNS if col in columns), None)
+
+
+def _entity_keys(df: pd.DataFrame) -> pd.Series:
+    if "Entity" not in df.columns:
+        return pd.Series("", index=df.index)
+    return pd.Series(df["Entity"].astype(str).to_numpy(), index=df.index)
+
+
+def _watermarks(df: pd.DataFrame, time_column: str) -> dict:
+    """Dernière année (ou date, au format ISO) présente pour chaque entité."""
+    last = df[time_column].groupby(_entity_keys(df).to_numpy()).max().dropna()
+    if pd.api.types.is_datetime64_any_dtype(last):
+        return {key: value.isoformat() for key, value in last.items()}
+    return {key: int(value) for key, value in last.items()}
+
+
+def _after_watermarks(df: pd.DataFrame, time_column: str, watermarks: dict) -> pd.Series:
+    """Masque des lignes postérieures à la dernière valeur connue de leur entité."""
+    last = _entity_keys(df).map(watermarks)
+    if pd.api.types.is_datetime64_any_dtype(df[time_column]):
+        last = pd.to_datetime(last)
+    else:
+        last = pd.to_numeric(last)
+    return df[time_column].notna() & (last.isna() | (df[time_column] > last))
+
+
+def _prefix_digest(path: Path, size: int) -> str:
+    """Empreinte des `size` premiers octets du fichier."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        while size > 0:
+            block = handle.read(min(size, 1 << 20))
+            if not block:
+                break
+            digest.update(block)
+            size -= len(block)
+    return digest.hexdigest()
+
+
+def _source_extent(source: Path) -> dict:
+    """Taille et empreinte de la source lue, comparées au prochain rafraîchissement."""
+    size = source.stat().st_size
+    return {"source_bytes": size, "source_prefix": _prefix_digest(source, size)}
+
+
+def _record_watermarks(name: str, source: Path):
+    path = PROCESSED_DATA_FILES[name]
+    names = pq.read_schema(path).names
+    time_column = _time_column(names)
+    if time_column is None:
+        return
+    columns = [col for col in ("Entity", time_column) if col in names]
+    df = pd.read_parquet(path, columns=columns)
+    _update_entry(name, time_column=time_column, watermarks=_watermarks(df, time_column), **_source_extent(source))
+
+
+def _part_paths(path: Path, entry: dict) -> list:
+    return [path.with_name(part) for part in (entry or {}).get("parts", [])]
+
+
+def append_new_rows(name: str, source: Path, source_version: str, entry: dict) -> Path:
+    """
+    Ajoute à la copie Parquet les seules lignes écrites en fin de source depuis le dernier
+    rafraîchissement. L'empreinte des `source_bytes` premiers octets est comparée à celle
+    enregistrée ; si la source a été modifiée avant sa fin, ou si une ligne ajoutée n'est pas
+    plus récente que la dernière valeur connue de son entité, ValueError est levée et
+    l'appelant rematérialise tout. Seules les nouvelles lignes sont lues, puis écrites dans
+    un fichier Parquet supplémentaire (part) ; la version n'avance que si des lignes ont été
+    ajoutées. Au-delà de INCREMENTAL_MAX_PARTS parts, la copie est recompactée
+    """
+    path = PROCESSED_DATA_FILES[name]
+    time_column = entry["time_column"]
+    offset = entry["source_bytes"]
+    if source.stat().st_size < offset or _prefix_digest(source, offset) != entry["source_prefix"]:
+        raise ValueError("historique de la source révisé")
+
+    schema = pq.read_schema(path)
+    digest = hashlib.sha256()
+    watermarks = dict(entry["watermarks"])
+
+    def new_rows():
+        for chunk in read_raw_chunks(name, source, offset=offset):
+            if list(chunk.columns) != schema.names:
+                raise ValueError("colonnes de la source modifiées")
+            chunk = compact_dtypes(chunk)
+            if not _after_watermarks(chunk, time_column, entry["watermarks"]).all():
+                raise ValueError("lignes ajoutées antérieures aux dernières valeurs connues")
+            digest.update(pd.util.hash_pandas_object(chunk, index=False).to_numpy().tobytes())
+            for key, value in _watermarks(chunk, time_column).items():
+                watermarks[key] = max(watermarks.get(key, value), value)
+            yield chunk
+
+    # Part nommée par son contenu : elle est écrite (atomiquement) avant d'être référencée
+    pending = path.with_name(f".{name}.{os.getpid()}.{threading.get_ident()}.part")
+    rows, _ = _write_chunks(pending, new_rows(), schema)
+    extent = _source_extent(source)
+    if not rows:
+        _update_entry(name, source_version=source_version, **extent)
+        logger.info(f"Jeu de données '{name}' à jour (aucune nouvelle ligne)")
+        return path
+
+    previous = entry.get("data_version") or entry["source_version"]
+    version = hashlib.sha256(f"{previous}:{digest.hexdigest()}".encode()).hexdigest()
+    part = path.with_name(f"{name}.{version[:16]}.parquet")
+    os.replace(pending, part)
+    parts = [*entry.get("parts", []), part.name]
+
+    if len(parts) > INCREMENTAL_MAX_PARTS:
+        _compact(name, [path, *_part_paths(path, {"parts": parts})], source_version,
+                 data_version=version, time_column=time_column, watermarks=watermarks,
+                 chunked=entry.get("chunked", False), **extent)
+        logger.info(f"Jeu de données '{name}' : {rows} nouvelle(s) ligne(s), copie recompactée -> {path.name}")
+        return path
+
+    _update_entry(
+        name, source_version=source_version, data_version=version, watermarks=watermarks,
+        rows=entry["rows"] + rows, parts=parts, appended_rows=rows, materialized_at=time.time(), **extent,
+    )
+    logger.info(f"Jeu de données '{name}' : {rows} nouvelle(s) ligne(s) ajoutée(s) -> {part.name}")
+    return path
+
+
+def _compact(name: str, paths: list, source_version: str, **extra):
+    """Réécrit la copie et ses parts en un seul fichier, puis supprime les parts."""
+    dataset = ds.dataset([str(p) for p in paths], format="parquet")
+    batches = (batch.to_pandas() for batch in dataset.to_batches(batch_size=STREAMING_CHUNK_ROWS))
+    write_processed_chunks(name, batches, source_version, **extra)
+    for part in paths[1:]:
+        part.unlink(missing_ok=True)
+
+
+def materialize(name: str, force: bool = False) -> Path:
+    """
+    Convertit la source `name` en Parquet si elle a changé depuis la dernière matérialisation
+    (par ajout des seules nouvelles lignes pour les séries incrémentales ; force=True relit tout)
+    """
+    source = raw_path(name)
+    version = source_version(name, source)
+    path = PROCESSED_DATA_FILES[name]
+
+    entry = load_schema_registry().get(name)
+    if not force and entry and entry["source_version"] == version and path.exists():
+        return path
+
+    # Un seul processus matérialise un jeu donné ; les autres attendent puis relisent le registre
+    with file_lock(path.with_name(f".{name}.lock")):
+        return _materialize_locked(name, source, version, force)
+
+
+def _materialize_locked(name: str, source: Path, version: str, force: bool) -> Path:
+    path = PROCESSED_DATA_FILES[name]
+    entry = load_schema_registry().get(name)
+    if not force and entry and entry["source_version"] == version and path.exists():
+        return path
+
+    incremental = name in INCREMENTAL_DATASETS and source.suffix not in (".xlsx", ".xls")
+    if incremental and not force and entry and "source_prefix" in entry and path.exists():
+        try:
+            return append_new_rows(name, source, version, entry)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError, ValueError) as e:
+            logger.warning(f"Rafraîchissement incrémental impossible pour '{name}' ({e}), relecture complète")
+
+    _materialize_full(name, source, version)
+    # Les parts ajoutées à l'ancienne copie sont remplacées par la relecture complète
+    for part in _part_paths(path, entry):
+        part.unlink(missing_ok=True)
+    if incremental:
+        _record_watermarks(name, source)
+    return path
+
+
+def _materialize_full(name: str, source: Path, version: str):
+    path = PROCESSED_DATA_FILES[name]
+    if name in STREAMING_DATASETS and source.suffix not in (".xlsx", ".xls"):
+        try:
+            write_processed_chunks(name, read_raw_chunks(name, source), version, chunked=True)
+            rows = load_schema_registry()[name]["rows"]
+            logger.info(f"Jeu de données '{name}' matérialisé par blocs ({rows} lignes) -> {path.name}")
+            return
+        except (pa.ArrowInvalid, ValueError) as e:
+            # Types incohérents d'un bloc à l'autre : lecture complète
+            logger.warning(f"Matérialisation par blocs impossible pour '{name}' ({e}), lecture complète")
+
+    df = compact_dtypes(read_raw(name, source))
+    write_processed(name, df, version)
+    logger.info(f"Jeu de données '{name}' matérialisé ({len(df)} lignes) -> {path.name}")
+
+
+def materialize_all(force: bool = False) -> dict:
+    """Matérialise toutes les sources, en ignorant celles qui sont indisponibles."""
+    paths = {}
+    for name in dataset_names():
+        try:
+            paths[name] = materialize(name, force=force)
+        except Exception as e:
+            logger.warning(f"Matérialisation impossible pour '{name}' : {e}")
+    return paths
+
+
+def processed_paths(name: str) -> list:
+    """Fichiers Parquet de `name` : la copie matérialisée puis les parts ajoutées depuis."""
+    path = materialize(name)
+    return [path, *_part_paths(path, load_schema_registry().get(name))]
+
+
+def read_processed(name: str, columns=None) -> pd.DataFrame:
+    """Lit la copie colonnaire de `name`, en ne chargeant que les colonnes demandées."""
+    paths = processed_paths(name)
+    columns = list(columns) if columns is not None else None
+    if len(paths) == 1:
+        df = pd.read_parquet(paths[0], columns=columns)
+    else:
+        df = ds.dataset([str(p) for p in paths], format="parquet").to_table(columns=columns).to_pandas()
+    # Les dictionnaires des fichiers écrits par blocs suivent l'ordre d'apparition
+    for col in df.select_dtypes("category").columns:
+        categories = df[col].cat.categories
+        if not categories.is_monotonic_increasing:
+            df[col] = df[col].cat.reorder_categories(categories.sort_values())
+    return df
+
+
+def dataset_version(name: str) -> str:
+    """Version du jeu de données matérialisé (utilisée comme clé par les caches en aval)."""
+    materialize(name)
+    entry = load_schema_registry()[name]
+    return entry.get("data_version") or entry["source_version"]
+
+
+def registered_versions() -> dict:
+    """Versions enregistrées de tous les jeux déjà matérialisés (sans rien relire ni rematérialiser)."""
+    return {name: entry.get("data_version") or entry["source_version"]
+            for name, entry in load_schema_registry().items()}
@@ -0,0 +1,143 @@
+"""
+Génération des rapports en lot, sans Streamlit
+Chaque fonction report_* de reports/reports.py est exécutée dans un pool de processus ;
+figures, données fusionnées et corrélations sont écrites dans un répertoire daté
+
+Utilisation : python -m analysis.modeling.batch --workers 4
+"""
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+import inspect
+import json
+import os
+from pathlib import Path
+import time
+from typing import List, Optional
+
+from loguru import logger
+from tqdm import tqdm
+import typer
+
+from analysis.config import REPORTS_OUTPUT_DIR
+
+app = typer.Typer()
+
+
+# Rapports qui utilisent un modèle entraîné (make train) -> cible du modèle
+MODEL_REPORTS = {"report_projections": "sea_level"}
+
+
+def report_names() -> list:
+    """
+    Noms de toutes les fonctions report_* du module de rapports ; les rapports dont
+    le modèle n'a pas encore été entraîné sont écartés
+    """
+    import reports.reports as module
+    from analysis.modeling.forecast import model_versions
+
+    names = []
+    for name, func in inspect.getmembers(module, inspect.isfunction):
+        if not name.startswith("report_") or func.__module__ != module.__name__:
+            continue
+        if name in MODEL_REPORTS and not model_versions(MODEL_REPORTS[name]):
+            logger.warning(f"{name} ignoré : aucun modèle '{MODEL_REPORTS[name]}' entraîné (make train)")
+            continue
+        names.append(name)
+    return sorted(names)
+
+
+def _init_worker():
+    # Pas d'affichage dans les processus de travail
+    import matplotlib
+    matplotlib.use("Agg")
+
+
+def _write_figure(fig, directory: Path) -> list:
+    if fig is None:
+        return []
+    if hasattr(fig, "to_plotly_json"):
+        fig.write_json(directory / "figure.json")
+        fig.write_html(directory / "figure.html", include_plotlyjs="cdn")
+        return ["figure.json", "figure.html"]
+    fig.savefig(directory / "figure.png")
+    fig.savefig(directory / "figure.svg")
+    if type(fig).__module__.startswith("matplotlib"):
+        import matplotlib.pyplot as plt
+        plt.close(fig)
+    return ["figure.png", "figure.svg"]
+
+
+def run_report(name: str, output_dir: Path) -> dict:
+    """Exécute un rapport et écrit ses sorties dans output_dir/<name>."""
+    import reports.reports as module
+
+    directory = Path(output_dir) / name
+    directory.mkdir(parents=True, exist_ok=True)
+    start = time.perf_counter()
+
+    result = getattr(module, name)()
+    correlation = getattr(result, "correlation", None)
+    trend = getattr(result, "trend", None)
+
+    files = []
+    if result.data is not None:
+        result.data.to_csv(directory / "data.csv", index=False)
+        files.append("data.csv")
+    files += _write_figure(result.figure, directory)
+
+    summary = {"report": name, "seconds": time.perf_counter() - start, "files": files}
+    if correlation is not None:
+        summary["correlation"] = {"r": float(correlation[0]), "p_value": float(correlation[1])}
+        if hasattr(correlation, "ci_low"):
+            summary["correlation"].update({
+                "ci_low": correlation.ci_low,
+                "ci_high": correlation.ci_high,
+                "permutation_p_value": correlation.permutation_pvalue,
+            })
+    if trend is not None:
+        summary["trend"] = {"version": trend.version, "ols": trend.ols, "breakpoint": trend.breakpoint}
+    (directory / "stats.json").write_text(json.dumps(summary, indent=2))
+    return summary
+
+
+@app.command()
+def main(
+    output_dir: Path = REPORTS_OUTPUT_DIR,
+    workers: int = os.cpu_count() or 1,
+    only: Optional[List[str]] = typer.Option(None, help="Rapports à générer (tous par défaut)"),
+):
+    run_dir = output_dir / datetime.now().strftime("%Y-%m-%d_%H%M%S")
+    run_dir.mkdir(parents=True, exist_ok=True)
+    names = only or report_names()
+    logger.info(f"Génération de {len(names)} rapports dans {run_dir} ({workers} processus)...")
+
+    results, failures = [], []
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = {pool.submit(run_report, name, run_dir): name for name in names}
+        for future in tqdm(as_completed(futures), total=len(futures)):
+            name = futures[future]
+            try:
+                result = future.result()
+                results.append(result)
+                logger.info(f"{name} : {result['seconds']:.2f}s")
+            except Exception as e:
+                failures.append({"report": name, "error": str(e)})
+                logger.error(f"{name} : échec ({e})")
+
+    (run_dir / "summary.json").write_text(json.dumps({
+        "started_at": run_dir.name,
+        "wall_time": time.perf_counter() - start,
+        "reports": sorted(results, key=lambda r: r["report"]),
+        "failures": failures,
+    }, indent=2))
+
+    if failures:
+        logger.error(f"{len(failures)} rapport(s) en échec")
+        raise typer.Exit(code=1)
+    logger.success(f"Rapports générés en {time.perf_counter() - start:.2f}s.")
+
+
+if __name__ == "__main__":
+    app()
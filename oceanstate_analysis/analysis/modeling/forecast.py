@@ -0,0 +1,161 @@
+"""
+Modèles autorégressifs à variables explicatives (ARX) des séries mondiales annuelles
+La cible de l'année t (ou sa variation annuelle si d = 1, comme l'intégration d'un ARIMA)
+est régressée (ridge) sur ses p valeurs précédentes et sur les variables explicatives des
+années t..t-q. L'ajustement passe par une seule SVD du plan d'expérience, qui donne d'un
+coup les coefficients de toutes les pénalités testées ; les projections de plusieurs
+scénarios sont calculées ensemble, une année par itération
+"""
+
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+import json
+import os
+from pathlib import Path
+import threading
+
+import numpy as np
+
+from analysis.config import MODELS_DIR
+from analysis.features import feature_names
+
+# Cible -> variables explicatives
+FORECAST_TARGETS = {
+    "sea_level": ["co2", "temperature_anomaly", "glacier"],
+    "ohc": ["co2", "temperature_anomaly"],
+}
+
+TARGET_LABELS = {
+    "sea_level": "Niveau moyen de la mer (mm)",
+    "ohc": "Contenu thermique de l'océan 0-2000 m (10^22 J)",
+}
+
+
+def ridge_path(X: np.ndarray, y: np.ndarray, alphas) -> tuple:
+    """
+    Ridge sur variables standardisées pour toutes les pénalités `alphas` (une SVD)
+    Returns: (coefficients k x A sur l'échelle standardisée, moyennes, écarts-types, moyenne de y)
+    """
+    mean = X.mean(axis=0)
+    scale = X.std(axis=0)
+    scale[scale == 0] = 1.0
+    Xs = (X - mean) / scale
+    y_mean = y.mean()
+
+    U, s, Vt = np.linalg.svd(Xs, full_matrices=False)
+    alphas = np.asarray(alphas, dtype="float64")
+    shrink = s[:, None] / (s[:, None] ** 2 + alphas[None, :])
+    coefs = Vt.T @ (shrink * (U.T @ (y - y_mean))[:, None])
+    return coefs, mean, scale, y_mean
+
+
+def rolling_origin_errors(X: np.ndarray, y: np.ndarray, alphas, n_folds: int, min_train: int) -> np.ndarray:
+    """
+    Erreurs de prévision à un an, origine glissante sur les `n_folds` dernières années :
+    chaque année est prédite par un modèle ajusté sur les seules années antérieures
+    Returns: matrice n_folds x A (une colonne par pénalité)
+    """
+    n = len(y)
+    first = max(n - n_folds, min_train)
+    errors = []
+    for origin in range(first, n):
+        coefs, mean, scale, y_mean = ridge_path(X[:origin], y[:origin], alphas)
+        prediction = ((X[origin] - mean) / scale) @ coefs + y_mean
+        errors.append(prediction - y[origin])
+    return np.array(errors).reshape(-1, len(alphas))
+
+
+@dataclass
+class ARXModel:
+    target: str
+    drivers: list
+    p: int
+    q: int
+    d: int
+    alpha: float
+    coef: list
+    mean: list
+    scale: list
+    intercept: float
+    # Dernières valeurs observées (plus ancienne en premier) et dernière année complète
+    history: dict
+    last_year: int
+    data_version: str
+    metrics: dict = field(default_factory=dict)
+    version: str = None
+    trained_at: str = None
+
+    @property
+    def features(self) -> list:
+        return feature_names(self.target, self.drivers, self.p, self.q)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Cible (variation annuelle si d = 1) pour des lignes du plan d'expérience (n x k)."""
+        X = np.asarray(X, dtype="float64")
+        return ((X - np.asarray(self.mean)) / np.asarray(self.scale)) @ np.asarray(self.coef) + self.intercept
+
+    def simulate(self, horizon: int, drivers: dict = None, n: int = 1) -> np.ndarray:
+        """
+        Projections de la cible sur `horizon` années après last_year pour n scénarios
+        - drivers : variable explicative -> trajectoire future (horizon,) ou (n, horizon) ;
+          une variable absente reste à sa dernière valeur observée
+        Returns: matrice n x horizon
+        """
+        drivers = drivers or {}
+        for values in drivers.values():
+            values = np.asarray(values)
+            if values.ndim == 2:
+                n = max(n, values.shape[0])
+
+        levels = np.asarray(self.history[self.target], dtype="float64")
+        series = np.diff(levels) if self.d else levels
+        target = np.tile(series[-self.p:], (n, 1))
+        paths = []
+        for driver in self.drivers:
+            past = np.asarray(self.history[driver][-self.q:] if self.q else [], dtype="float64")
+            future = drivers.get(driver)
+            if future is None:
+                future = np.full(horizon, self.history[driver][-1])
+            future = np.broadcast_to(np.asarray(future, dtype="float64"), (n, horizon))
+            paths.append(np.hstack([np.tile(past, (n, 1)), future]))
+
+        coef = np.asarray(self.coef)
+        mean, scale = np.asarray(self.mean), np.asarray(self.scale)
+        out = np.empty((n, horizon))
+        for h in range(horizon):
+            # Retards 1..p de la cible (le plus récent en premier), puis t..t-q de chaque variable
+            columns = [target[:, ::-1]]
+            columns += [path[:, h:h + self.q + 1][:, ::-1] for path in paths]
+            out[:, h] = ((np.hstack(columns) - mean) / scale) @ coef + self.intercept
+            target = np.hstack([target[:, 1:], out[:, h:h + 1]])
+        return levels[-1] + np.cumsum(out, axis=1) if self.d else out
+
+    def save(self, directory: Path = MODELS_DIR) -> Path:
+        """Écrit le modèle comme nouvelle version dans directory/<cible>/<version>.json."""
+        now = datetime.now(timezone.utc)
+        self.trained_at = now.isoformat(timespec="seconds")
+        # Microsecondes : deux entraînements dans la même seconde restent deux versions
+        self.version = f"{now:%Y%m%dT%H%M%S%f}-{self.data_version[:8]}"
+        path = Path(directory) / self.target / f"{self.version}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Fichier temporaire hors du motif *.json : le service ne lit jamais un modèle à moitié écrit
+        tmp = path.with_name(f".{self.version}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps(asdict(self), indent=2))
+        os.replace(tmp, path)
+        return path
+
+    @classmethod
+    def load(cls, path: Path) -> "ARXModel":
+        return cls(**json.loads(Path(path).read_text()))
+
+
+def model_versions(target: str, directory: Path = MODELS_DIR) -> list:
+    """Fichiers des versions du modèle de `target`, de la plus ancienne à la plus récente."""
+    return sorted((Path(directory) / target).glob("*.json"))
+
+
+def latest_model(target: str, directory: Path = MODELS_DIR) -> ARXModel:
+    versions = model_versions(target, directory)
+    if not versions:
+        raise FileNotFoundError(f"Aucun modèle entraîné pour '{target}' dans {directory}")
+    return ARXModel.load(versions[-1])
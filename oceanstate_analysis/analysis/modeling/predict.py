@@ -1,29 +1,319 @@
+"""
+Prévisions par scénarios avec les modèles entraînés (analysis/modeling/train.py)
+Un scénario est une ligne : cible, horizon (années) et, pour chaque variable explicative,
+une croissance relative annuelle (<variable>_growth, 0.01 = +1 %/an) et/ou une tendance
+absolue (<variable>_trend) appliquées à sa dernière valeur observée. Tous les scénarios
+d'une même cible sont projetés en un seul appel vectorisé. Les modèles sont gardés en
+mémoire (rechargés seulement quand une nouvelle version est entraînée) et le service
+regroupe en micro-lots les demandes concurrentes, en processus ou par HTTP
+
+Utilisation : python -m analysis.modeling.predict batch --scenarios scenarios.csv
+              python -m analysis.modeling.predict serve --port 8502
+"""
+
+from concurrent.futures import Future, TimeoutError
+import functools
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
 from pathlib import Path
+import queue
+import threading
+import time
+from typing import List, Optional
 
 from loguru import logger
-from tqdm import tqdm
+import numpy as np
+import pandas as pd
 import typer
 
-from oceanstate_analysis.analysis.config import MODELS_DIR, PROCESSED_DATA_DIR
+from analysis.config import MODELS_DIR, PREDICT_MAX_BATCH, PREDICT_MAX_WAIT, PREDICT_PORT, PROCESSED_DATA_DIR
+from analysis.modeling.forecast import FORECAST_TARGETS, ARXModel, model_versions
 
 app = typer.Typer()
 
+MAX_HORIZON = 100
+
+
+class ScenarioError(ValueError):
+    """Scénario invalide : erreur de la demande, et non du modèle ou du service."""
+
+
+class ModelCache:
+    """Dernière version du modèle de chaque cible, lue une seule fois par version."""
+
+    def __init__(self, directory: Path = MODELS_DIR):
+        self.directory = Path(directory)
+        self._models = {}  # cible -> (fichier, modèle)
+        self._lock = threading.Lock()
+
+    def get(self, target: str) -> ARXModel:
+        versions = model_versions(target, self.directory)
+        if not versions:
+            raise FileNotFoundError(f"Aucun modèle entraîné pour '{target}' (make train)")
+        with self._lock:
+            entry = self._models.get(target)
+            if entry is None or entry[0] != versions[-1]:
+                entry = (versions[-1], ARXModel.load(versions[-1]))
+                self._models[target] = entry
+                logger.info(f"Modèle '{target}' version {entry[1].version} chargé")
+            return entry[1]
+
+    def versions(self) -> dict:
+        return {target: self.get(target).version for target in FORECAST_TARGETS
+                if model_versions(target, self.directory)}
+
+
+def validate(scenarios: pd.DataFrame) -> pd.DataFrame:
+    """Contrôle des colonnes cible/horizon ; lève ScenarioError si un scénario est invalide."""
+    if not {"target", "horizon"} <= set(scenarios.columns):
+        raise ScenarioError("Chaque scénario doit avoir une cible (target) et un horizon")
+    unknown = set(scenarios["target"]) - set(FORECAST_TARGETS)
+    if unknown:
+        raise ScenarioError(f"Cible(s) inconnue(s) : {', '.join(sorted(map(str, unknown)))}")
+    horizon = pd.to_numeric(scenarios["horizon"], errors="coerce")
+    if (horizon.isna().any() or (horizon != horizon.round()).any()
+            or (horizon < 1).any() or (horizon > MAX_HORIZON).any()):
+        raise ScenarioError(f"L'horizon doit être un entier entre 1 et {MAX_HORIZON}")
+    return scenarios.assign(horizon=horizon.astype(int))
+
+
+def _column(group: pd.DataFrame, name: str) -> np.ndarray:
+    if name not in group.columns:
+        return np.zeros(len(group))
+    return pd.to_numeric(group[name], errors="coerce").fillna(0.0).to_numpy("float64")
+
+
+def driver_paths(model: ARXModel, group: pd.DataFrame, horizon: int) -> dict:
+    """Trajectoires futures (n x horizon) de chaque variable explicative des scénarios `group`."""
+    steps = np.arange(1, horizon + 1)
+    paths = {}
+    for driver in model.drivers:
+        last = model.history[driver][-1]
+        growth = _column(group, f"{driver}_growth")[:, None]
+        trend = _column(group, f"{driver}_trend")[:, None]
+        paths[driver] = last * (1 + growth) ** steps + trend * steps
+    return paths
+
+
+def predict_scenarios(scenarios: pd.DataFrame, cache: ModelCache = None) -> pd.DataFrame:
+    """
+    Projections de tous les scénarios (un appel vectorisé par cible)
+    Returns: une ligne par scénario et par année (scenario = index de la ligne d'entrée)
+    """
+    cache = cache or default_cache()
+    scenarios = validate(scenarios)
+    frames = []
+    for target, group in scenarios.groupby("target", sort=False):
+        model = cache.get(target)
+        horizon = int(group["horizon"].max())
+        values = model.simulate(horizon, driver_paths(model, group, horizon), n=len(group))
+
+        # Chaque scénario ne garde que ses propres années
+        rows, steps = np.nonzero(np.arange(horizon)[None, :] < group["horizon"].to_numpy()[:, None])
+        frames.append(pd.DataFrame({
+            "scenario": group.index.to_numpy()[rows],
+            "target": target,
+            "year": model.last_year + 1 + steps,
+            "step": steps + 1,
+            "prediction": values[rows, steps],
+            "model_version": model.version,
+        }))
+    if not frames:
+        return pd.DataFrame(columns=["scenario", "target", "year", "step", "prediction", "model_version"])
+    return pd.concat(frames, ignore_index=True).sort_values(["scenario", "step"], ignore_index=True)
+
+
+def scenario_grid(targets=None, co2_growth=(-0.02, 0.0, 0.01, 0.02), horizon: int = 30) -> pd.DataFrame:
+    """Scénarios de référence : chaque cible x chaque croissance annuelle des émissions de CO2."""
+    return pd.DataFrame([
+        {"target": target, "horizon": horizon, "co2_growth": growth}
+        for target in targets or FORECAST_TARGETS
+        for growth in co2_growth
+    ])
+
+
+class PredictionService:
+    """
+    Service de prévision en processus : les demandes soumises depuis plusieurs threads
+    (sessions Streamlit, requêtes HTTP) sont regroupées en un lot pendant au plus
+    `max_wait` secondes ou jusqu'à `max_batch` scénarios, puis projetées ensemble
+    """
+
+    def __init__(self, cache: ModelCache = None, max_batch: int = PREDICT_MAX_BATCH,
+                 max_wait: float = PREDICT_MAX_WAIT):
+        self.cache = cache or ModelCache()
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.batches = 0
+        self.scenarios = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="predict-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, scenarios) -> Future:
+        """Demande de projection (dict, liste de dicts ou DataFrame) ; le Future renvoie un DataFrame."""
+        if isinstance(scenarios, dict):
+            scenarios = [scenarios]
+        try:
+            frame = pd.DataFrame(scenarios).reset_index(drop=True)
+        except (ValueError, TypeError) as e:
+            raise ScenarioError(f"Scénarios illisibles : {e}") from e
+        frame = validate(frame)
+        future = Future()
+        self._queue.put((frame, future))
+        return future
+
+    def predict(self, scenarios, timeout: float = None) -> pd.DataFrame:
+        return self.submit(scenarios).result(timeout)
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            size = len(batch[0][0])
+            deadline = time.monotonic() + self.max_wait
+            while size < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+                size += len(batch[-1][0])
+            try:
+                self._score(batch)
+            except Exception as e:
+                # Le fil de regroupement ne doit jamais s'arrêter : les demandes restantes échouent
+                logger.exception("Échec du lot de prévisions")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _predict(self, batch) -> list:
+        """Projections de tout le lot, découpées par demande."""
+        combined = pd.concat([frame for frame, _ in batch], keys=range(len(batch)), names=["request", "position"])
+        index = combined.index
+        results = predict_scenarios(combined.reset_index(drop=True), self.cache)
+        requests = index.get_level_values("request").to_numpy()[results["scenario"].to_numpy()]
+        results["scenario"] = index.get_level_values("position").to_numpy()[results["scenario"].to_numpy()]
+        self.batches += 1
+        self.scenarios += len(combined)
+        return [results[requests == request].reset_index(drop=True) for request in range(len(batch))]
+
+    def _score(self, batch):
+        try:
+            results = self._predict(batch)
+        except Exception as e:
+            # Un lot en échec est rejoué demande par demande : seule la demande fautive échoue
+            if len(batch) > 1:
+                for item in batch:
+                    self._score([item])
+            else:
+                batch[0][1].set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            # Une demande abandonnée (Future annulé) n'attend plus de résultat
+            if not future.cancelled():
+                future.set_result(result)
+
+    def stats(self) -> dict:
+        return {"batches": self.batches, "scenarios": self.scenarios, "pending": self._queue.qsize()}
+
+
+@functools.lru_cache(maxsize=None)
+def default_cache() -> ModelCache:
+    return ModelCache()
+
+
+@functools.lru_cache(maxsize=None)
+def default_service() -> PredictionService:
+    """Service partagé par tout le processus (modèles en mémoire, micro-lots communs)."""
+    return PredictionService(default_cache())
+
+
+class PredictionHandler(BaseHTTPRequestHandler):
+    """API HTTP : POST /predict {"scenarios": [...]}, GET /models, GET /health."""
+    service: PredictionService = None
+
+    def _send(self, status: int, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send(200, {"status": "ok", **self.service.stats()})
+        elif self.path == "/models":
+            self._send(200, self.service.cache.versions())
+        else:
+            self._send(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path != "/predict":
+            self._send(404, {"error": "not found"})
+            return
+        try:
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            scenarios = payload["scenarios"] if isinstance(payload, dict) else payload
+        except (ValueError, KeyError, TypeError) as e:
+            self._send(400, {"error": f"Requête illisible : {e}"})
+            return
+        try:
+            results = self.service.predict(scenarios, timeout=30)
+        except ScenarioError as e:
+            self._send(400, {"error": str(e)})
+        except FileNotFoundError as e:
+            self._send(503, {"error": str(e)})
+        except TimeoutError:
+            self._send(504, {"error": "Délai de prévision dépassé"})
+        except Exception as e:
+            logger.exception("Échec de la prévision")
+            self._send(500, {"error": str(e)})
+        else:
+            self._send(200, {"predictions": results.to_dict(orient="records")})
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} {format % args}")
+
+
+def make_server(host: str = "127.0.0.1", port: int = PREDICT_PORT, service: PredictionService = None):
+    handler = type("Handler", (PredictionHandler,), {"service": service or default_service()})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+@app.command()
+def batch(
+    scenarios_path: Optional[Path] = typer.Option(None, "--scenarios", help="CSV des scénarios (grille de référence par défaut)"),
+    predictions_path: Path = typer.Option(PROCESSED_DATA_DIR / "predictions.csv", "--output"),
+    horizon: int = typer.Option(30, help="Horizon de la grille de référence"),
+    targets: Optional[List[str]] = typer.Option(None, "--target", help="Cibles de la grille de référence"),
+):
+    scenarios = pd.read_csv(scenarios_path) if scenarios_path else scenario_grid(targets, horizon=horizon)
+    start = time.perf_counter()
+    predictions = predict_scenarios(scenarios)
+    predictions_path.parent.mkdir(parents=True, exist_ok=True)
+    predictions.to_csv(predictions_path, index=False)
+    logger.success(f"{len(scenarios)} scénarios projetés en {time.perf_counter() - start:.3f}s "
+                   f"({len(predictions)} lignes) -> {predictions_path}")
+
 
 @app.command()
-def main(
-    # ---- REPLACE DEFAULT PATHS AS APPROPRIATE ----
-    features_path: Path = PROCESSED_DATA_DIR / "test_features.csv",
-    model_path: Path = MODELS_DIR / "model.pkl",
-    predictions_path: Path = PROCESSED_DATA_DIR / "test_predictions.csv",
-    # -----------------------------------------
+def serve(
+    host: str = typer.Option("127.0.0.1", help="Adresse d'écoute"),
+    port: int = typer.Option(PREDICT_PORT, help="Port de l'API"),
 ):
-    # ---- REPLACE THIS WITH YOUR OWN CODE ----
-    logger.info("Performing inference for model...")
-    for i in tqdm(range(10), total=10):
-        if i == 5:
-            logger.info("Something happened for iteration 5.")
-    logger.success("Inference complete.")
-    # -----------------------------------------
+    server = make_server(host, port)
+    logger.info(f"API de prévision sur http://{host}:{port} (POST /predict, GET /models, GET /health)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
 
 
 if __name__ == "__main__":
@@ -1,29 +1,164 @@
+"""
+Entraînement des modèles de prévision du niveau de la mer et de la chaleur océanique
+Les plans d'expérience décalés sont construits depuis les séries annuelles traitées ;
+chaque combinaison (p, q, d) de la grille est évaluée dans un processus de travail par
+validation à origine glissante, toutes les pénalités ridge à la fois. Le meilleur modèle
+de chaque cible est réajusté sur toutes les années et enregistré comme nouvelle version
+dans MODELS_DIR/<cible>/ ; rien n'est réentraîné si les données et la grille n'ont pas
+changé depuis la dernière version
+
+Utilisation : python -m analysis.modeling.train --workers 4
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import itertools
+import os
 from pathlib import Path
+import time
+from typing import List, Optional
 
 from loguru import logger
-from tqdm import tqdm
+import numpy as np
+import pandas as pd
 import typer
 
-from oceanstate_analysis.analysis.config import MODELS_DIR, PROCESSED_DATA_DIR
+from analysis.config import MODELS_DIR
+from analysis.features import lagged_design, yearly_frame
+from analysis.modeling.forecast import (
+    FORECAST_TARGETS,
+    ARXModel,
+    model_versions,
+    ridge_path,
+    rolling_origin_errors,
+)
 
 app = typer.Typer()
 
+# Grille : retards de la cible, retards des variables explicatives, différenciation
+LAGS = (1, 2, 3, 4)
+DRIVER_LAGS = (0, 1, 2, 3)
+DIFFERENCES = (0, 1)
+ALPHAS = np.logspace(-3, 3, 13)
+CV_FOLDS = 15
+MIN_TRAIN = 20
+
+
+def grid_signature() -> str:
+    grid = (LAGS, DRIVER_LAGS, DIFFERENCES, ALPHAS.tolist(), CV_FOLDS, MIN_TRAIN)
+    return hashlib.sha256(repr(grid).encode()).hexdigest()[:16]
+
+
+def _prepare(frame: pd.DataFrame, target: str, d: int) -> pd.DataFrame:
+    return frame.assign(**{target: frame[target].diff()}) if d else frame
+
+
+def evaluate(frame: pd.DataFrame, target: str, drivers: list, p: int, q: int, d: int) -> dict:
+    """Erreur de prévision à un an (RMSE) de la meilleure pénalité pour une combinaison (p, q, d)."""
+    X, y, _ = lagged_design(_prepare(frame, target, d), target, drivers, p, q)
+    result = {"target": target, "p": p, "q": q, "d": d, "alpha": None, "rmse": np.inf}
+    if len(y) <= MIN_TRAIN:
+        return result
+    errors = rolling_origin_errors(X, y, ALPHAS, CV_FOLDS, MIN_TRAIN)
+    rmse = np.sqrt(np.mean(errors ** 2, axis=0))
+    best = int(np.argmin(rmse))
+    return dict(result, alpha=float(ALPHAS[best]), rmse=float(rmse[best]), folds=len(errors))
+
+
+def fit(frame: pd.DataFrame, target: str, drivers: list, p: int, q: int, d: int,
+        alpha: float, data_version: str) -> ARXModel:
+    """Ajuste la combinaison retenue sur toutes les années disponibles."""
+    X, y, years = lagged_design(_prepare(frame, target, d), target, drivers, p, q)
+    coefs, mean, scale, y_mean = ridge_path(X, y, [alpha])
+    coef = coefs[:, 0]
+
+    residuals = ((X - mean) / scale) @ coef + y_mean - y
+    last_year = int(years[-1])
+    width = max(p + d, q, 1)
+    history = {name: frame.loc[last_year - width + 1:last_year, name].tolist() for name in [target, *drivers]}
+    return ARXModel(
+        target=target, drivers=list(drivers), p=p, q=q, d=d, alpha=alpha,
+        coef=coef.tolist(), mean=mean.tolist(), scale=scale.tolist(), intercept=float(y_mean),
+        history=history, last_year=last_year, data_version=data_version,
+        metrics={
+            "rmse_train": float(np.sqrt(np.mean(residuals ** 2))),
+            "r2_train": float(1 - np.sum(residuals ** 2) / np.sum((y - y.mean()) ** 2)),
+            "observations": int(len(y)),
+            "first_year": int(years[0]),
+            "grid": grid_signature(),
+        },
+    )
+
+
+def _data_version(versions: dict) -> str:
+    return hashlib.sha256(repr(sorted(versions.items())).encode()).hexdigest()
+
+
+def _up_to_date(target: str, data_version: str, directory: Path) -> bool:
+    versions = model_versions(target, directory)
+    if not versions:
+        return False
+    latest = ARXModel.load(versions[-1])
+    return latest.data_version == data_version and latest.metrics.get("grid") == grid_signature()
+
+
+def train(targets=None, workers: int = None, force: bool = False, directory: Path = MODELS_DIR) -> dict:
+    """
+    Recherche des hyperparamètres en parallèle puis enregistrement du meilleur modèle par cible
+    Returns: cible -> ARXModel (nouvelle version ou dernière version si déjà à jour)
+    """
+    targets = list(targets or FORECAST_TARGETS)
+    frames = {}
+    for target in targets:
+        drivers = FORECAST_TARGETS[target]
+        frame, versions = yearly_frame([target, *drivers])
+        data_version = _data_version(versions)
+        if not force and _up_to_date(target, data_version, directory):
+            logger.info(f"Modèle '{target}' à jour (données inchangées)")
+            continue
+        frames[target] = (frame, drivers, data_version)
+
+    models = {target: ARXModel.load(model_versions(target, directory)[-1])
+              for target in targets if target not in frames}
+    if not frames:
+        return models
+
+    combos = list(itertools.product(LAGS, DRIVER_LAGS, DIFFERENCES))
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            target: [pool.submit(evaluate, frame, target, drivers, p, q, d) for p, q, d in combos]
+            for target, (frame, drivers, _) in frames.items()
+        }
+        results = {target: [future.result() for future in items] for target, items in futures.items()}
+    logger.info(f"Recherche de {len(combos)} combinaisons x {len(ALPHAS)} pénalités "
+                f"pour {len(frames)} cible(s) en {time.perf_counter() - start:.2f}s")
+
+    for target, (frame, drivers, data_version) in frames.items():
+        best = min(results[target], key=lambda result: result["rmse"])
+        if not np.isfinite(best["rmse"]):
+            logger.warning(f"Pas assez d'années communes pour entraîner '{target}'")
+            continue
+        model = fit(frame, target, drivers, best["p"], best["q"], best["d"], best["alpha"], data_version)
+        model.metrics["rmse_cv"] = best["rmse"]
+        path = model.save(directory)
+        models[target] = model
+        logger.success(f"Modèle '{target}' (p={model.p}, q={model.q}, d={model.d}, alpha={model.alpha:g}, "
+                       f"RMSE validation {best['rmse']:.4g}) enregistré dans {path}")
+    return models
+
 
 @app.command()
 def main(
-    # ---- REPLACE DEFAULT PATHS AS APPROPRIATE ----
-    features_path: Path = PROCESSED_DATA_DIR / "features.csv",
-    labels_path: Path = PROCESSED_DATA_DIR / "labels.csv",
-    model_path: Path = MODELS_DIR / "model.pkl",
-    # -----------------------------------------
+    targets: Optional[List[str]] = typer.Option(None, "--target", help="Cible(s) à entraîner (toutes par défaut)"),
+    workers: int = typer.Option(os.cpu_count() or 1, help="Processus pour la recherche d'hyperparamètres"),
+    force: bool = typer.Option(False, help="Réentraîner même si les données n'ont pas changé"),
+    models_dir: Path = typer.Option(MODELS_DIR, help="Répertoire des modèles versionnés"),
 ):
-    # ---- REPLACE THIS WITH YOUR OWN CODE ----
-    logger.info("Training some model...")
-    for i in tqdm(range(10), total=10):
-        if i == 5:
-            logger.info("Something happened for iteration 5.")
-    logger.success("Modeling training complete.")
-    # -----------------------------------------
+    unknown = set(targets or []) - set(FORECAST_TARGETS)
+    if unknown:
+        raise typer.BadParameter(f"Cible(s) inconnue(s) : {', '.join(sorted(unknown))}")
+    train(targets, workers=workers, force=force, directory=models_dir)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,139 @@
+"""
+Représentation compacte des tables par pays (panels)
+Les colonnes Entity et Code de tous les jeux de données sont encodées sur un même
+dictionnaire par colonne, partagé par le processus : chaque ligne ne porte qu'un code
+entier, les libellés ne sont stockés qu'une fois et les tables issues de jeux différents
+(ou de blocs différents d'un même jeu) partagent les mêmes catégories. Le dictionnaire
+s'agrandit quand un libellé nouveau apparaît : concaténations et jointures passent par
+concat_panels / merge_panels, qui recodent les tables encodées plus tôt sur son état
+courant pour qu'elles restent catégorielles. Années en int16, mesures en float32
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from .config import PROCESSED_DATA_FILES
+from .materialize import CATEGORY_COLUMNS, YEAR_COLUMNS, _part_paths, load_schema_registry
+
+
+class SharedDictionary:
+    """
+    Dictionnaire trié des libellés d'une colonne, commun à tous les jeux de données
+    Il ne fait que s'agrandir : les tables déjà encodées gardent leur type (toujours valide),
+    et align_panels les recode sur le type courant avant de les combiner
+    """
+
+    def __init__(self, column: str):
+        self.column = column
+        self._dtype = None
+        self._lock = threading.Lock()
+
+    def _prime(self) -> set:
+        # Libellés de toutes les copies Parquet déjà matérialisées (seule la colonne est lue)
+        labels = set()
+        registry = load_schema_registry()
+        for name, path in PROCESSED_DATA_FILES.items():
+            if not path.exists():
+                continue
+            for file in [path, *_part_paths(path, registry.get(name))]:
+                if file.exists() and self.column in pq.read_schema(file).names:
+                    column = pq.read_table(file, columns=[self.column]).column(0)
+                    labels.update(value for value in column.unique().to_pylist() if value is not None)
+        return labels
+
+    @property
+    def dtype(self) -> pd.CategoricalDtype:
+        with self._lock:
+            if self._dtype is None:
+                self._dtype = pd.CategoricalDtype(sorted(self._prime()))
+            return self._dtype
+
+    def encode(self, values: pd.Series) -> pd.Series:
+        """`values` sur le dictionnaire partagé (agrandi si des libellés sont nouveaux)."""
+        dtype = self.dtype
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            if values.dtype is dtype or values.cat.categories.equals(dtype.categories):
+                return values
+            labels = values.cat.categories
+        else:
+            labels = pd.Index(values.dropna().unique())
+        missing = labels.difference(dtype.categories)
+        if len(missing):
+            with self._lock:
+                union = self._dtype.categories.union(missing.astype(str))
+                self._dtype = pd.CategoricalDtype(union.sort_values())
+                dtype = self._dtype
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            # Recodage des seuls codes : table de correspondance ancien code -> nouveau code
+            mapping = np.append(dtype.categories.get_indexer(labels), -1)
+            codes = mapping[values.cat.codes.to_numpy()]
+            return pd.Series(pd.Categorical.from_codes(codes, dtype=dtype), index=values.index, name=values.name)
+        return values.astype(dtype)
+
+
+DICTIONARIES = {column: SharedDictionary(column) for column in CATEGORY_COLUMNS}
+
+
+def _encode_dictionaries(df: pd.DataFrame) -> pd.DataFrame:
+    columns = {}
+    for col in df.columns:
+        if col in DICTIONARIES:
+            encoded = DICTIONARIES[col].encode(df[col])
+            if encoded is not df[col]:
+                columns[col] = encoded
+    return df.assign(**columns) if columns else df
+
+
+def align_panels(frames) -> list:
+    """Tables dont les colonnes Entity/Code sont recodées sur l'état courant des dictionnaires."""
+    frames = list(frames)
+    # Le premier passage peut encore agrandir un dictionnaire (libellés non encodés) ;
+    # le second recode toutes les tables sur son état final
+    for _ in range(2):
+        frames = [_encode_dictionaries(df) for df in frames]
+    return frames
+
+
+def concat_panels(frames, **kwargs) -> pd.DataFrame:
+    """pd.concat de tables alignées sur les dictionnaires partagés (Entity/Code restent catégorielles)."""
+    return pd.concat(align_panels(frames), **kwargs)
+
+
+def merge_panels(left: pd.DataFrame, right: pd.DataFrame, **kwargs) -> pd.DataFrame:
+    """DataFrame.merge de tables alignées sur les dictionnaires partagés."""
+    left, right = align_panels([left, right])
+    return left.merge(right, **kwargs)
+
+
+def compact_panel(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Table au format panel : Entity/Code sur les dictionnaires partagés, années en int16
+    et mesures en float32. Les colonnes déjà au bon type ne sont pas copiées
+    """
+    columns = {}
+    for col in df.columns:
+        series = df[col]
+        if col in DICTIONARIES:
+            encoded = DICTIONARIES[col].encode(series)
+            if encoded is not series:
+                columns[col] = encoded
+        elif col in YEAR_COLUMNS and pd.api.types.is_integer_dtype(series) and series.dtype != "int16":
+            columns[col] = series.astype("int16")
+        elif pd.api.types.is_float_dtype(series) and series.dtype != "float32":
+            columns[col] = series.astype("float32")
+    return df.assign(**columns) if columns else df
+
+
+def frame_nbytes(df: pd.DataFrame) -> int:
+    """Mémoire propre à `df` (les dictionnaires partagés ne sont pas comptés)."""
+    total = 0
+    for col in df.columns:
+        series = df[col]
+        if col in DICTIONARIES and series.dtype == DICTIONARIES[col].dtype:
+            total += series.cat.codes.nbytes
+        else:
+            total += int(series.memory_usage(deep=True, index=False))
+    return total + int(df.index.memory_usage(deep=True))
@@ -0,0 +1,179 @@
+"""
+Stockage partitionné par entité des tables par pays
+La copie Parquet est réécrite triée par entité (PROCESSED_DATA_DIR/partitions), avec un
+groupe de lignes par entité et un index {entité: groupe} stocké dans les métadonnées du
+fichier lui-même : la série d'une entité se lit sans décoder les autres, et l'index lu
+est toujours celui des données lues, même si un autre processus remplace le fichier.
+Les séries dérivées (ex. série mondiale des anomalies de température avec moyennes
+glissantes et anomalies par rapport aux périodes de référence) sont matérialisées en
+même temps que les partitions, à chaque nouvelle version de la source
+"""
+
+import json
+import os
+import threading
+
+from loguru import logger
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .config import PARTITIONED_DATASETS, PROCESSED_DATA_DIR
+from .locks import file_lock
+from .materialize import _time_column, dataset_version, read_processed
+from .panels import compact_panel
+from .registry import datasets
+
+PARTITIONS_DIR = PROCESSED_DATA_DIR / "partitions"
+PARTITIONS_DIR.mkdir(parents=True, exist_ok=True)
+
+TEMPERATURE_ANOMALY = "near_surface_temperature_anomaly"
+# Fenêtres des moyennes glissantes (années) et périodes de référence des anomalies
+WARMING_WINDOWS = [10, 30]
+WARMING_BASELINES = {
+    "1850_1900": (1850, 1900),
+    "1991_2020": (1991, 2020),
+}
+
+# Clé des métadonnées Parquet qui porte l'index {entité: groupe de lignes}
+INDEX_METADATA_KEY = b"oceanstate.partitions"
+
+_lock = threading.Lock()
+
+
+def _paths(name, suffix=""):
+    return PARTITIONS_DIR / f"{name}{suffix}.parquet", PARTITIONS_DIR / f"{name}.json"
+
+
+def warming_series(df: pd.DataFrame) -> tuple:
+    """
+    Série d'anomalies de température complétée de moyennes glissantes et des anomalies
+    recalculées par rapport à chaque période de référence
+    Returns: (DataFrame, moyennes de référence)
+    """
+    df = df.sort_values("Year").reset_index(drop=True)
+    values = df[TEMPERATURE_ANOMALY]
+    columns = {}
+    for window in WARMING_WINDOWS:
+        columns[f"rolling_mean_{window}y"] = values.rolling(window, min_periods=window).mean()
+
+    baselines = {}
+    for label, (start, end) in WARMING_BASELINES.items():
+        reference = values[df["Year"].between(start, end)].mean()
+        baselines[label] = None if np.isnan(reference) else float(reference)
+        columns[f"anomaly_vs_{label}"] = values - reference
+    return df.assign(**columns), baselines
+
+
+# Séries dérivées matérialisées avec les partitions : jeu -> {entité: construction}
+DERIVED_SERIES = {
+    "global_warning": {"World": warming_series},
+}
+
+
+def _write_partitions(name: str, df: pd.DataFrame, key: str, path) -> dict:
+    """Écrit `df` trié par `key`, un groupe de lignes par entité ; renvoie l'index."""
+    time_column = _time_column(df.columns)
+    order = [key, time_column] if time_column else [key]
+    df = df.sort_values(order, kind="stable").reset_index(drop=True)
+    keys = df[key].astype(str).to_numpy()
+    starts = np.r_[0, np.flatnonzero(keys[1:] != keys[:-1]) + 1]
+    ends = np.r_[starts[1:], len(df)]
+
+    index = {
+        keys[start]: {"row_group": group, "rows": int(end - start)}
+        for group, (start, end) in enumerate(zip(starts, ends))
+    }
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    schema = table.schema.with_metadata({
+        **(table.schema.metadata or {}),
+        INDEX_METADATA_KEY: json.dumps(index, ensure_ascii=False).encode(),
+    })
+    tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    with pq.ParquetWriter(tmp, schema) as writer:
+        for start, end in zip(starts, ends):
+            writer.write_table(table.slice(start, end - start), row_group_size=end - start)
+    os.replace(tmp, path)
+    return index
+
+
+def build(name: str) -> dict:
+    """Met à jour les partitions (et séries dérivées) de `name` ; renvoie leur index."""
+    key = PARTITIONED_DATASETS[name]
+    version = dataset_version(name)
+    data_path, meta_path = _paths(name)
+
+    # Verrou entre threads et entre processus (workers du serveur, lots)
+    with _lock, file_lock(PROCESSED_DATA_DIR / f".{name}.partitions.lock"):
+        meta = json.loads(meta_path.read_text()) if meta_path.exists() else {}
+        if meta.get("data_version") == version and data_path.exists():
+            return meta
+
+        df = read_processed(name)
+        index = _write_partitions(name, df, key, data_path)
+
+        derived = {}
+        for entity, builder in DERIVED_SERIES.get(name, {}).items():
+            if entity not in index:
+                continue
+            series, baselines = builder(df[df[key] == entity])
+            path = _paths(name, f".{entity}")[0]
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            series.to_parquet(tmp, index=False)
+            os.replace(tmp, path)
+            derived[entity] = {"path": path.name, "rows": len(series), "baselines": baselines}
+
+        meta = {"data_version": version, "key": key, "partitions": index, "derived": derived}
+        tmp = meta_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(meta, indent=2, ensure_ascii=False))
+        os.replace(tmp, meta_path)
+
+    logger.info(f"Partitions '{name}' mises à jour ({len(index)} entités, "
+                f"{len(derived)} série(s) dérivée(s))")
+    return meta
+
+
+def build_all() -> dict:
+    return {name: build(name) for name in PARTITIONED_DATASETS}
+
+
+def entities(name: str) -> list:
+    """Entités disponibles dans la table partitionnée `name`."""
+    return sorted(build(name)["partitions"])
+
+
+def read_partition(name: str, entity: str, columns=None) -> pd.DataFrame:
+    """Lignes de l'entité `entity` (seul son groupe de lignes est lu)."""
+    version = dataset_version(name)
+
+    def load():
+        build(name)
+        # Index lu dans le fichier ouvert : il correspond forcément à ses groupes de lignes
+        parquet = pq.ParquetFile(_paths(name)[0])
+        partition = json.loads(parquet.schema_arrow.metadata[INDEX_METADATA_KEY]).get(entity)
+        if partition is None:
+            raise KeyError(f"Entité '{entity}' absente de '{name}'")
+        table = parquet.read_row_group(partition["row_group"])
+        return compact_panel(table.to_pandas())
+
+    df = datasets.get(f"partition:{name}:{entity}", version, load)
+    return df[list(columns)] if columns is not None else df
+
+
+def derived_series(name: str, entity: str) -> pd.DataFrame:
+    """Série dérivée précalculée de `entity` (voir DERIVED_SERIES)."""
+    version = dataset_version(name)
+
+    def load():
+        derived = build(name)["derived"].get(entity)
+        if derived is None:
+            raise KeyError(f"Pas de série dérivée '{entity}' pour '{name}'")
+        return compact_panel(pd.read_parquet(PARTITIONS_DIR / derived["path"]))
+
+    return datasets.get(f"derived:{name}:{entity}", version, load)
+
+
+def world_warming() -> pd.DataFrame:
+    """Série mondiale des anomalies de température (moyennes glissantes, références)."""
+    return derived_series("global_warning", "World")
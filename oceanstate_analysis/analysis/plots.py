@@ -1,13 +1,48 @@
-import seaborn as sns
-import matplotlib.pyplot as plt
-from scipy.stats import pearsonr
-import plotly.graph_objects as go
-import plotly.express as px
-import statsmodels.api as sm
+"""
+Fonctions de tracé des rapports
+Les bibliothèques graphiques et statistiques (Matplotlib, seaborn, Plotly, SciPy) sont
+importées dans chaque fonction : importer ce module ne charge que pandas. Les tendances
+superposées aux séries sont ajustées à l'avance (analysis/trends.py)
+"""
 
+import functools
 
+import pandas as pd
+
+from .config import PLOT_MAX_POINTS
+from .downsampling import downsample
+from .render_cache import PYPLOT_LOCK, cached_figure
+
+
+@functools.lru_cache(maxsize=None)
+def style() -> dict:
+    """Style Matplotlib des rapports, appliqué le temps du tracé sans modifier les rcParams globaux."""
+    import seaborn as sns
+    return {**sns.axes_style("whitegrid"), "figure.figsize": (14, 8), "font.size": 12}
+
+
+def styled(func):
+    """Décorateur : trace la figure Matplotlib dans le contexte style()."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        import matplotlib.pyplot as plt
+        with PYPLOT_LOCK, plt.rc_context(style()):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def _observed(df: pd.DataFrame, column: str) -> pd.DataFrame:
+    """Retire les catégories absentes de `column` (dictionnaire partagé entre jeux de données)."""
+    if isinstance(df[column].dtype, pd.CategoricalDtype):
+        return df.assign(**{column: df[column].cat.remove_unused_categories()})
+    return df
+
+
+@cached_figure
+@styled
 def plot_ph_evolution(df):
-    plt.rcParams['figure.figsize'] = (12, 6)
+    import matplotlib.pyplot as plt
+
     fig, ax = plt.subplots(figsize=(12, 8))
 
     ax.plot(df['year'], df['Ocean_acidification(in_PH)'],
@@ -21,8 +56,14 @@ def plot_ph_evolution(df):
     plt.tight_layout()
     return fig
 
+@cached_figure
+@styled
 def plot_plastic_accumulation(df):
     """Crée un graphique de l'accumulation des microplastiques."""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    df = _observed(df, 'Entity')
     fig, ax = plt.subplots(figsize=(12, 6))
     sns.lineplot(data=df, x='year', y='amount', hue='Entity', ax=ax)
     ax.set_title("Accumulation des microplastiques dans l'océan")
@@ -30,9 +71,13 @@ def plot_plastic_accumulation(df):
     ax.set_ylabel("Quantité accumulée")
     return fig
 
+@cached_figure
+@styled
 def plot_micro_macro_plastic(df):
-    plt.rcParams['figure.figsize'] = (12, 8)
-    sns.set_style("whitegrid")
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    df = _observed(df, 'Entity')
     fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(14, 10))
 
     # Microplastiques
@@ -52,64 +97,82 @@ def plot_micro_macro_plastic(df):
     ax2.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
 
     plt.tight_layout()
-    plt.show()
+    return fig
 
+@cached_figure
+@styled
 def plot_evolution_emission_plastic(df):
-    plt.figure(figsize=(16, 10))
+    import matplotlib.pyplot as plt
 
+    # Identifier les top 10 pays pour l'année la plus récente
     latest_year = df['Year'].max()
     top_countries = df[df['Year'] == latest_year].nlargest(10, 'Imports of plastic waste via all modes of transport')
 
+    fig, ax = plt.subplots(figsize=(16, 10))
+
     for country in top_countries['Entity'].values:
         country_data = df[df['Entity'] == country]
-        plt.plot(country_data['Year'], country_data['Imports of plastic waste via all modes of transport'],
-                 marker='o', linewidth=2, label=country)
-
-    plt.title('Évolution des Déchets Plastiques Mal Gérés par Pays (Top 10)', fontsize=16, fontweight='bold')
-    plt.xlabel('Année', fontsize=12)
-    plt.ylabel('Déchets plastiques mal gérés (tonnes)', fontsize=12)
-    plt.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
-    plt.grid(True, alpha=0.3)
+        ax.plot(country_data['Year'], country_data['Imports of plastic waste via all modes of transport'],
+                marker='o', linewidth=2, label=country)
+
+    ax.set_title('Évolution des Déchets Plastiques Mal Gérés par Pays (Top 10)', fontsize=16, fontweight='bold')
+    ax.set_xlabel('Année', fontsize=12)
+    ax.set_ylabel('Déchets plastiques mal gérés (tonnes)', fontsize=12)
+    ax.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
+    ax.grid(True, alpha=0.3)
     plt.tight_layout()
-    plt.show()
+    return fig
 
-def plot_production_plastic(df):
-    plt.figure(figsize=(14, 8))
+@cached_figure
+@styled
+def plot_production_plastic(production_annuelle):
+    """Production mondiale annuelle (une ligne par année : Year, plastic_production)."""
+    import matplotlib.pyplot as plt
 
-    production_annuelle = df.groupby('Year')['plastic_production'].sum().reset_index()
+    fig, ax = plt.subplots(figsize=(14, 8))
 
-    plt.plot(production_annuelle['Year'], production_annuelle['plastic_production'],
-             marker='o', linewidth=2, markersize=6)
-    plt.title('Évolution de la Production Annuelle Mondiale de Plastique', fontsize=16, fontweight='bold')
-    plt.xlabel('Année', fontsize=12)
-    plt.ylabel('Production', fontsize=12)
-    plt.grid(True, alpha=0.3)
+    ax.plot(production_annuelle['Year'], production_annuelle['plastic_production'],
+            marker='o', linewidth=2, markersize=6)
+    ax.set_title('Évolution de la Production Annuelle Mondiale de Plastique', fontsize=16, fontweight='bold')
+    ax.set_xlabel('Année', fontsize=12)
+    ax.set_ylabel('Production', fontsize=12)
+    ax.grid(True, alpha=0.3)
     plt.tight_layout()
-    plt.show()
+    return fig
 
+@cached_figure
+@styled
 def plot_repartition_plastic(df):
-    plt.figure(figsize=(12, 12))
+    import matplotlib.pyplot as plt
 
-    top_10_ocean = df.nlargest(15, 'Share of global plastics emitted to ocean')
+    top_15_ocean = df.nlargest(15, 'Share of global plastics emitted to ocean')
     autres = df.iloc[15:]['Share of global plastics emitted to ocean'].sum()
 
     # Données pour le camembert
-    labels = list(top_10_ocean['Entity']) + ['Autres pays']
-    sizes = list(top_10_ocean['Share of global plastics emitted to ocean']) + [autres]
+    labels = list(top_15_ocean['Entity']) + ['Autres pays']
+    sizes = list(top_15_ocean['Share of global plastics emitted to ocean']) + [autres]
 
     # Création du camembert
-    plt.pie(sizes, labels=labels, autopct='%1.1f%%', startangle=90)
-    plt.title('Répartition de la Pollution Plastique Maritime par Pays (2019)',
-              fontsize=16, fontweight='bold')
-    plt.axis('equal')
+    fig, ax = plt.subplots(figsize=(12, 12))
+    ax.pie(sizes, labels=labels, autopct='%1.1f%%', startangle=90)
+    ax.set_title('Répartition de la Pollution Plastique Maritime par Pays (2019)',
+                 fontsize=16, fontweight='bold')
+    ax.axis('equal')
     plt.tight_layout()
-    plt.show()
+    return fig
+
+@cached_figure
+@styled
+def plot_relation_acidification_co2(df, correlation=None):
+    import matplotlib.pyplot as plt
+    from scipy.stats import pearsonr
 
-def plot_relation_acidification_co2(df):
     fig, ax1 = plt.subplots(figsize=(18, 10))
 
-    # Calcul de la corrélation
-    correlation, p_value = pearsonr(df['emissions_total'], df['Ocean_acidification(in_PH)'])
+    # Calcul de la corrélation (si elle n'est pas fournie par le moteur de corrélations)
+    if correlation is None:
+        correlation = pearsonr(df['emissions_total'], df['Ocean_acidification(in_PH)'])
+    correlation, p_value = correlation
 
     # Graphique CO2 (axe gauche)
     color1 = 'darkred'
@@ -154,11 +217,18 @@ def plot_relation_acidification_co2(df):
     plt.tight_layout()
     return fig
 
-def plot_relation_acidification_redlist(df):
+@cached_figure
+@styled
+def plot_relation_acidification_redlist(df, correlation=None):
+    import matplotlib.pyplot as plt
+    from scipy.stats import pearsonr
+
     fig, ax1 = plt.subplots(figsize=(15, 10))
 
-    # Calcul de la corrélation
-    correlation, p_value = pearsonr(df['Ocean_acidification(in_PH)'], df['red_list_index'])
+    # Calcul de la corrélation (si elle n'est pas fournie par le moteur de corrélations)
+    if correlation is None:
+        correlation = pearsonr(df['Ocean_acidification(in_PH)'], df['red_list_index'])
+    correlation, p_value = correlation
 
     # pH océanique (axe de gauche)
     color1 = 'steelblue'
@@ -190,8 +260,9 @@ def plot_relation_acidification_redlist(df):
     plt.tight_layout()
     return fig
 
-def plot_relation_glaciermelting_heat(df):
-    # Calcul de la corrélation
+@cached_figure
+def plot_relation_glaciermelting_heat(df, correlation=None):
+    import plotly.graph_objects as go
 
     fig = go.Figure()
 
@@ -214,8 +285,11 @@ def plot_relation_glaciermelting_heat(df):
     ))
 
     # Layout double axe avec corrélation dans le titre
+    title = "Lien entre réchauffement des océans et fonte des glaciers"
+    if correlation is not None:
+        title += f"<br>Corrélation: r = {correlation[0]:.4f} (p-value: {correlation[1]:.2e})"
     fig.update_layout(
-        title=f"Lien entre réchauffement des océans et fonte des glaciers",
+        title=title,
         xaxis=dict(title="Année"),
         yaxis=dict(title="Masse cumulée des glaciers (mm w.e.)", side="left"),
         yaxis2=dict(title="Chaleur océanique (10^22 J)", overlaying="y", side="right"),
@@ -225,16 +299,14 @@ def plot_relation_glaciermelting_heat(df):
 
     return fig
 
-def plot_relation_glaciermelting_sealevel(df):
+@cached_figure
+def plot_relation_glaciermelting_sealevel(df, fit=None):
+    import numpy as np
+    import plotly.graph_objects as go
+
     x = df["sea_level_avg"]
     y = df["Mean cumulative mass balance"]
 
-    # Calculer la régression linéaire
-
-    X = sm.add_constant(x)
-    model = sm.OLS(y, X).fit()
-    y_pred = model.predict(X)
-
     # Créer le graphique
     fig = go.Figure()
 
@@ -243,18 +315,20 @@ def plot_relation_glaciermelting_sealevel(df):
         x=x,
         y=y,
         mode="markers",
-        name="Masse des glaciers",
+        name="Masse des glaciers (moyennes annuelles)",
         marker=dict(color="blue")
     ))
 
-    # Ligne de régression (tendance)
-    fig.add_trace(go.Scatter(
-        x=x,
-        y=y_pred,
-        mode="lines",
-        name="Tendance fonte",
-        line=dict(color="red", width=3)
-    ))
+    # Droite de régression précalculée (analysis/trends.py)
+    if fit is not None:
+        x_line = np.sort(x.dropna().unique())
+        fig.add_trace(go.Scatter(
+            x=x_line,
+            y=fit.predict(x_line),
+            mode="lines",
+            name=f"Tendance fonte (R² = {fit.r2:.3f}, {fit.n} années)",
+            line=dict(color="red", width=3)
+        ))
 
     # Mettre à jour le layout
 
@@ -268,14 +342,20 @@ def plot_relation_glaciermelting_sealevel(df):
             y=0.95
         )
     )
-    # Afficher le graphique
-    fig.show()
+    return fig
+
+@cached_figure
+@styled
+def plot_relation_plastic_co2(df, correlation=None):
+    import matplotlib.pyplot as plt
+    from scipy.stats import pearsonr
 
-def plot_relation_plastic_co2(df):
     fig, ax1 = plt.subplots(figsize=(16, 8))
 
-    # Calcul de la corrélation
-    correlation, p_value = pearsonr(df['emissions_total'], df['plastic_production'])
+    # Calcul de la corrélation (si elle n'est pas fournie par le moteur de corrélations)
+    if correlation is None:
+        correlation = pearsonr(df['emissions_total'], df['plastic_production'])
+    correlation, p_value = correlation
 
     color1 = 'darkred'
     ax1.set_xlabel('Année', fontsize=14)
@@ -304,7 +384,10 @@ def plot_relation_plastic_co2(df):
     plt.tight_layout()
     return fig
 
-def plot_heat(df):
+@cached_figure
+def plot_heat(df, x_range=None, max_points=PLOT_MAX_POINTS):
+    import plotly.express as px
+
     # Copier pour éviter de modifier df original
     df_anom = df.copy()
 
@@ -314,6 +397,8 @@ def plot_heat(df):
     # Calcul de l'anomalie
     df_anom["OHC_Anomaly"] = df_anom["ocean_heat_content_noaa_2000m"] - baseline
 
+    # Réduction au budget de points (fenêtre zoomée seulement si x_range est fourni)
+    df_anom = downsample(df_anom, "Year", "OHC_Anomaly", max_points, x_range=x_range)
 
     # Figure
     fig = px.line(
@@ -330,10 +415,15 @@ def plot_heat(df):
     fig.update_layout(
         margin={"r": 0, "t": 40, "l": 0, "b": 0}
     )
+    if x_range is not None:
+        fig.update_xaxes(range=list(x_range))
 
     return fig
 
-def plot_sealevel(df):
+@cached_figure
+def plot_sealevel(df, x_range=None, max_points=PLOT_MAX_POINTS):
+    import plotly.express as px
+
     df_melted = df.melt(
         id_vars="Day",
         value_vars=[
@@ -353,6 +443,10 @@ def plot_sealevel(df):
     }
     df_melted["Source"] = df_melted["Source"].map(name_map)
 
+    # Chaque source est réduite au budget de points (min/max pour garder les extrêmes)
+    df_melted = downsample(df_melted, "Day", "Sea_Level", max_points, method="minmax",
+                           by="Source", x_range=x_range)
+
     # Calcul de la corrélation avec le temps pour la moyenne
     df_avg = df.dropna(subset=["sea_level_average"])
 
@@ -383,10 +477,15 @@ def plot_sealevel(df):
         margin={"r": 0, "t": 60, "l": 0, "b": 0},
         template="plotly_white"
     )
+    if x_range is not None:
+        fig.update_xaxes(range=[str(pd.Timestamp(bound).date()) for bound in x_range])
 
     return fig
 
-def plot_glaciermelting(df):
+@cached_figure
+def plot_glaciermelting(df, trend=None):
+    import plotly.graph_objects as go
+
     fig = go.Figure()
 
     fig.add_trace(go.Scatter(
@@ -396,6 +495,23 @@ def plot_glaciermelting(df):
         mode="lines+markers"
     ))
 
+    # Tendances précalculées (analysis/trends.py)
+    if trend is not None:
+        fig.add_trace(go.Scatter(
+            x=trend["Year"],
+            y=trend["lowess"],
+            name="Tendance LOWESS",
+            mode="lines",
+            line=dict(color="red", width=3)
+        ))
+        fig.add_trace(go.Scatter(
+            x=trend["Year"],
+            y=trend["ols"],
+            name="Tendance linéaire",
+            mode="lines",
+            line=dict(color="gray", dash="dash")
+        ))
+
     fig.add_trace(go.Scatter(
         x=df["Year"],
         y=df["Number of observations"],
@@ -414,7 +530,11 @@ def plot_glaciermelting(df):
 
     return fig
 
+@cached_figure
+@styled
 def plot_redlist(df):
+    import matplotlib.pyplot as plt
+
     latest_year = df['Year'].max()
     latest_data = df[df['Year'] == latest_year].copy()
 
@@ -431,9 +551,14 @@ def plot_redlist(df):
     plt.tight_layout()
     return fig
 
-def plot_globalwarn(df):
+@cached_figure
+def plot_globalwarn(df, x_range=None, max_points=PLOT_MAX_POINTS):
+    import plotly.express as px
+
     # Filtrer pour l'entité "World"
     df_world = df[df["Entity"] == "World"]
+    df_world = downsample(df_world, "Year", "near_surface_temperature_anomaly", max_points,
+                          x_range=x_range)
 
     # Créer le graphique
     fig = px.line(
@@ -447,6 +572,11 @@ def plot_globalwarn(df):
         trace.name = "Anomalie de température"
         trace.line.color = "#d62728"
 
+    # Moyenne glissante précalculée avec la série mondiale (analysis/partitions.py)
+    if "rolling_mean_10y" in df_world.columns:
+        fig.add_scatter(x=df_world["Year"], y=df_world["rolling_mean_10y"],
+                        name="Moyenne glissante 10 ans", line={"color": "#1f1f1f", "width": 3})
+
         # Mettre à jour layout
     fig.update_layout(
         xaxis_title="Année",
@@ -454,15 +584,21 @@ def plot_globalwarn(df):
         legend_title_text="Mesure",
         margin={"r": 0, "t": 40, "l": 0, "b": 0}
     )
+    if x_range is not None:
+        fig.update_xaxes(range=list(x_range))
 
     return fig
 
+@cached_figure
 def plot_heat_variation(df):
-    df["OHC_avg"] = df[
+    import plotly.express as px
+
+    # Colonnes calculées sur une copie : df peut être une frame partagée du registre
+    df = df.assign(OHC_avg=df[
         ["ocean_heat_content_noaa_2000m",
          "ocean_heat_content_mri_2000m",
          "ocean_heat_content_iap_2000m"]
-    ].mean(axis=1)
+    ].mean(axis=1))
 
     df["OHC_change"] = df["OHC_avg"].diff()
 
@@ -474,4 +610,146 @@ def plot_heat_variation(df):
         labels={"OHC_change": "Variation annuelle (10^22 Joules)", "Year": "Année"}
     )
 
-    return fig
\ No newline at end of file
+    return fig
+
+@cached_figure
+def plot_projections(history, projections, label):
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+
+    fig.add_trace(go.Scatter(
+        x=history["Year"],
+        y=history["value"],
+        name="Observations",
+        mode="lines",
+        line={"color": "#1f1f1f", "width": 3}
+    ))
+
+    # Une courbe par scénario, dans l'ordre des scénarios demandés
+    for scenario, group in projections.groupby("Scénario", sort=False, observed=True):
+        fig.add_trace(go.Scatter(
+            x=group["year"],
+            y=group["prediction"],
+            name=scenario,
+            mode="lines",
+            line={"dash": "dash"}
+        ))
+
+    fig.update_layout(
+        title=f"Projections - {label}",
+        xaxis=dict(title="Année"),
+        yaxis=dict(title=label),
+        legend_title_text="Scénario",
+        template="plotly_white"
+    )
+
+    return fig
+
+@cached_figure
+def plot_lagged_correlation(lags, rolling, label_a, label_b, window, observed=None, interpolated=0):
+    import numpy as np
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
+    title = f"{label_a} ↔ {label_b}"
+    if observed is not None:
+        title += f" ({observed} années communes, dont {interpolated} interpolées)"
+
+    fig = make_subplots(
+        rows=2, cols=1,
+        subplot_titles=(
+            f"Corrélation selon le décalage (décalage > 0 : {label_a} précède {label_b})",
+            f"Corrélation glissante sur {window} ans"
+        ),
+        vertical_spacing=0.15
+    )
+
+    # Corrélation à chaque décalage et seuil de significativité approximatif (±1,96/√n)
+    fig.add_trace(go.Bar(
+        x=lags["lag"],
+        y=lags["r"],
+        name="r décalé",
+        marker_color=np.where(lags["r"] >= 0, "crimson", "steelblue"),
+        customdata=lags[["n", "interpolated"]],
+        hovertemplate="Décalage %{x} : r = %{y:.3f}<br>%{customdata[0]} années communes, "
+                      "dont %{customdata[1]} interpolées<extra></extra>"
+    ), row=1, col=1)
+    threshold = 1.96 / np.sqrt(lags["n"])
+    for sign in (1, -1):
+        fig.add_trace(go.Scatter(
+            x=lags["lag"],
+            y=sign * threshold,
+            mode="lines",
+            name="Seuil 95 %",
+            line=dict(color="gray", dash="dot"),
+            showlegend=sign == 1
+        ), row=1, col=1)
+
+    fig.add_trace(go.Scatter(
+        x=rolling["Year"],
+        y=rolling["r"],
+        mode="lines",
+        name=f"r glissant ({window} ans)",
+        line=dict(color="darkorange", width=3)
+    ), row=2, col=1)
+
+    fig.update_xaxes(title_text="Décalage (années)", row=1, col=1)
+    fig.update_xaxes(title_text="Année (fin de fenêtre)", row=2, col=1)
+    fig.update_yaxes(title_text="r", range=[-1.05, 1.05], row=1, col=1)
+    fig.update_yaxes(title_text="r", range=[-1.05, 1.05], row=2, col=1)
+    fig.update_layout(
+        title=title,
+        height=700,
+        template="plotly_white"
+    )
+
+    return fig
+
+@cached_figure
+def plot_trend(trend, label, breakpoint=None):
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+
+    fig.add_trace(go.Scatter(
+        x=trend["Year"],
+        y=trend["value"],
+        name="Observations",
+        mode="markers",
+        marker=dict(color="#1f1f1f", size=5)
+    ))
+    fig.add_trace(go.Scatter(
+        x=trend["Year"],
+        y=trend["ols"],
+        name="Tendance linéaire",
+        mode="lines",
+        line=dict(color="gray", dash="dash")
+    ))
+    fig.add_trace(go.Scatter(
+        x=trend["Year"],
+        y=trend["lowess"],
+        name="LOWESS",
+        mode="lines",
+        line=dict(color="crimson", width=3)
+    ))
+
+    if breakpoint is not None:
+        fig.add_trace(go.Scatter(
+            x=trend["Year"],
+            y=trend["segmented"],
+            name="Linéaire par morceaux",
+            mode="lines",
+            line=dict(color="royalblue", width=2)
+        ))
+        fig.add_vline(x=breakpoint["year"], line=dict(color="royalblue", dash="dot"),
+                      annotation_text=f"Rupture {breakpoint['year']}")
+
+    fig.update_layout(
+        title=f"Tendances - {label}",
+        xaxis=dict(title="Année"),
+        yaxis=dict(title=label),
+        template="plotly_white"
+    )
+
+    return fig
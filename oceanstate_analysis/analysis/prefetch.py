@@ -0,0 +1,84 @@
+"""
+Préchargement concurrent des sources distantes (Our World In Data)
+Toutes les entrées de URLS sont téléchargées en parallèle au démarrage, matérialisées
+puis chargées dans le registre partagé pour que le premier rapport soit servi sans
+attente réseau
+"""
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+import time
+
+from loguru import logger
+import pandas as pd
+
+from . import partitions
+from .config import PARTITIONED_DATASETS, PREFETCH_WORKERS, URLS
+from .registry import load_dataset
+
+
+@dataclass
+class PrefetchResult:
+    name: str
+    ok: bool
+    latency: float
+    rows: int = 0
+    error: str = None
+
+
+def _prefetch_one(name: str) -> PrefetchResult:
+    start = time.perf_counter()
+    try:
+        df = load_dataset(name)
+        if name in PARTITIONED_DATASETS:
+            # Partitions par entité et séries dérivées prêtes avant le premier rapport
+            partitions.build(name)
+    except Exception as e:
+        return PrefetchResult(name, False, time.perf_counter() - start, error=str(e))
+    return PrefetchResult(name, True, time.perf_counter() - start, rows=len(df))
+
+
+def prefetch_all(names=None, max_workers: int = PREFETCH_WORKERS) -> list:
+    """
+    Télécharge et matérialise en parallèle les sources `names` (toutes par défaut).
+    Returns: liste de PrefetchResult (latence et erreur éventuelle par source)
+    """
+    names = list(names or URLS)
+    results = []
+    start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch") as pool:
+        futures = [pool.submit(_prefetch_one, name) for name in names]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            if result.ok:
+                logger.info(f"Préchargé '{result.name}' en {result.latency:.2f}s ({result.rows} lignes)")
+            else:
+                logger.warning(f"Échec du préchargement de '{result.name}' : {result.error}")
+
+    logger.info(f"Préchargement terminé en {time.perf_counter() - start:.2f}s "
+                f"({sum(r.ok for r in results)}/{len(results)} sources)")
+    return sorted(results, key=lambda r: names.index(r.name))
+
+
+def start_background_prefetch(names=None, max_workers: int = PREFETCH_WORKERS):
+    """Lance le préchargement dans un thread de fond et renvoie son Future."""
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch-main")
+    future = executor.submit(prefetch_all, names, max_workers)
+    executor.shutdown(wait=False)
+    return future
+
+
+def results_frame(results) -> pd.DataFrame:
+    """Tableau récapitulatif des résultats de préchargement."""
+    return pd.DataFrame([
+        {
+            "Source": r.name,
+            "Statut": "✅" if r.ok else "❌",
+            "Latence (s)": round(r.latency, 3),
+            "Lignes": r.rows,
+            "Erreur": r.error or "",
+        }
+        for r in results
+    ])
@@ -1,89 +1,109 @@
 import pandas as pd
-from .config import URLS, REQUEST_OPTIONS, COLUMN_NAMES, RAW_DATA_FILES
+from .config import RAW_DATA_FILES
+from .registry import load_dataset
 
-def load_and_clean_ph_data()->pd.DataFrame:
-    df = pd.read_csv(URLS["seawater_ph"], storage_options=REQUEST_OPTIONS)
 
-    column_mapping = COLUMN_NAMES["seawater_ph"]
-    df.rename(columns=column_mapping, inplace=True)
+def load_and_clean_ph_data(columns=None) -> pd.DataFrame:
+    return load_dataset("seawater_ph", columns)
 
-    return df
 
+def load_and_clean_microplastic_data(columns=None) -> pd.DataFrame:
+    return load_dataset("microplastics", columns)
 
-def load_and_clean_microplastic_data() -> pd.DataFrame:
-    df = pd.read_csv(URLS["microplastics"], storage_options=REQUEST_OPTIONS)
 
-    column_mapping = COLUMN_NAMES["microplastics"]
-    df.rename(columns=column_mapping, inplace=True)
+def load_and_clean_macroplastic_data(columns=None) -> pd.DataFrame:
+    return load_dataset("macroplastics", columns)
 
-    return df
+def _find_coord(ds, candidates):
+    for name in candidates:
+        if name in ds.coords or name in ds.dims:
+            return name
+    raise KeyError(f"Aucune coordonnée parmi {candidates}")
 
 
-def load_and_clean_macroplastic_data() -> pd.DataFrame:
-    df = pd.read_csv(URLS["macroplastics"], storage_options=REQUEST_OPTIONS)
+def _coord_slice(ds, coord, vmin, vmax):
+    # Les coordonnées peuvent être décroissantes (latitude du nord au sud)
+    values = ds[coord].values
+    if len(values) > 1 and values[0] > values[-1]:
+        return slice(vmax, vmin)
+    return slice(vmin, vmax)
 
-    column_mapping = COLUMN_NAMES["macroplastics"]
-    df.rename(columns=column_mapping, inplace=True)
 
-    return df
-
-def load_and_clean_depth_data() -> pd.DataFrame:
+def open_depth_data(bbox=None, variables=None, stride=1, chunks="auto"):
+    """
+    Ouvre paresseusement le fichier NetCDF GLO12 (rien n'est lu avant le calcul).
+    bbox : (lon_min, lat_min, lon_max, lat_max) en degrés
+    variables : liste des variables à conserver
+    stride : décimation de la grille (1 point sur `stride` en longitude et latitude)
+    Les tableaux sont adossés à dask si disponible, sinon à des tableaux paresseux xarray.
+    """
     import xarray as xr
+    try:
+        import dask  # noqa: F401
+    except ImportError:
+        chunks = None
+
+    ds = xr.open_dataset(RAW_DATA_FILES['depth_file'], chunks=chunks)
+    if variables is not None:
+        ds = ds[list(variables)]
+
+    lon = _find_coord(ds, ("longitude", "lon", "x"))
+    lat = _find_coord(ds, ("latitude", "lat", "y"))
+    if bbox is not None:
+        lon_min, lat_min, lon_max, lat_max = bbox
+        ds = ds.sel({
+            lon: _coord_slice(ds, lon, lon_min, lon_max),
+            lat: _coord_slice(ds, lat, lat_min, lat_max)
+        })
+    if stride > 1:
+        ds = ds.isel({lon: slice(None, None, stride), lat: slice(None, None, stride)})
+    return ds
+
+
+def load_and_clean_depth_data(bbox=None, variables=None, stride=1, dropna=False) -> pd.DataFrame:
+    """Convertit en tableau uniquement le sous-ensemble demandé de la grille GLO12."""
     import warnings
     warnings.filterwarnings('ignore')
 
-    ds = xr.open_dataset(RAW_DATA_FILES['depth_file'])
+    ds = open_depth_data(bbox=bbox, variables=variables, stride=stride)
     df = ds.to_dataframe()
     df = df.reset_index()
+    if dropna:
+        # Points terrestres : toutes les variables sont manquantes
+        df = df.dropna(subset=list(ds.data_vars), how="all")
     return df
 
-def load_and_clean_sealevel_data():
+def load_and_clean_sealevel_data(columns=None) -> pd.DataFrame:
     """Charge et nettoie les données du niveau de la mer."""
-    df = pd.read_csv(RAW_DATA_FILES["sea_level"])
+    return load_dataset("sea_level", columns)
 
-    return df
-
-def load_and_clean_heat_data():
+def load_and_clean_heat_data(columns=None) -> pd.DataFrame:
     """Charge et nettoie les données du niveau de la mer."""
-    df = pd.read_csv(URLS["heat"], storage_options=REQUEST_OPTIONS)
-    return df
+    return load_dataset("heat", columns)
 
-def load_and_clean_oceanwarning_data():
-    df = pd.read_excel(RAW_DATA_FILES["oceanwarning"])
+def load_and_clean_oceanwarning_data(columns=None) -> pd.DataFrame:
+    return load_dataset("oceanwarning", columns)
 
-    column_mapping = COLUMN_NAMES["oceanwarning"]
-    df.rename(columns=column_mapping, inplace=True)
+def load_and_clean_acid_data(columns=None) -> pd.DataFrame:
+    return load_dataset("acid", columns)
 
-    return df
+def load_and_clean_plastic_waste_data(columns=None) -> pd.DataFrame:
+    return load_dataset("plastic_waste", columns)
 
-def load_and_clean_acid_data():
-    df = pd.read_csv(RAW_DATA_FILES["acid"])
-    return df
+def load_and_clean_plastic_waste_ocean_data(columns=None) -> pd.DataFrame:
+    return load_dataset("plastic_waste_ocean", columns)
 
-def load_and_clean_plastic_waste_data():
-    df = pd.read_csv(RAW_DATA_FILES["plastic_waste"])
-    return df
-
-def load_and_clean_plastic_waste_ocean_data():
-    df = pd.read_csv(URLS["plastic_waste_ocean"], storage_options=REQUEST_OPTIONS)
-    return df
-
-def load_and_clean_plastic_production_data():
-    df = pd.read_csv(URLS["platic_production"], storage_options=REQUEST_OPTIONS)
-    return df
+def load_and_clean_plastic_production_data(columns=None) -> pd.DataFrame:
+    return load_dataset("platic_production", columns)
 
-def load_and_clean_CO2_emission_data():
-    df = pd.read_csv(URLS["CO2_emission"], storage_options=REQUEST_OPTIONS)
-    return df
+def load_and_clean_CO2_emission_data(columns=None) -> pd.DataFrame:
+    return load_dataset("CO2_emission", columns)
 
-def load_and_clean_red_list_index_data():
-    df = pd.read_csv(URLS["red_list_index"], storage_options=REQUEST_OPTIONS)
-    return df
+def load_and_clean_red_list_index_data(columns=None) -> pd.DataFrame:
+    return load_dataset("red_list_index", columns)
 
-def load_and_clean_glaciers_data():
-    df = pd.read_csv(RAW_DATA_FILES["glaciers_melting"])
-    return df
+def load_and_clean_glaciers_data(columns=None) -> pd.DataFrame:
+    return load_dataset("glaciers_melting", columns)
 
-def load_and_clean_global_warning_data():
-    df = pd.read_csv(URLS["global_warning"], storage_options=REQUEST_OPTIONS)
-    return df
\ No newline at end of file
+def load_and_clean_global_warning_data(columns=None) -> pd.DataFrame:
+    return load_dataset("global_warning", columns)
\ No newline at end of file
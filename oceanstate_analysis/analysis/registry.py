@@ -0,0 +1,136 @@
+"""
+Registre en mémoire des jeux de données, partagé par tout le processus
+Chaque source n'est lue qu'une fois par version ; les sessions Streamlit reçoivent des
+copies superficielles de la même frame, évincée en LRU au-delà de REGISTRY_MAX_BYTES.
+Les données partagées sont en lecture seule : ajouter, remplacer ou supprimer une
+colonne ne touche que la copie de l'appelant, et une modification en place (.loc,
+fillna(inplace=True)...) lève ValueError au lieu d'altérer la frame des autres lecteurs.
+Avec plusieurs workers, la copie d'origine est lue dans le stockage Arrow partagé
+(shared_store) plutôt que dans le Parquet
+"""
+
+from collections import OrderedDict
+import threading
+
+from loguru import logger
+import numpy as np
+import pandas as pd
+
+from . import shared_store
+from .config import REGISTRY_MAX_BYTES, SHARED_STORE
+from .materialize import dataset_version, read_processed
+from .panels import compact_panel, frame_nbytes
+
+
+def read_only(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Interdit l'écriture dans les tableaux qui portent les données de `df` (et de ses copies
+    superficielles) ; les frames mappées depuis shared_store le sont déjà
+    """
+    # Les tableaux des blocs eux-mêmes : une vue obtenue par colonne ne protégerait pas
+    # les écritures faites par pandas directement dans le bloc
+    for values in df._mgr.arrays:
+        if isinstance(values, pd.Categorical):
+            arrays = [values._codes]
+        elif hasattr(values, "_mask"):  # Int64, Float32... nullables
+            arrays = [values._data, values._mask]
+        else:
+            arrays = [getattr(values, "_ndarray", values)]
+        for array in arrays:
+            if isinstance(array, np.ndarray):
+                array.flags.writeable = False
+    return df
+
+
+class DatasetRegistry:
+    def __init__(self, max_bytes: int = REGISTRY_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._frames = OrderedDict()  # name -> (version, frame, taille en octets)
+        self._lock = threading.RLock()
+        self._loading = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _name_lock(self, name):
+        with self._lock:
+            return self._loading.setdefault(name, threading.Lock())
+
+    def get(self, name: str, version: str, loader) -> pd.DataFrame:
+        """
+        Renvoie une copie superficielle, en lecture seule, du jeu `name` à la version
+        `version`, en appelant `loader()` une seule fois s'il n'est pas en mémoire
+        """
+        with self._lock:
+            entry = self._frames.get(name)
+            if entry is not None and entry[0] == version:
+                self._frames.move_to_end(name)
+                self.hits += 1
+                return entry[1].copy(deep=False)
+
+        # Un verrou par jeu : deux sessions qui demandent la même source ne la lisent qu'une fois
+        with self._name_lock(name):
+            with self._lock:
+                entry = self._frames.get(name)
+                if entry is not None and entry[0] == version:
+                    self.hits += 1
+                    return entry[1].copy(deep=False)
+            df = loader()
+            self.put(name, version, df)
+            self.misses += 1
+            return df.copy(deep=False)
+
+    def put(self, name: str, version: str, df: pd.DataFrame):
+        read_only(df)
+        nbytes = frame_nbytes(df)
+        with self._lock:
+            self._frames[name] = (version, df, nbytes)
+            self._frames.move_to_end(name)
+            self._evict()
+
+    def _evict(self):
+        # Le jeu le plus récent est toujours conservé, même s'il dépasse la limite seul
+        while len(self._frames) > 1 and self.nbytes > self.max_bytes:
+            name, _ = self._frames.popitem(last=False)
+            logger.debug(f"Jeu de données '{name}' évincé du registre")
+
+    @property
+    def nbytes(self) -> int:
+        return sum(entry[2] for entry in self._frames.values())
+
+    def invalidate(self, name: str = None):
+        with self._lock:
+            if name is None:
+                self._frames.clear()
+            else:
+                self._frames.pop(name, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "datasets": {name: entry[2] for name, entry in self._frames.items()},
+                "nbytes": self.nbytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+datasets = DatasetRegistry()
+
+
+def _read(name: str, version: str) -> pd.DataFrame:
+    if not SHARED_STORE:
+        return compact_panel(read_processed(name))
+    df = shared_store.load(name, version)
+    if df is None:
+        df = compact_panel(read_processed(name))
+        shared_store.publish(name, version, df)
+        return df
+    return compact_panel(df)
+
+
+def load_dataset(name: str, columns=None) -> pd.DataFrame:
+    """Jeu de données matérialisé `name`, lu une seule fois par processus et par version."""
+    version = dataset_version(name)
+    df = datasets.get(name, version, lambda: _read(name, version))
+    return df[list(columns)] if columns is not None else df
@@ -0,0 +1,212 @@
+"""
+Cache des figures rendues
+Les figures Plotly sont stockées en JSON, les figures Matplotlib rastérisées en PNG
+(et exportées en SVG). La clé combine la fonction de tracé (nom et empreinte de son code
+source : modifier un tracé invalide ses anciennes figures), l'empreinte des données reçues
+et les autres paramètres ; deux niveaux : mémoire (LRU) puis disque
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+import functools
+import hashlib
+import inspect
+import io
+import os
+from pathlib import Path
+import threading
+
+from loguru import logger
+import pandas as pd
+
+from .config import FIGURES_CACHE_DIR, FIGURES_CACHE_DISK_BYTES, FIGURES_CACHE_MEMORY_BYTES
+
+# À incrémenter pour invalider toutes les figures en cache (ex. changement de bibliothèque graphique)
+FIGURE_CACHE_VERSION = 1
+
+PLOTLY = "plotly"
+MATPLOTLIB = "matplotlib"
+EXTENSIONS = {"plotly": "json", "png": "png", "svg": "svg"}
+
+# pyplot (état global des figures et rcParams) n'est pas thread-safe : tracés et exports
+# Matplotlib sont sérialisés entre les threads (sessions Streamlit, file de rapports)
+PYPLOT_LOCK = threading.RLock()
+
+
+@dataclass
+class RenderedFigure:
+    """Figure Matplotlib déjà rastérisée (servie depuis le cache)."""
+    png: bytes
+    svg: bytes = None
+
+    def savefig(self, path):
+        path = Path(path)
+        data = self.svg if path.suffix == ".svg" else self.png
+        path.write_bytes(data)
+
+
+def _fingerprint(value) -> str:
+    """Empreinte stable d'un paramètre de tracé (contenu complet pour les DataFrames)."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        hashes = pd.util.hash_pandas_object(value, index=True).to_numpy()
+        header = repr(list(value.columns) if isinstance(value, pd.DataFrame) else value.name)
+        return hashlib.sha256(header.encode() + hashes.tobytes()).hexdigest()
+    if isinstance(value, (list, tuple)):
+        return "(" + ",".join(_fingerprint(v) for v in value) + ")"
+    if isinstance(value, dict):
+        return "{" + ",".join(f"{k}:{_fingerprint(v)}" for k, v in sorted(value.items())) + "}"
+    return repr(value)
+
+
+@functools.lru_cache(maxsize=None)
+def _code_salt(func) -> str:
+    """Empreinte du code source de la fonction (décorateurs exclus)."""
+    try:
+        source = inspect.getsource(inspect.unwrap(func))
+    except (OSError, TypeError):
+        source = ""
+    return hashlib.sha256(f"{FIGURE_CACHE_VERSION}|{source}".encode()).hexdigest()[:16]
+
+
+def figure_key(func, args, kwargs) -> str:
+    payload = (f"{func.__module__}.{func.__qualname__}|{_code_salt(func)}|"
+               f"{_fingerprint(args)}|{_fingerprint(kwargs)}")
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _is_plotly(fig) -> bool:
+    return hasattr(fig, "to_plotly_json")
+
+
+def _is_matplotlib(fig) -> bool:
+    return type(fig).__module__.startswith("matplotlib")
+
+
+class FigureCache:
+    def __init__(self, directory: Path = FIGURES_CACHE_DIR,
+                 memory_bytes: int = FIGURES_CACHE_MEMORY_BYTES,
+                 disk_bytes: int = FIGURES_CACHE_DISK_BYTES):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self._memory = OrderedDict()  # clé -> {format: octets}
+        self._lock = threading.Lock()
+
+    # ---- Niveau mémoire ----
+    def _remember(self, key, payloads):
+        with self._lock:
+            self._memory[key] = payloads
+            self._memory.move_to_end(key)
+            total = sum(len(b) for p in self._memory.values() for b in p.values())
+            while len(self._memory) > 1 and total > self.memory_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                total -= sum(len(b) for b in evicted.values())
+
+    # ---- Niveau disque ----
+    def _disk_path(self, key, fmt):
+        return self.directory / f"{key}.{EXTENSIONS[fmt]}"
+
+    def _read_disk(self, key):
+        for formats in (["plotly"], ["png", "svg"]):
+            paths = {fmt: self._disk_path(key, fmt) for fmt in formats}
+            if all(path.exists() for path in paths.values()):
+                try:
+                    payloads = {fmt: path.read_bytes() for fmt, path in paths.items()}
+                except OSError:
+                    return None
+                for path in paths.values():
+                    os.utime(path)
+                return payloads
+        return None
+
+    def _write_disk(self, key, payloads):
+        for fmt, data in payloads.items():
+            path = self._disk_path(key, fmt)
+            tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+        self._evict_disk()
+
+    def _evict_disk(self):
+        files = []
+        for path in self.directory.iterdir():
+            if path.name.startswith("."):
+                continue
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.disk_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    # ---- API ----
+    @staticmethod
+    def _decode(payloads):
+        if "plotly" in payloads:
+            import plotly.io as pio
+            return pio.from_json(payloads["plotly"].decode("utf-8"))
+        return RenderedFigure(png=payloads["png"], svg=payloads.get("svg"))
+
+    def get(self, key):
+        with self._lock:
+            payloads = self._memory.get(key)
+            if payloads is not None:
+                self._memory.move_to_end(key)
+        if payloads is None:
+            payloads = self._read_disk(key)
+            if payloads is None:
+                return None
+            self._remember(key, payloads)
+        return self._decode(payloads)
+
+    def put(self, key, fig):
+        """Met en cache `fig` et renvoie l'objet à afficher."""
+        if _is_plotly(fig):
+            payloads = {"plotly": fig.to_json().encode("utf-8")}
+            result = fig
+        elif _is_matplotlib(fig):
+            import matplotlib.pyplot as plt
+            payloads = {}
+            with PYPLOT_LOCK:
+                for fmt in ("png", "svg"):
+                    buffer = io.BytesIO()
+                    fig.savefig(buffer, format=fmt, bbox_inches="tight")
+                    payloads[fmt] = buffer.getvalue()
+                plt.close(fig)
+            result = RenderedFigure(png=payloads["png"], svg=payloads["svg"])
+        else:
+            return fig
+
+        self._remember(key, payloads)
+        try:
+            self._write_disk(key, payloads)
+        except OSError as e:
+            logger.warning(f"Impossible d'écrire la figure en cache sur disque : {e}")
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        for path in self.directory.iterdir():
+            path.unlink(missing_ok=True)
+
+
+figure_cache = FigureCache()
+
+
+def cached_figure(func):
+    """Décorateur : sert la figure depuis le cache si les mêmes données ont déjà été tracées."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        key = figure_key(func, args, kwargs)
+        fig = figure_cache.get(key)
+        if fig is None:
+            fig = figure_cache.put(key, func(*args, **kwargs))
+        return fig
+    return wrapper
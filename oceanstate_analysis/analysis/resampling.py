@@ -0,0 +1,163 @@
+"""
+Incertitude des corrélations entre séries annuelles par rééchantillonnage par blocs
+Les séries annuelles sont fortement autocorrélées : la p-value de Pearson, qui suppose
+des années indépendantes, surestime la significativité. Le bootstrap par blocs mobiles
+(intervalle de confiance de r) et le test de permutation par blocs (p-value) conservent
+la dépendance entre années voisines. Chaque lot de rééchantillonnages est une matrice
+d'indices (rééchantillonnages x années) évaluée en une opération ; les gros calculs sont
+répartis entre processus. Les résultats sont gardés par version des séries (mémoire et
+disque, partagés par les workers)
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+from typing import NamedTuple
+
+from loguru import logger
+import numpy as np
+
+from .config import RESAMPLES, RESAMPLING_CACHE_DIR, RESAMPLING_POOL_MIN_SIZE, RESAMPLING_WORKERS
+from .correlations import Correlation, build_matrix, correlation_matrix, series_versions
+
+CHUNK_SIZE = 2000
+
+
+class RobustCorrelation(NamedTuple):
+    """Corrélation de Pearson et son incertitude sous dépendance temporelle."""
+    statistic: float
+    pvalue: float
+    ci_low: float
+    ci_high: float
+    permutation_pvalue: float
+    n: int
+    block_length: int
+    resamples: int
+    confidence: float = 0.95
+
+    @property
+    def point(self) -> Correlation:
+        return Correlation(self.statistic, self.pvalue)
+
+
+def block_length(n: int) -> int:
+    """Longueur de bloc de l'ordre de n^(1/3) (règle usuelle du bootstrap par blocs)."""
+    return max(2, int(round(n ** (1 / 3))))
+
+
+def pearson_rows(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """Corrélation de Pearson ligne à ligne de deux matrices (rééchantillonnages x années)."""
+    xc = x - x.mean(axis=1, keepdims=True)
+    yc = y - y.mean(axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (xc * yc).sum(axis=1) / np.sqrt((xc * xc).sum(axis=1) * (yc * yc).sum(axis=1))
+
+
+def moving_block_indices(rng, n: int, block: int, size: int) -> np.ndarray:
+    """Indices du bootstrap par blocs mobiles : blocs de `block` années consécutives tirés avec remise."""
+    count = -(-n // block)
+    starts = rng.integers(0, n - block + 1, size=(size, count))
+    return (starts[:, :, None] + np.arange(block)).reshape(size, -1)[:, :n]
+
+
+def block_permutation_indices(rng, n: int, block: int, size: int) -> np.ndarray:
+    """Indices d'une permutation de l'ordre des blocs (le dernier bloc peut être incomplet)."""
+    count = -(-n // block)
+    order = np.argsort(rng.random((size, count)), axis=1)
+    indices = (order[:, :, None] * block + np.arange(block)).reshape(size, -1)
+    # Les positions au-delà de n (fin du dernier bloc) sont en même nombre sur chaque ligne
+    return indices[indices < n].reshape(size, n)
+
+
+def _resample_chunk(kind: str, x: np.ndarray, y: np.ndarray, block: int, size: int, seed) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    n = len(x)
+    if kind == "bootstrap":
+        indices = moving_block_indices(rng, n, block, size)
+        return pearson_rows(x[indices], y[indices])
+    indices = block_permutation_indices(rng, n, block, size)
+    return pearson_rows(np.broadcast_to(x, (size, n)), y[indices])
+
+
+def resample(kind: str, x: np.ndarray, y: np.ndarray, block: int, resamples: int = RESAMPLES,
+             seed: int = 0, workers: int = RESAMPLING_WORKERS) -> np.ndarray:
+    """
+    Corrélations de `resamples` rééchantillonnages ("bootstrap" ou "permutation"),
+    par lots de CHUNK_SIZE ; les lots sont répartis entre processus au-delà de
+    RESAMPLING_POOL_MIN_SIZE valeurs tirées
+    """
+    sizes = [min(CHUNK_SIZE, resamples - start) for start in range(0, resamples, CHUNK_SIZE)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = [(kind, x, y, block, size, chunk_seed) for size, chunk_seed in zip(sizes, seeds)]
+
+    if workers <= 1 or len(sizes) == 1 or resamples * len(x) < RESAMPLING_POOL_MIN_SIZE:
+        return np.concatenate([_resample_chunk(*arg) for arg in args])
+    # spawn : pas de fork d'un processus multithread (serveur Streamlit)
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=min(workers, len(sizes)), mp_context=context) as pool:
+        return np.concatenate(list(pool.map(_resample_chunk, *zip(*args))))
+
+
+def robust_pearson(x, y, resamples: int = RESAMPLES, confidence: float = 0.95, seed: int = 0,
+                   pvalue: float = None, workers: int = RESAMPLING_WORKERS) -> RobustCorrelation:
+    """Intervalle de confiance (bootstrap par blocs) et p-value (permutation par blocs) de r."""
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    n = len(x)
+    block = block_length(n)
+    r = float(pearson_rows(x[None, :], y[None, :])[0])
+
+    boot = resample("bootstrap", x, y, block, resamples, seed, workers)
+    boot = boot[~np.isnan(boot)]
+    alpha = (1 - confidence) / 2
+    ci_low, ci_high = np.quantile(boot, [alpha, 1 - alpha])
+
+    permuted = resample("permutation", x, y, block, resamples, seed + 1, workers)
+    permutation_pvalue = (1 + np.count_nonzero(np.abs(permuted) >= abs(r))) / (resamples + 1)
+
+    if pvalue is None:
+        from scipy import stats
+        pvalue = stats.pearsonr(x, y).pvalue
+    return RobustCorrelation(r, float(pvalue), float(ci_low), float(ci_high), float(permutation_pvalue),
+                             n, block, resamples, confidence)
+
+
+_cache = {}
+_lock = threading.Lock()
+
+
+def robust_correlation(a: str, b: str, resamples: int = RESAMPLES, confidence: float = 0.95) -> RobustCorrelation:
+    """
+    Corrélation robuste entre deux séries du moteur de corrélations, calculée une fois
+    par version de leurs sources (cache mémoire puis disque)
+    """
+    versions = series_versions([a, b])
+    payload = repr((sorted((a, b)), a, b, sorted(versions.items()), resamples, confidence))
+    key = hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+    with _lock:
+        if key in _cache:
+            return _cache[key]
+
+    path = RESAMPLING_CACHE_DIR / f"{key}.json"
+    if path.exists():
+        result = RobustCorrelation(**json.loads(path.read_text()))
+    else:
+        pair = build_matrix([a, b], versions).dropna()
+        seed = int(key[:8], 16)
+        result = robust_pearson(pair[a].to_numpy(), pair[b].to_numpy(), resamples, confidence, seed,
+                                pvalue=correlation_matrix().get(a, b).pvalue)
+        RESAMPLING_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        # Écriture atomique : un autre worker ne lit jamais un fichier à moitié écrit
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps(result._asdict()))
+        os.replace(tmp, path)
+        logger.debug(f"Corrélation robuste {a}/{b} : IC [{result.ci_low:.3f} ; {result.ci_high:.3f}], "
+                     f"p permutation {result.permutation_pvalue:.3g}")
+
+    with _lock:
+        _cache[key] = result
+    return result
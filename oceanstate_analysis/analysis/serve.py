@@ -0,0 +1,236 @@
+"""
+Service multi-workers de l'application Streamlit
+Lance N processus `streamlit run app.py` (un par cœur par défaut) derrière un répartiteur
+TCP local. Une connexion est envoyée au worker qui en a le moins en cours ; avec la
+stratégie "sticky" (défaut), un client reste ensuite sur son worker, car les images d'une
+session sont servies par le processus qui les a produites. Les workers partagent les jeux
+de données (stockage Arrow mappé, voir shared_store) et les figures (cache disque) ; le
+préchauffage les construit une fois avant l'ouverture du port public
+
+Utilisation : python -m analysis.serve --workers 4 --port 8501
+"""
+
+import asyncio
+from dataclasses import dataclass, field
+import os
+import signal
+import subprocess
+import sys
+import time
+from typing import Optional
+
+from loguru import logger
+import typer
+
+from analysis.config import ROOT_DIR, URLS
+
+app = typer.Typer()
+
+APP_DIR = ROOT_DIR.parent
+HEALTH_INTERVAL = 2.0
+# Un client sans connexion ouverte depuis ce délai peut être réaffecté
+AFFINITY_TTL = 1800
+BUFFER_SIZE = 64 * 1024
+
+
+def warm_up(reports: bool = True) -> dict:
+    """
+    Construit tout ce que les workers partagent : jeux matérialisés publiés dans le stockage
+    Arrow, agrégats, partitions, matrice de corrélation, tendances et, si `reports`,
+    figures de tous les rapports (cache disque)
+    Returns: durée de chaque étape en secondes
+    """
+    from analysis import aggregates, crosscorr, partitions, shared_store, trends
+    from analysis.correlations import correlation_matrix
+    from analysis.materialize import dataset_version
+    from analysis.registry import load_dataset
+
+    timings = {}
+
+    start = time.perf_counter()
+    for name in URLS:
+        try:
+            shared_store.publish(name, dataset_version(name), load_dataset(name))
+        except Exception as e:
+            logger.warning(f"Jeu '{name}' non publié : {e}")
+    timings["datasets"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    aggregates.build_all()
+    partitions.build_all()
+    correlation_matrix()
+    crosscorr.build_all()
+    trends.build_all()
+    timings["derived"] = time.perf_counter() - start
+
+    if reports:
+        import matplotlib
+        matplotlib.use("Agg")
+        import reports.reports as module
+        from analysis.modeling.batch import report_names
+
+        start = time.perf_counter()
+        for name in report_names():
+            try:
+                getattr(module, name)()
+            except Exception as e:
+                logger.warning(f"Rapport '{name}' non préchauffé : {e}")
+        timings["reports"] = time.perf_counter() - start
+
+    logger.info("Préchauffage : " + ", ".join(f"{step} {seconds:.2f}s" for step, seconds in timings.items()))
+    return timings
+
+
+@dataclass
+class Worker:
+    port: int
+    process: Optional[subprocess.Popen] = None
+    active: int = 0
+    healthy: bool = False
+
+    def start(self, host: str):
+        command = [
+            sys.executable, "-m", "streamlit", "run", "app.py",
+            "--server.address", host,
+            "--server.port", str(self.port),
+            "--server.headless", "true",
+            "--browser.gatherUsageStats", "false",
+        ]
+        env = dict(os.environ, OCEANSTATE_SHARED_STORE="1")
+        self.process = subprocess.Popen(command, cwd=APP_DIR, env=env,
+                                        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        self.healthy = False
+
+    def alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def stop(self):
+        if self.alive():
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+
+@dataclass
+class LoadBalancer:
+    """Répartiteur TCP : moins de connexions en cours, avec affinité par client si `sticky`."""
+    workers: list
+    host: str = "127.0.0.1"
+    sticky: bool = True
+    _affinity: dict = field(default_factory=dict)  # adresse client -> (worker, dernier accès)
+
+    def choose(self, client: str) -> Optional[Worker]:
+        healthy = [worker for worker in self.workers if worker.healthy]
+        if not healthy:
+            return None
+        if self.sticky:
+            entry = self._affinity.get(client)
+            if entry is not None and entry[0].healthy:
+                self._affinity[client] = (entry[0], time.monotonic())
+                return entry[0]
+        worker = min(healthy, key=lambda w: w.active)
+        if self.sticky:
+            self._affinity[client] = (worker, time.monotonic())
+        return worker
+
+    async def _pipe(self, reader, writer):
+        try:
+            while data := await reader.read(BUFFER_SIZE):
+                writer.write(data)
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+    async def handle(self, client_reader, client_writer):
+        client = client_writer.get_extra_info("peername")[0]
+        worker = self.choose(client)
+        if worker is None:
+            client_writer.close()
+            return
+        try:
+            reader, writer = await asyncio.open_connection(self.host, worker.port)
+        except OSError:
+            worker.healthy = False
+            client_writer.close()
+            return
+        worker.active += 1
+        try:
+            await asyncio.gather(self._pipe(client_reader, writer), self._pipe(reader, client_writer))
+        finally:
+            worker.active -= 1
+
+    async def _check(self, worker: Worker) -> bool:
+        try:
+            reader, writer = await asyncio.wait_for(asyncio.open_connection(self.host, worker.port), 1)
+            writer.write(b"GET /_stcore/health HTTP/1.0\r\nHost: localhost\r\n\r\n")
+            status = await asyncio.wait_for(reader.readline(), 5)
+            writer.close()
+            return b" 200 " in status
+        except (OSError, asyncio.TimeoutError):
+            return False
+
+    async def monitor(self):
+        """Santé des workers ; un worker arrêté est relancé, les affinités expirées oubliées."""
+        while True:
+            for worker in self.workers:
+                if not worker.alive():
+                    logger.warning(f"Worker :{worker.port} arrêté, relance")
+                    worker.start(self.host)
+                healthy = await self._check(worker)
+                if healthy != worker.healthy:
+                    logger.info(f"Worker :{worker.port} {'disponible' if healthy else 'indisponible'}")
+                worker.healthy = healthy
+            expired = time.monotonic() - AFFINITY_TTL
+            for client, (worker, seen) in list(self._affinity.items()):
+                if seen < expired:
+                    del self._affinity[client]
+            await asyncio.sleep(HEALTH_INTERVAL)
+
+    async def serve(self, address: str, port: int):
+        server = await asyncio.start_server(self.handle, address, port)
+        monitor = asyncio.create_task(self.monitor())
+        logger.info(f"Répartiteur à l'écoute sur http://{address}:{port} ({len(self.workers)} workers)")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            monitor.cancel()
+
+
+@app.command()
+def main(
+    workers: int = typer.Option(os.cpu_count() or 1, help="Nombre de processus Streamlit"),
+    port: int = typer.Option(8501, help="Port public du répartiteur"),
+    address: str = typer.Option("127.0.0.1", help="Adresse d'écoute du répartiteur"),
+    base_port: int = typer.Option(8600, help="Port du premier worker (les suivants à la suite)"),
+    strategy: str = typer.Option("sticky", help="sticky (affinité par client) ou least-connections"),
+    warmup: bool = typer.Option(True, help="Préchauffer données et figures avant l'ouverture"),
+    warmup_reports: bool = typer.Option(True, help="Préchauffer aussi les figures des rapports"),
+):
+    if strategy not in ("sticky", "least-connections"):
+        raise typer.BadParameter(f"Stratégie inconnue : {strategy}")
+
+    if warmup:
+        warm_up(reports=warmup_reports)
+
+    pool = [Worker(base_port + i) for i in range(workers)]
+    for worker in pool:
+        worker.start("127.0.0.1")
+    balancer = LoadBalancer(pool, sticky=strategy == "sticky")
+    # Arrêt propre (workers compris) aussi sur SIGTERM
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        asyncio.run(balancer.serve(address, port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for worker in pool:
+            worker.stop()
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,73 @@
+"""
+Stockage des jeux de données partagé entre processus (workers Streamlit)
+Chaque version d'un jeu est écrite une seule fois au format Arrow IPC non compressé ;
+les processus la mappent en mémoire, si bien que les pages des colonnes sont partagées
+par le cache du système au lieu d'être lues et copiées par chaque worker. Les mesures
+sont conservées en NaN (sans masque de nullité) pour que la conversion en pandas ne
+copie pas les colonnes numériques
+"""
+
+import os
+from pathlib import Path
+
+from loguru import logger
+import pandas as pd
+import pyarrow as pa
+
+from .config import SHARED_STORE_DIR
+
+
+def _path(name: str, version: str) -> Path:
+    return SHARED_STORE_DIR / f"{name}.{version[:16]}.arrow"
+
+
+def _to_arrow(df: pd.DataFrame) -> pa.Table:
+    arrays = []
+    for col in df.columns:
+        series = df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            categories = pa.array(series.cat.categories.astype(str), type=pa.string())
+            codes = pa.array(series.cat.codes.to_numpy(), mask=(series.cat.codes == -1).to_numpy())
+            arrays.append(pa.DictionaryArray.from_arrays(codes, categories))
+        elif pd.api.types.is_float_dtype(series):
+            # from_pandas=False : les NaN restent des valeurs, pas des nulls
+            arrays.append(pa.array(series.to_numpy(), from_pandas=False))
+        else:
+            arrays.append(pa.array(series, from_pandas=True))
+    return pa.Table.from_arrays(arrays, names=[str(col) for col in df.columns])
+
+
+def publish(name: str, version: str, df: pd.DataFrame) -> Path:
+    """Écrit `df` comme version `version` du jeu `name` (écriture atomique) et purge les anciennes."""
+    SHARED_STORE_DIR.mkdir(parents=True, exist_ok=True)
+    path = _path(name, version)
+    if not path.exists():
+        table = _to_arrow(df.reset_index(drop=True))
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        with pa.OSFile(str(tmp), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp, path)
+        logger.debug(f"Jeu '{name}' publié dans le stockage partagé ({path.stat().st_size} octets)")
+
+    # Les processus qui mappent encore une ancienne version la gardent jusqu'à leur fermeture
+    for old in SHARED_STORE_DIR.glob(f"{name}.*.arrow"):
+        if old != path:
+            old.unlink(missing_ok=True)
+    return path
+
+
+def load(name: str, version: str):
+    """Version `version` du jeu `name` mappée en mémoire, ou None si elle n'est pas publiée."""
+    path = _path(name, version)
+    try:
+        source = pa.memory_map(str(path), "r")
+    except FileNotFoundError:
+        return None
+    table = pa.ipc.open_file(source).read_all()
+    # split_blocks : une colonne par bloc, les colonnes numériques restent des vues du mapping
+    return table.to_pandas(split_blocks=True)
+
+
+def clear():
+    for path in SHARED_STORE_DIR.glob("*.arrow"):
+        path.unlink(missing_ok=True)
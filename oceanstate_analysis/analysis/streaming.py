@@ -0,0 +1,97 @@
+"""
+Lecture par blocs des grandes tables par pays (CO2, Liste Rouge, déchets plastiques)
+Les sources sont parcourues par générateurs de DataFrames : la projection des colonnes
+et les filtres de lignes sont appliqués à la lecture, et les agrégations sont calculées
+bloc par bloc puis combinées, si bien que la mémoire reste bornée par la taille d'un bloc
+"""
+
+import numpy as np
+import pandas as pd
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from .config import STREAMING_CHUNK_ROWS
+from .materialize import processed_paths
+from .panels import compact_panel, concat_panels
+
+# Statistiques combinables bloc par bloc (la moyenne est déduite de sum / count)
+PARTIAL_STATS = {"sum": "sum", "count": "sum", "min": "min", "max": "max"}
+
+
+def iter_processed(name: str, columns=None, filters=None, batch_rows: int = STREAMING_CHUNK_ROWS):
+    """
+    Blocs de la copie Parquet de `name`
+    - columns : colonnes à lire (les autres ne sont jamais décodées)
+    - filters : filtres au format de pandas.read_parquet, ex. [("Year", ">=", 1950)],
+      évalués par pyarrow avant conversion en DataFrame
+    """
+    paths = processed_paths(name)
+    dataset = ds.dataset([str(path) for path in paths], format="parquet")
+    expression = pq.filters_to_expression(filters) if filters else None
+    for batch in dataset.to_batches(columns=columns, filter=expression, batch_size=batch_rows):
+        if batch.num_rows:
+            yield compact_panel(batch.to_pandas())
+
+
+def where(chunks, predicate):
+    """Filtre chaque bloc avec `predicate(df) -> masque booléen`."""
+    for chunk in chunks:
+        yield chunk[predicate(chunk)]
+
+
+def collect(chunks, columns=None) -> pd.DataFrame:
+    """Concatène les blocs (déjà réduits) en un seul DataFrame."""
+    frames = list(chunks)
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    return concat_panels(frames, ignore_index=True)
+
+
+def partial_aggregate(chunks, by: str, values, stats=("sum", "mean", "count", "min", "max")) -> pd.DataFrame:
+    """
+    Agrégation groupée calculée par blocs : chaque bloc produit des sommes, effectifs,
+    minima et maxima partiels, combinés à la fin
+    Returns: DataFrame indexé par `by`, colonnes (valeur, statistique)
+    """
+    partials = []
+    for chunk in chunks:
+        keys = chunk[by].to_numpy()
+        grouped = chunk[list(values)].astype("float64").groupby(keys)
+        partials.append(grouped.agg(list(PARTIAL_STATS)))
+
+    if not partials:
+        return pd.DataFrame(columns=pd.MultiIndex.from_product([values, stats]))
+
+    combined = pd.concat(partials)
+    result = {}
+    for value in values:
+        grouped = combined[value].groupby(level=0)
+        parts = {stat: getattr(grouped[stat], how)() for stat, how in PARTIAL_STATS.items()}
+        with np.errstate(divide="ignore", invalid="ignore"):
+            parts["mean"] = parts["sum"] / parts["count"].where(parts["count"] > 0)
+        for stat in stats:
+            result[(value, stat)] = parts[stat]
+    return pd.DataFrame(result).rename_axis(by).sort_index()
+
+
+def latest_rows(chunks, year_column: str = "Year") -> pd.DataFrame:
+    """Lignes de l'année la plus récente, en ne conservant que celles-ci au fil des blocs."""
+    latest, kept = None, []
+    for chunk in chunks:
+        chunk = chunk[chunk[year_column].notna()]
+        if chunk.empty:
+            continue
+        year = chunk[year_column].max()
+        if latest is None or year > latest:
+            latest, kept = year, []
+        if year == latest:
+            kept.append(chunk[chunk[year_column] == latest])
+    return collect(kept)
+
+
+def top_entities(name: str, value: str, n: int = 10, year_column: str = "Year") -> list:
+    """Les `n` entités ayant la plus forte valeur `value` la dernière année disponible."""
+    latest = latest_rows(iter_processed(name, ["Entity", year_column, value]), year_column)
+    if latest.empty:
+        return []
+    return latest.nlargest(n, value)["Entity"].astype(str).tolist()
@@ -0,0 +1,254 @@
+"""
+Tendances des séries annuelles du moteur de corrélations
+Pour chaque série : droite des moindres carrés (pente par décennie et sa p-value), lissage
+LOWESS et rupture de pente (modèle linéaire par morceaux continu, toutes les années de
+rupture candidates résolues en une opération). Les relations entre séries tracées par les
+rapports (ex. glaciers en fonction du niveau de la mer) sont ajustées dans le même passage.
+Coefficients et courbes ajustées sont enregistrés avec la version des sources
+(TRENDS_DIR/<nom>.<version>.json) : les figures superposent ces ajustements sans refaire
+de régression, et seul ce qui dépend d'une source modifiée est réajusté
+
+Utilisation : python -m analysis.trends
+"""
+
+from dataclasses import asdict, dataclass
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import List, Optional
+
+from loguru import logger
+import numpy as np
+import pandas as pd
+import typer
+
+from analysis.config import TREND_LOWESS_FRAC, TREND_MIN_SEGMENT, TRENDS_DIR
+from analysis.correlations import build_matrix, series_versions
+
+app = typer.Typer()
+
+# Relations ajustées pour les rapports : (série en abscisse, série en ordonnée)
+RELATIONS = [("sea_level", "glacier")]
+
+
+@dataclass
+class Trend:
+    """Ajustements d'une série annuelle et courbes correspondantes, année par année."""
+    name: str
+    version: str
+    years: list
+    values: list
+    ols: dict
+    breakpoint: Optional[dict]
+    fitted: dict  # "ols", "lowess", "segmented" -> valeurs ajustées
+
+    def frame(self) -> pd.DataFrame:
+        """Observations et courbes ajustées : Year, value, ols, lowess, segmented."""
+        return pd.DataFrame({"Year": self.years, "value": self.values, **self.fitted})
+
+
+@dataclass
+class Relation:
+    """Droite des moindres carrés de y en fonction de x (moyennes annuelles)."""
+    x: str
+    y: str
+    version: str
+    intercept: float
+    slope: float
+    r2: float
+    n: int
+
+    def predict(self, x) -> np.ndarray:
+        return self.intercept + self.slope * np.asarray(x, dtype="float64")
+
+
+def ols_trend(years: np.ndarray, values: np.ndarray) -> tuple:
+    """Droite des moindres carrés en fonction de l'année ; Returns: (coefficients, valeurs ajustées)."""
+    import statsmodels.api as sm
+    model = sm.OLS(values, sm.add_constant(years)).fit()
+    slope = float(model.params[1])
+    return {
+        "intercept": float(model.params[0]),
+        "slope": slope,
+        "slope_per_decade": 10 * slope,
+        "slope_stderr": float(model.bse[1]),
+        "pvalue": float(model.pvalues[1]),
+        "r2": float(model.rsquared),
+        "n": int(len(values)),
+    }, model.fittedvalues
+
+
+def lowess_trend(years: np.ndarray, values: np.ndarray, frac: float = TREND_LOWESS_FRAC) -> np.ndarray:
+    from statsmodels.nonparametric.smoothers_lowess import lowess
+    return lowess(values, years, frac=frac, return_sorted=False)
+
+
+def segmented_trend(years: np.ndarray, values: np.ndarray, min_segment: int = TREND_MIN_SEGMENT) -> tuple:
+    """
+    Meilleure rupture de pente d'un modèle linéaire par morceaux continu
+    y = a + b t + c max(t - rupture, 0) : toutes les ruptures candidates (au moins
+    `min_segment` années de chaque côté) sont résolues ensemble (équations normales)
+    Returns: (coefficients ou None si la série est trop courte, valeurs ajustées ou None)
+    """
+    n = len(values)
+    candidates = np.arange(min_segment, n - min_segment + 1)
+    if len(candidates) == 0:
+        return None, None
+
+    t = years - years.mean()
+    hinge = np.maximum(t[None, :] - t[candidates][:, None], 0)
+    X = np.stack([np.ones_like(hinge), np.broadcast_to(t, hinge.shape), hinge], axis=2)  # K x n x 3
+    Xt = X.transpose(0, 2, 1)
+    try:
+        coefs = np.linalg.solve(Xt @ X, (Xt @ values)[:, :, None])[:, :, 0]
+    except np.linalg.LinAlgError:
+        return None, None
+    fitted = np.einsum("knj,kj->kn", X, coefs)
+    sse = ((fitted - values) ** 2).sum(axis=1)
+    best = int(np.argmin(sse))
+
+    # p-value de la variation de pente à la rupture retenue (indicative : la rupture est choisie sur les données)
+    import statsmodels.api as sm
+    model = sm.OLS(values, X[best]).fit()
+    slope_before = float(model.params[1])
+    return {
+        "year": int(years[candidates[best]]),
+        "slope_before_per_decade": 10 * slope_before,
+        "slope_after_per_decade": 10 * (slope_before + float(model.params[2])),
+        "change_pvalue": float(model.pvalues[2]),
+        "sse_ratio": float(sse[best] / ((values - values.mean()) ** 2).sum()),
+    }, model.fittedvalues
+
+
+def fit_trend(name: str, series: pd.Series, version: str) -> Trend:
+    series = series.dropna()
+    years = series.index.to_numpy("float64")
+    values = series.to_numpy("float64")
+    ols, ols_fitted = ols_trend(years, values)
+    breakpoint, segmented = segmented_trend(years, values)
+    return Trend(
+        name=name, version=version,
+        years=series.index.astype(int).tolist(), values=values.tolist(),
+        ols=ols, breakpoint=breakpoint,
+        fitted={
+            "ols": np.asarray(ols_fitted).tolist(),
+            "lowess": lowess_trend(years, values).tolist(),
+            "segmented": np.asarray(segmented).tolist() if segmented is not None else [None] * len(values),
+        },
+    )
+
+
+def fit_relation(x: str, y: str, pair: pd.DataFrame, version: str) -> Relation:
+    import statsmodels.api as sm
+    pair = pair[[x, y]].dropna()
+    model = sm.OLS(pair[y].to_numpy(), sm.add_constant(pair[x].to_numpy())).fit()
+    return Relation(x, y, version, float(model.params[0]), float(model.params[1]),
+                    float(model.rsquared), int(len(pair)))
+
+
+def _version(versions: dict, names) -> str:
+    return hashlib.sha256(repr([versions[name] for name in names]).encode()).hexdigest()[:16]
+
+
+def _path(key: str, version: str):
+    return TRENDS_DIR / f"{key}.{version}.json"
+
+
+def _store(key: str, version: str, payload: dict):
+    """Écrit l'ajustement de `key` et supprime ceux des versions précédentes."""
+    TRENDS_DIR.mkdir(parents=True, exist_ok=True)
+    path = _path(key, version)
+    tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_text(json.dumps(payload))
+    os.replace(tmp, path)
+    for old in TRENDS_DIR.glob(f"{key}.*.json"):
+        if old != path:
+            old.unlink(missing_ok=True)
+
+
+_cache = {}
+_lock = threading.Lock()
+
+
+def _cached(key: str, version: str, cls):
+    with _lock:
+        if (key, version) in _cache:
+            return _cache[(key, version)]
+    path = _path(key, version)
+    if not path.exists():
+        return None
+    result = cls(**json.loads(path.read_text()))
+    with _lock:
+        _cache[(key, version)] = result
+    return result
+
+
+def build_all(names=None, force: bool = False) -> dict:
+    """
+    Ajuste en un passage les tendances de toutes les séries (et les RELATIONS entre elles)
+    dont la version a changé ; Returns: nom -> Trend ou Relation
+    """
+    versions = series_versions(names)
+    relations = [(x, y) for x, y in RELATIONS if x in versions and y in versions]
+    keys = {name: _version(versions, [name]) for name in versions}
+    keys.update({f"{x}~{y}": _version(versions, [x, y]) for x, y in relations})
+
+    results = {}
+    if not force:
+        for name, version in keys.items():
+            cached = _cached(name, version, Relation if "~" in name else Trend)
+            if cached is not None:
+                results[name] = cached
+    stale = [name for name in keys if name not in results]
+    if not stale:
+        return results
+
+    start = time.perf_counter()
+    needed = sorted({part for name in stale for part in name.split("~")})
+    matrix = build_matrix(needed, versions)
+    for name in stale:
+        if "~" in name:
+            x, y = name.split("~")
+            result = fit_relation(x, y, matrix, keys[name])
+        else:
+            result = fit_trend(name, matrix[name], keys[name])
+        _store(name, keys[name], asdict(result))
+        with _lock:
+            _cache[(name, keys[name])] = result
+        results[name] = result
+    logger.info(f"{len(stale)} tendance(s) ajustée(s) en {time.perf_counter() - start:.2f}s")
+    return results
+
+
+def trend(name: str) -> Trend:
+    """Tendances de la série `name` pour la version courante de ses sources."""
+    version = _version(series_versions([name]), [name])
+    return _cached(name, version, Trend) or build_all([name])[name]
+
+
+def relation(x: str, y: str) -> Relation:
+    """Droite de y en fonction de x (doit figurer dans RELATIONS)."""
+    if (x, y) not in RELATIONS:
+        raise KeyError(f"Relation '{y}' en fonction de '{x}' non ajustée (voir RELATIONS)")
+    version = _version(series_versions([x, y]), [x, y])
+    return _cached(f"{x}~{y}", version, Relation) or build_all([x, y])[f"{x}~{y}"]
+
+
+@app.command()
+def main(
+    names: Optional[List[str]] = typer.Option(None, "--series", help="Séries à ajuster (toutes par défaut)"),
+    force: bool = typer.Option(False, help="Réajuster même si les sources n'ont pas changé"),
+):
+    results = build_all(names, force=force)
+    for name, result in results.items():
+        if isinstance(result, Trend):
+            rupture = f", rupture {result.breakpoint['year']}" if result.breakpoint else ""
+            logger.info(f"{name} : {result.ols['slope_per_decade']:+.4g} / décennie "
+                        f"(R² {result.ols['r2']:.3f}){rupture}")
+    logger.success(f"{len(results)} ajustement(s) à jour dans {TRENDS_DIR}")
+
+
+if __name__ == "__main__":
+    app()
@@ -15,6 +15,16 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+
+@st.cache_resource
+def start_prefetch():
+    """Préchargement des sources distantes, lancé une seule fois par processus"""
+    from analysis.prefetch import start_background_prefetch
+    return start_background_prefetch()
+
+
+prefetch_job = start_prefetch()
+
 # Titre principal
 st.title("🌊 Analyse de l'État de l'Océan")
 st.markdown("*Une exploration des transformations océaniques et de leurs interconnexions*")
@@ -27,6 +37,17 @@ page = st.sidebar.selectbox(
     ["🏠 Accueil", "📊 Projet & Analyses", "📚 Documentation"]
 )
 
+# État du préchargement des données
+with st.sidebar.expander("📡 Préchargement des données"):
+    if prefetch_job.done():
+        try:
+            from analysis.prefetch import results_frame
+            st.dataframe(results_frame(prefetch_job.result()), hide_index=True)
+        except Exception as e:
+            st.error(f"❌ Préchargement impossible : {e}")
+    else:
+        st.info("⏳ Préchargement en cours...")
+
 # ===== ONGLET ACCUEIL =====
 if page == "🏠 Accueil":
     st.header("🌊 Bienvenue dans l'analyse de l'état de l'océan")
@@ -111,12 +132,15 @@ elif page == "📊 Projet & Analyses":
             report_plastic_ocean_distribution,
             report_plastic_co2_correlation,
             report_glacier_heat_correlation,
-            display_correlation_metrics,
             create_summary_stats,
             report_acidification_redlist_correlation,
             report_redlist,
-            report_global_warn
+            report_global_warn,
+            report_projections,
+            report_lagged_correlation,
+            report_trend
         )
+        from reports.ui import display_correlation_metrics, display_figure, report_job, zoom_range_slider
         reports_available = True
         st.success("✅ Module de rapports chargé avec succès")
     except ImportError as e:
@@ -129,7 +153,8 @@ elif page == "📊 Projet & Analyses":
         [
             "🌡️ Réchauffement Climatique (Axe Sophie)",
             "🏭 Pollution et Acidification (Axe Julien)",
-            "🔗 Interconnexions et Corrélations"
+            "🔗 Interconnexions et Corrélations",
+            "🔮 Projections"
         ]
     )
 
@@ -148,16 +173,18 @@ elif page == "📊 Projet & Analyses":
             st.markdown("### 📈 Réchauffement climatique global")
 
             if reports_available:
-                if st.button("🌡️ Générer le rapport de réchauffement global", key="global_warming"):
+                if st.button("🌡️ Générer le rapport de réchauffement global", key="global_warming") \
+                        or "global_warming_job" in st.session_state:
                     try:
-                        with st.spinner("Génération du rapport de réchauffement climatique..."):
-                            df, fig = report_global_warn()
+                        result = report_job("global_warming", report_global_warn,
+                                            x_range=st.session_state.get("global_warming_zoom"),
+                                            label="Génération du rapport de réchauffement climatique...")
+                        if result is not None:
+                            df, fig = result
 
                             # Affichage du graphique (adapter selon le type de figure retournée)
-                            if hasattr(fig, 'show'):  # Figure Plotly
-                                st.plotly_chart(fig, use_container_width=True)
-                            else:  # Figure Matplotlib
-                                st.pyplot(fig)
+                            display_figure(fig)
+                            zoom_range_slider(df[df["Entity"] == "World"], "Year", key="global_warming_zoom")
 
                             # Statistiques de réchauffement global
                             st.subheader("🌡️ Statistiques de réchauffement global")
@@ -281,20 +308,8 @@ elif page == "📊 Projet & Analyses":
 
                             # Données détaillées
                             with st.expander("📋 Données de réchauffement détaillées"):
-                                # Ajout d'informations contextuelles
-                                if temp_cols:
-                                    df_display = df.copy()
-
-                                    # Catégorisation des niveaux de réchauffement
-                                    if temp_col in df_display.columns:
-                                        df_display['Niveau_Alerte'] = df_display[temp_col].apply(
-                                            lambda x: "🚨 Critique" if x > 1.5 else
-                                            "🔴 Alarmant" if x > 1.0 else
-                                            "🟠 Préoccupant" if x > 0.5 else
-                                            "🟡 Surveillance" if x > 0 else "🟢 Normal"
-                                        )
-
-                                st.dataframe(df_display)
+                                # Niveaux d'alerte (colonne Niveau_Alerte) calculés par le rapport
+                                st.dataframe(df)
 
                             # Contexte scientifique
                             st.subheader("📚 Contexte scientifique")
@@ -324,13 +339,17 @@ elif page == "📊 Projet & Analyses":
 
 
             if reports_available:
-                if st.button("🌡️ Générer le rapport de chaleur océanique", key="ocean_heat"):
+                if st.button("🌡️ Générer le rapport de chaleur océanique", key="ocean_heat") \
+                        or "ocean_heat_job" in st.session_state:
                     try:
-                        with st.spinner("Génération du rapport de chaleur océanique..."):
-                            df, fig = report_heat()
+                        result = report_job("ocean_heat", report_heat,
+                                            x_range=st.session_state.get("ocean_heat_zoom"),
+                                            label="Génération du rapport de chaleur océanique...")
+                        if result is not None:
+                            df, fig = result
 
-                            # CORRECTION : Utiliser plotly_chart au lieu de pyplot
-                            st.plotly_chart(fig, use_container_width=True)
+                            display_figure(fig)
+                            zoom_range_slider(df, "Year", key="ocean_heat_zoom")
 
                             # Statistiques de température
                             st.subheader("📊 Statistiques de chaleur océanique")
@@ -378,16 +397,16 @@ elif page == "📊 Projet & Analyses":
 
                 if glacier_option == "🧊 Évolution de la fonte":
 
-                    if st.button("🧊 Générer rapport fonte des glaces", key="glaciers_alone"):
+                    if st.button("🧊 Générer rapport fonte des glaces", key="glaciers_alone") \
+                            or "glaciers_alone_job" in st.session_state:
                         try:
-                            with st.spinner("Génération du rapport de fonte des glaces..."):
-                                df, fig = report_glaciermelting()
+                            result = report_job("glaciers_alone", report_glaciermelting,
+                                                label="Génération du rapport de fonte des glaces...")
+                            if result is not None:
+                                df, fig = result
 
                                 # Vérifier le type de figure et afficher correctement
-                                if hasattr(fig, 'show'):  # Figure Plotly
-                                    st.plotly_chart(fig, use_container_width=True)
-                                else:  # Figure Matplotlib
-                                    st.pyplot(fig)
+                                display_figure(fig)
 
                                 # Statistiques glaciers
                                 st.subheader("🧊 Statistiques de fonte")
@@ -418,13 +437,16 @@ elif page == "📊 Projet & Analyses":
 
 
                 elif glacier_option == "🔗 Corrélation Glaciers ↔ Chaleur":
-                    if st.button("🔗 Générer corrélation Glaciers-Chaleur", key="glaciers_heat"):
+                    if st.button("🔗 Générer corrélation Glaciers-Chaleur", key="glaciers_heat") \
+                            or "glaciers_heat_job" in st.session_state:
                         try:
-                            with st.spinner("Analyse corrélation Glaciers-Chaleur..."):
-                                df, fig, correlation = report_glacier_heat_correlation()
+                            result = report_job("glaciers_heat", report_glacier_heat_correlation,
+                                                label="Analyse corrélation Glaciers-Chaleur...")
+                            if result is not None:
+                                df, fig, correlation = result
 
                                 if fig is not None:
-                                    st.plotly_chart(fig, use_container_width=True)
+                                    display_figure(fig)
 
                                     # Métriques de corrélation
                                     st.subheader("📊 Analyse de corrélation")
@@ -448,11 +470,14 @@ elif page == "📊 Projet & Analyses":
                             st.code(traceback.format_exc())
 
                 else:  # Corrélation Glaciers ↔ Niveau des mers
-                    if st.button("🌊 Générer corrélation Glaciers-Niveau mers", key="glaciers_sealevel"):
+                    if st.button("🌊 Générer corrélation Glaciers-Niveau mers", key="glaciers_sealevel") \
+                            or "glaciers_sealevel_job" in st.session_state:
                         try:
-                            with st.spinner("Analyse corrélation Glaciers-Niveau des mers..."):
-                                df, fig, correlation = report_glaciermelting_sealevel_correlation()
-                                st.pyplot(fig)
+                            result = report_job("glaciers_sealevel", report_glaciermelting_sealevel_correlation,
+                                                label="Analyse corrélation Glaciers-Niveau des mers...")
+                            if result is not None:
+                                df, fig, correlation = result
+                                display_figure(fig)
 
                                 # Métriques de corrélation
                                 st.subheader("📊 Analyse de corrélation")
@@ -478,11 +503,16 @@ elif page == "📊 Projet & Analyses":
         with tab4:
             st.markdown("### 📏 Montée du niveau des eaux")
             if reports_available:
-                if st.button("🌊 Générer rapport niveau des mers", key="sealevel"):
+                if st.button("🌊 Générer rapport niveau des mers", key="sealevel") \
+                        or "sealevel_job" in st.session_state:
                     try:
-                        with st.spinner("Génération du rapport niveau des mers..."):
-                            df, fig = report_sealevel()
-                            st.plotly_chart(fig, use_container_width=True)
+                        result = report_job("sealevel", report_sealevel,
+                                            x_range=st.session_state.get("sealevel_zoom"),
+                                            label="Génération du rapport niveau des mers...")
+                        if result is not None:
+                            df, fig = result
+                            display_figure(fig)
+                            zoom_range_slider(df, "Day", key="sealevel_zoom")
 
                             # Statistiques niveau des mers
                             st.subheader("🌊 Statistiques niveau des mers")
@@ -540,11 +570,14 @@ elif page == "📊 Projet & Analyses":
                 ])
 
                 with plastic_tab1:
-                    if st.button("📊 Générer rapport Micro/Macroplastiques", key="micro_macro"):
+                    if st.button("📊 Générer rapport Micro/Macroplastiques", key="micro_macro") \
+                            or "micro_macro_job" in st.session_state:
                         try:
-                            with st.spinner("Génération du rapport plastiques..."):
-                                df, fig = report_plastic_evolution()
-                                st.pyplot(fig)
+                            result = report_job("micro_macro", report_plastic_evolution,
+                                                label="Génération du rapport plastiques...")
+                            if result is not None:
+                                df, fig = result
+                                display_figure(fig)
 
                                 # Statistiques plastiques
                                 st.subheader("📊 Statistiques plastiques")
@@ -567,11 +600,14 @@ elif page == "📊 Projet & Analyses":
                             st.code(traceback.format_exc())
 
                 with plastic_tab2:
-                    if st.button("🌍 Générer rapport déchets par pays", key="waste_countries"):
+                    if st.button("🌍 Générer rapport déchets par pays", key="waste_countries") \
+                            or "waste_countries_job" in st.session_state:
                         try:
-                            with st.spinner("Génération du rapport par pays..."):
-                                df, fig = report_plastic_waste_countries()
-                                st.pyplot(fig)
+                            result = report_job("waste_countries", report_plastic_waste_countries,
+                                                label="Génération du rapport par pays...")
+                            if result is not None:
+                                df, fig = result
+                                display_figure(fig)
 
                                 # Statistiques des top pays
                                 latest_year = df['Year'].max()
@@ -594,11 +630,14 @@ elif page == "📊 Projet & Analyses":
                             st.code(traceback.format_exc())
 
                 with plastic_tab3:
-                    if st.button("🏭 Générer rapport production mondiale", key="production"):
+                    if st.button("🏭 Générer rapport production mondiale", key="production") \
+                            or "production_job" in st.session_state:
                         try:
-                            with st.spinner("Génération du rapport de production..."):
-                                df, fig = report_plastic_production_global()
-                                st.pyplot(fig)
+                            result = report_job("production", report_plastic_production_global,
+                                                label="Génération du rapport de production...")
+                            if result is not None:
+                                df, fig = result
+                                display_figure(fig)
 
                                 # Métriques de production
                                 col1, col2, col3 = st.columns(3)
@@ -623,11 +662,14 @@ elif page == "📊 Projet & Analyses":
                             st.code(traceback.format_exc())
 
                 with plastic_tab4:
-                    if st.button("🌊 Générer rapport répartition océanique", key="ocean_distrib"):
+                    if st.button("🌊 Générer rapport répartition océanique", key="ocean_distrib") \
+                            or "ocean_distrib_job" in st.session_state:
                         try:
-                            with st.spinner("Génération du camembert..."):
-                                df, fig = report_plastic_ocean_distribution()
-                                st.pyplot(fig)
+                            result = report_job("ocean_distrib", report_plastic_ocean_distribution,
+                                                label="Génération du camembert...")
+                            if result is not None:
+                                df, fig = result
+                                display_figure(fig)
 
                                 # Top 5 pollueurs
                                 top_5 = df.nlargest(5, 'Share of global plastics emitted to ocean')
@@ -653,11 +695,14 @@ elif page == "📊 Projet & Analyses":
             st.markdown("### 💨 Augmentation du CO2")
 
             if reports_available:
-                if st.button("📊 Générer corrélation CO2 ↔ Production plastique", key="co2_plastic"):
+                if st.button("📊 Générer corrélation CO2 ↔ Production plastique", key="co2_plastic") \
+                        or "co2_plastic_job" in st.session_state:
                     try:
-                        with st.spinner("Analyse de corrélation CO2-Plastique..."):
-                            df, fig, correlation = report_plastic_co2_correlation()
-                            st.pyplot(fig)
+                        result = report_job("co2_plastic", report_plastic_co2_correlation,
+                                            label="Analyse de corrélation CO2-Plastique...")
+                        if result is not None:
+                            df, fig, correlation = result
+                            display_figure(fig)
 
                             # Métriques de corrélation
                             st.subheader("📊 Analyse statistique")
@@ -706,11 +751,14 @@ elif page == "📊 Projet & Analyses":
                 )
 
                 if acid_option == "📈 Évolution pH seule":
-                    if st.button("📊 Générer rapport acidification", key="acidification"):
+                    if st.button("📊 Générer rapport acidification", key="acidification") \
+                            or "acidification_job" in st.session_state:
                         try:
-                            with st.spinner("Génération du rapport d'acidification..."):
-                                df, fig = report_acidification()
-                                st.pyplot(fig)
+                            result = report_job("acidification", report_acidification,
+                                                label="Génération du rapport d'acidification...")
+                            if result is not None:
+                                df, fig = result
+                                display_figure(fig)
 
                                 # Statistiques pH
                                 col1, col2, col3 = st.columns(3)
@@ -741,11 +789,14 @@ elif page == "📊 Projet & Analyses":
                             st.code(traceback.format_exc())
 
                 else:  # Corrélation pH ↔ CO2
-                    if st.button("🔗 Générer corrélation pH ↔ CO2", key="acid_co2"):
+                    if st.button("🔗 Générer corrélation pH ↔ CO2", key="acid_co2") \
+                            or "acid_co2_job" in st.session_state:
                         try:
-                            with st.spinner("Analyse corrélation Acidification-CO2..."):
-                                df, fig, correlation = report_acidification_co2_correlation()
-                                st.pyplot(fig)
+                            result = report_job("acid_co2", report_acidification_co2_correlation,
+                                                label="Analyse corrélation Acidification-CO2...")
+                            if result is not None:
+                                df, fig, correlation = result
+                                display_figure(fig)
 
                                 # Métriques de corrélation
                                 st.subheader("📊 Analyse de corrélation critique")
@@ -796,11 +847,14 @@ elif page == "📊 Projet & Analyses":
                 )
 
                 if bio_option == "📊 Distribution Liste Rouge":
-                    if st.button("🐠 Générer rapport Liste Rouge", key="red_list"):
+                    if st.button("🐠 Générer rapport Liste Rouge", key="red_list") \
+                            or "red_list_job" in st.session_state:
                         try:
-                            with st.spinner("Génération du rapport Liste Rouge..."):
-                                df, fig = report_redlist()
-                                st.pyplot(fig)
+                            result = report_job("red_list", report_redlist,
+                                                label="Génération du rapport Liste Rouge...")
+                            if result is not None:
+                                df, fig = result
+                                display_figure(fig)
 
                                 # Statistiques biodiversité
                                 st.subheader("🐠 Statistiques de biodiversité")
@@ -828,24 +882,19 @@ elif page == "📊 Projet & Analyses":
                                 st.subheader("🌍 Répartition par niveau de risque")
 
 
-                                # Catégorisation
-                                def categorize_risk(index_val):
-                                    if index_val < 0.6:
-                                        return "🔴 Critique"
-                                    elif index_val < 0.7:
-                                        return "🟠 Élevé"
-                                    elif index_val < 0.8:
-                                        return "🟡 Modéré"
-                                    else:
-                                        return "🟢 Faible"
-
-
-                                latest_data['Niveau_Risque'] = latest_data['_15_5_1__er_rsk_lst'].apply(categorize_risk)
+                                # Catégorisation (colonne Niveau_Risque calculée par le rapport) ;
+                                # les niveaux sans aucune entité ne sont pas affichés
                                 risk_counts = latest_data['Niveau_Risque'].value_counts()
 
-                                for risk, count in risk_counts.items():
+                                for risk, count in risk_counts[risk_counts > 0].items():
                                     st.metric(risk, f"{count} pays/entités")
 
+                                # Indice manquant : aucun niveau attribué (et non plus « Faible » par défaut)
+                                unclassified = int(latest_data['Niveau_Risque'].isna().sum())
+                                if unclassified:
+                                    st.metric("⚪ Indice non renseigné", f"{unclassified} pays/entités",
+                                              help="Entités sans valeur d'indice : aucun niveau de risque attribué")
+
                                 with st.expander("📋 Données Liste Rouge détaillées"):
                                     st.dataframe(
                                         latest_data[['Entity', '_15_5_1__er_rsk_lst', 'Niveau_Risque']].sort_values(
@@ -858,11 +907,14 @@ elif page == "📊 Projet & Analyses":
                             st.code(traceback.format_exc())
 
                 else:  # Corrélation Acidification ↔ Biodiversité
-                    if st.button("🔗 Générer corrélation Acidification ↔ Biodiversité", key="acid_biodiversity"):
+                    if st.button("🔗 Générer corrélation Acidification ↔ Biodiversité", key="acid_biodiversity") \
+                            or "acid_biodiversity_job" in st.session_state:
                         try:
-                            with st.spinner("Analyse corrélation Acidification-Biodiversité..."):
-                                df, fig, correlation = report_acidification_redlist_correlation()
-                                st.pyplot(fig)
+                            result = report_job("acid_biodiversity", report_acidification_redlist_correlation,
+                                                label="Analyse corrélation Acidification-Biodiversité...")
+                            if result is not None:
+                                df, fig, correlation = result
+                                display_figure(fig)
 
                                 # Métriques de corrélation
                                 st.subheader("📊 Analyse de corrélation écologique")
@@ -931,16 +983,8 @@ elif page == "📊 Projet & Analyses":
 
                                 # Données détaillées
                                 with st.expander("📋 Données corrélation Acidification-Biodiversité"):
-                                    # Ajout de colonnes calculées pour l'analyse
-                                    df_display = df.copy()
-                                    df_display['Acidification_Niveau'] = df_display['Ocean_acidification(in_PH)'].apply(
-                                        lambda
-                                            x: "🔴 Critique" if x < 7.9 else "🟠 Préoccupant" if x < 8.0 else "🟡 Surveillance" if x < 8.1 else "🟢 Normal"
-                                    )
-                                    df_display['Biodiversite_Niveau'] = df_display['red_list_index'].apply(
-                                        lambda
-                                            x: "🔴 Très menacé" if x > 0.8 else "🟠 Menacé" if x > 0.6 else "🟡 Vulnérable" if x > 0.4 else "🟢 Stable"
-                                    )
+                                    # Niveaux Acidification_Niveau / Biodiversite_Niveau calculés par le rapport
+                                    df_display = df
 
                                     st.dataframe(df_display[['year', 'Ocean_acidification(in_PH)', 'red_list_index',
                                                              'Acidification_Niveau', 'Biodiversite_Niveau']])
@@ -960,7 +1004,7 @@ elif page == "📊 Projet & Analyses":
 
 
     # ===== INTERCONNEXIONS =====
-    else:  # Interconnexions et Corrélations
+    elif analysis_type == "🔗 Interconnexions et Corrélations":
         st.subheader("🔗 Interconnexions et Corrélations")
         st.markdown("*Synthèse des relations entre tous les phénomènes océaniques*")
 
@@ -999,41 +1043,118 @@ elif page == "📊 Projet & Analyses":
 
             with col1:
                 st.markdown("#### 🌡️ Corrélations Climatiques")
-                if st.button("🧊 Glaciers ↔ Chaleur", key="quick_glacier_heat"):
+                if st.button("🧊 Glaciers ↔ Chaleur", key="quick_glacier_heat") \
+                        or "quick_glacier_heat_job" in st.session_state:
                     try:
-                        df, fig, corr = report_glacier_heat_correlation()
-                        if fig:
-                            st.plotly_chart(fig, use_container_width=True)
-                            display_correlation_metrics(corr, "Glaciers-Chaleur")
+                        result = report_job("quick_glacier_heat", report_glacier_heat_correlation)
+                        if result is not None:
+                            df, fig, corr = result
+                            if fig:
+                                display_figure(fig)
+                                display_correlation_metrics(corr, "Glaciers-Chaleur")
                     except Exception as e:
                         st.error(f"❌ {e}")
 
-                if st.button("🌊 Glaciers ↔ Niveau mers", key="quick_glacier_sea"):
+                if st.button("🌊 Glaciers ↔ Niveau mers", key="quick_glacier_sea") \
+                        or "quick_glacier_sea_job" in st.session_state:
                     try:
-                        df, fig, corr = report_glaciermelting_sealevel_correlation()
-                        st.pyplot(fig)
-                        display_correlation_metrics(corr, "Glaciers-Niveau")
+                        result = report_job("quick_glacier_sea", report_glaciermelting_sealevel_correlation)
+                        if result is not None:
+                            df, fig, corr = result
+                            display_figure(fig)
+                            display_correlation_metrics(corr, "Glaciers-Niveau")
                     except Exception as e:
                         st.error(f"❌ {e}")
 
             with col2:
                 st.markdown("#### 🏭 Corrélations Pollution")
-                if st.button("💨 CO2 ↔ Plastique", key="quick_co2_plastic"):
+                if st.button("💨 CO2 ↔ Plastique", key="quick_co2_plastic") \
+                        or "quick_co2_plastic_job" in st.session_state:
                     try:
-                        df, fig, corr = report_plastic_co2_correlation()
-                        st.pyplot(fig)
-                        display_correlation_metrics(corr, "CO2-Plastique")
+                        result = report_job("quick_co2_plastic", report_plastic_co2_correlation)
+                        if result is not None:
+                            df, fig, corr = result
+                            display_figure(fig)
+                            display_correlation_metrics(corr, "CO2-Plastique")
                     except Exception as e:
                         st.error(f"❌ {e}")
 
-                if st.button("⚗️ CO2 ↔ Acidification", key="quick_co2_acid"):
+                if st.button("⚗️ CO2 ↔ Acidification", key="quick_co2_acid") \
+                        or "quick_co2_acid_job" in st.session_state:
                     try:
-                        df, fig, corr = report_acidification_co2_correlation()
-                        st.pyplot(fig)
-                        display_correlation_metrics(corr, "CO2-Acidification")
+                        result = report_job("quick_co2_acid", report_acidification_co2_correlation)
+                        if result is not None:
+                            df, fig, corr = result
+                            display_figure(fig)
+                            display_correlation_metrics(corr, "CO2-Acidification")
                     except Exception as e:
                         st.error(f"❌ {e}")
 
+            # Explorateur de corrélations décalées et glissantes
+            st.subheader("⏱️ Corrélations décalées et glissantes")
+            st.markdown("*Un indicateur en précède-t-il un autre ? La relation est-elle stable dans le temps ?*")
+
+            from analysis.correlations import SERIES_LABELS
+
+            col1, col2 = st.columns(2)
+            with col1:
+                series_a = st.selectbox("Série A", list(SERIES_LABELS), index=list(SERIES_LABELS).index("glacier"),
+                                        format_func=SERIES_LABELS.get, key="lag_series_a")
+                max_lag = st.slider("↔️ Décalage maximal (années)", min_value=1, max_value=30, value=10,
+                                    key="lag_max")
+            with col2:
+                series_b = st.selectbox("Série B", list(SERIES_LABELS), index=list(SERIES_LABELS).index("ohc"),
+                                        format_func=SERIES_LABELS.get, key="lag_series_b")
+                window = st.slider("🪟 Fenêtre glissante (années)", min_value=5, max_value=50, value=15,
+                                   key="lag_window")
+
+            if series_a == series_b:
+                st.info("ℹ️ Choisissez deux séries différentes")
+            else:
+                try:
+                    # Profils calculés une fois par version des données : les curseurs n'en extraient qu'une partie
+                    df, fig = report_lagged_correlation(series_a, series_b, max_lag, window)
+                    display_figure(fig)
+
+                    best = df.loc[df["r"].abs().idxmax()]
+                    col1, col2, col3 = st.columns(3)
+                    with col1:
+                        st.metric("🎯 Décalage le plus corrélé", f"{int(best['lag']):+d} ans")
+                    with col2:
+                        st.metric("📈 r à ce décalage", f"{best['r']:.3f}")
+                    with col3:
+                        st.metric("📅 Années communes", f"{int(best['n'])}",
+                                  help=f"dont {int(best['interpolated'])} avec une valeur interpolée "
+                                       "(lacunes de 2 ans au plus ; les plus longues sont exclues)")
+                except Exception as e:
+                    st.error(f"❌ {e}")
+
+            # Tendances précalculées de chaque indicateur
+            st.subheader("📐 Tendances des indicateurs")
+            st.markdown("*Tendance linéaire, lissage LOWESS et rupture de pente, ajustés à l'avance (`make trends`)*")
+
+            trend_series = st.selectbox("Indicateur", list(SERIES_LABELS), index=list(SERIES_LABELS).index("sea_level"),
+                                        format_func=SERIES_LABELS.get, key="trend_series")
+            try:
+                df, fig, fitted = report_trend(trend_series)
+                display_figure(fig)
+
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("📈 Pente par décennie", f"{fitted.ols['slope_per_decade']:+.4g}",
+                              help=f"p-value : {fitted.ols['pvalue']:.2e}")
+                with col2:
+                    st.metric("🎯 R² linéaire", f"{fitted.ols['r2']:.3f}")
+                with col3:
+                    if fitted.breakpoint:
+                        st.metric("✂️ Rupture de pente", f"{fitted.breakpoint['year']}",
+                                  help=f"Pente par décennie : {fitted.breakpoint['slope_before_per_decade']:+.4g} avant, "
+                                       f"{fitted.breakpoint['slope_after_per_decade']:+.4g} après")
+                    else:
+                        st.metric("✂️ Rupture de pente", "—", help="Série trop courte")
+            except Exception as e:
+                st.error(f"❌ {e}")
+
             # Synthèse narrative
             st.subheader("📖 Synthèse narrative")
             st.markdown("""
@@ -1053,6 +1174,47 @@ elif page == "📊 Projet & Analyses":
         else:
             st.error("❌ Module de rapports non disponible - Impossible d'afficher les interconnexions")
 
+    # ===== PROJECTIONS =====
+    else:  # Projections
+        st.subheader("🔮 Projections selon les émissions de CO2")
+        st.markdown("*Scénarios d'émissions appliqués aux modèles de prévision entraînés (`make train`)*")
+
+        if reports_available:
+            targets = {"🌊 Niveau de la mer": "sea_level", "🌡️ Chaleur océanique": "ohc"}
+            target_label = st.selectbox("Choisir la série projetée", list(targets))
+            horizon = st.slider("📅 Horizon (années)", min_value=5, max_value=100, value=30, step=5)
+            growth_rates = st.multiselect(
+                "🏭 Croissance annuelle des émissions de CO2 (%)",
+                [-3, -2, -1, 0, 1, 2, 3],
+                default=[-2, 0, 1, 2]
+            )
+
+            if growth_rates:
+                try:
+                    # Modèle gardé en mémoire : chaque changement de curseur est projeté sans rechargement
+                    df, fig = report_projections(targets[target_label], horizon,
+                                                 tuple(rate / 100 for rate in sorted(growth_rates)))
+                    display_figure(fig)
+
+                    # Valeur projetée en fin d'horizon pour chaque scénario
+                    final = df[df["step"] == horizon]
+                    cols = st.columns(len(final))
+                    for col, (_, row) in zip(cols, final.iterrows()):
+                        with col:
+                            st.metric(f"{row['Scénario']} ({row['year']})", f"{row['prediction']:.2f}")
+
+                    with st.expander("📋 Projections détaillées"):
+                        st.dataframe(df.pivot(index="year", columns="Scénario", values="prediction"))
+                        st.caption(f"Modèle version {df['model_version'].iloc[0]}")
+                except FileNotFoundError:
+                    st.warning("⚠️ Aucun modèle entraîné : lancer `make train` (python -m analysis.modeling.train)")
+                except Exception as e:
+                    st.error(f"❌ Erreur lors du calcul des projections : {e}")
+            else:
+                st.info("Choisir au moins un scénario d'émissions")
+        else:
+            st.error("❌ Module de rapports non disponible - Impossible d'afficher les projections")
+
 # ===== ONGLET DOCUMENTATION =====
 else:  # Documentation
     st.header("📚 Documentation et Sources")
@@ -1,29 +1,16 @@
 """
 Module reports pour OceanState Analysis
 Import de toutes les fonctions de rapport
+Les noms sont résolus à la première utilisation (PEP 562) : importer le paquet
+ne charge ni les données ni les bibliothèques graphiques
 """
 
-from .reports import (
-    report_acidification,
-    report_acidification_co2_correlation,
-    report_plastic_evolution,
-    report_plastic_waste_countries,
-    report_plastic_production_global,
-    report_plastic_ocean_distribution,
-    report_plastic_co2_correlation,
-    report_glacier_heat_correlation,
-    display_correlation_metrics,
-    create_summary_stats,
-    report_sealevel,
-    report_heat,
-    report_glaciermelting,
-    report_glaciermelting_sealevel_correlation,
-    report_redlist,
-    report_acidification_redlist_correlation,
-    report_global_warn
-)
+import importlib
 
 __all__ = [
+    'Report',
+    'CorrelationReport',
+    'TrendReport',
     'report_acidification',
     'report_acidification_co2_correlation',
     'report_plastic_evolution',
@@ -32,7 +19,6 @@ __all__ = [
     'report_plastic_ocean_distribution',
     'report_plastic_co2_correlation',
     'report_glacier_heat_correlation',
-    'display_correlation_metrics',
     'create_summary_stats',
     'report_sealevel',
     'report_heat',
@@ -40,5 +26,20 @@ __all__ = [
     'report_glaciermelting_sealevel_correlation',
     'report_redlist',
     'report_acidification_redlist_correlation',
-    'report_global_warn'
-]
\ No newline at end of file
+    'report_global_warn',
+    'report_projections',
+    'report_lagged_correlation',
+    'report_trend'
+]
+
+
+def __getattr__(name):
+    if name in __all__:
+        value = getattr(importlib.import_module(".reports", __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
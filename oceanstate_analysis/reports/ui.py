@@ -0,0 +1,135 @@
+"""
+Adaptateur Streamlit des rapports
+Seul module du paquet qui importe Streamlit : il affiche les résultats typés
+(Report, CorrelationReport) calculés par reports.reports
+"""
+
+import pandas as pd
+import streamlit as st
+
+from analysis.config import JOB_POLL_SECONDS
+from analysis.jobs import FAILED, QUEUED, JobQueue
+from analysis.render_cache import RenderedFigure
+
+
+@st.cache_resource
+def job_queue() -> JobQueue:
+    """File de rapports partagée par toutes les sessions du serveur."""
+    return JobQueue()
+
+
+def _show_progress(job, label):
+    @st.fragment(run_every=JOB_POLL_SECONDS)
+    def poll():
+        # Résultat prêt : réexécution complète de la page pour l'afficher
+        if job.done():
+            st.rerun()
+        status = "en attente" if job.status == QUEUED else f"{job.elapsed:.0f}s"
+        st.progress(job.progress(), text=f"{label} ({status})")
+
+    poll()
+
+
+def close_report(key):
+    """Ferme le panneau du rapport `key` : la demande n'est plus relancée aux réexécutions."""
+    st.session_state.pop(f"{key}_job", None)
+    st.session_state.pop(f"{key}_result", None)
+
+
+def report_job(key, func, *args, label="Génération du rapport...", **kwargs):
+    """
+    Calcule func(*args, **kwargs) dans la file de fond (ou rejoint le calcul identique en cours)
+    Returns: le résultat du rapport ; tant qu'il n'est pas prêt, la progression est affichée,
+    le résultat précédent de `key` est renvoyé (None au premier calcul) et la page se
+    réexécute d'elle-même à la fin. st.session_state[f"{key}_job"] garde la demande
+    ouverte entre les réexécutions (curseurs du rapport) jusqu'au bouton « Fermer »
+    """
+    if st.button("✖️ Fermer", key=f"{key}_close", help="Fermer ce rapport"):
+        close_report(key)
+        st.rerun()
+
+    job = job_queue().submit(func, *args, **kwargs)
+    st.session_state[f"{key}_job"] = job.key
+    if not job.done():
+        _show_progress(job, label)
+        return st.session_state.get(f"{key}_result")
+    if job.status == FAILED:
+        del st.session_state[f"{key}_job"]
+        st.session_state.pop(f"{key}_result", None)
+    result = job.result()
+    st.session_state[f"{key}_result"] = result
+    return result
+
+
+def display_figure(fig):
+    """Affiche dans Streamlit une figure Plotly, Matplotlib ou rendue depuis le cache"""
+    if isinstance(fig, RenderedFigure):
+        st.image(fig.png)
+    elif hasattr(fig, 'to_plotly_json'):
+        st.plotly_chart(fig, use_container_width=True)
+    else:
+        st.pyplot(fig)
+
+def zoom_range_slider(df, column, key, label="🔍 Période affichée"):
+    """
+    Curseur de plage sur l'axe des abscisses ; la valeur choisie (st.session_state[key])
+    est renvoyée au rapport au prochain rendu pour retracer la fenêtre avec plus de détail
+    """
+    values = df[column].dropna()
+    if pd.api.types.is_datetime64_any_dtype(values):
+        start, end = values.min().date(), values.max().date()
+    else:
+        start, end = int(values.min()), int(values.max())
+    if start == end:
+        return None
+    return st.slider(label, min_value=start, max_value=end, value=(start, end), key=key)
+
+def display_correlation_metrics(correlation, title="Corrélation"):
+    """
+    Affiche les métriques de corrélation dans Streamlit ; pour une RobustCorrelation, la
+    significativité suit le test de permutation par blocs et l'intervalle de confiance
+    bootstrap est affiché
+    """
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        st.metric("📊 Corrélation (r)", f"{correlation[0]:.4f}")
+
+    with col2:
+        # Interprétation de la corrélation
+        abs_corr = abs(correlation[0])
+        if abs_corr > 0.8:
+            interpretation = "Très forte"
+            color = "🟢"
+        elif abs_corr > 0.6:
+            interpretation = "Forte"
+            color = "🟡"
+        elif abs_corr > 0.3:
+            interpretation = "Modérée"
+            color = "🟠"
+        else:
+            interpretation = "Faible"
+            color = "🔴"
+
+        st.metric(f"{color} Force", interpretation)
+
+    robust = getattr(correlation, "permutation_pvalue", None) is not None
+    pvalue = correlation.permutation_pvalue if robust else correlation[1]
+
+    with col3:
+        # Significativité statistique (test par blocs : tient compte de l'autocorrélation des séries)
+        is_significant = pvalue < 0.05
+        significance = "Significative" if is_significant else "Non significative"
+        sig_color = "✅" if is_significant else "❌"
+        st.metric(f"{sig_color} P-value", f"{pvalue:.2e}", help=significance)
+
+    if robust:
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric(f"🎯 IC {correlation.confidence:.0%} (bootstrap par blocs)",
+                      f"[{correlation.ci_low:.3f} ; {correlation.ci_high:.3f}]")
+        with col2:
+            st.metric("📐 P-value de Pearson (années indépendantes)", f"{correlation[1]:.2e}")
+        with col3:
+            st.metric("🧮 Rééchantillonnages", f"{correlation.resamples}",
+                      help=f"{correlation.n} années, blocs de {correlation.block_length} ans")
@@ -0,0 +1,5 @@
+import os
+import tempfile
+
+# Les modules de `analysis` créent leurs répertoires à l'import : données de test isolées
+os.environ.setdefault("OCEANSTATE_DATA_DIR", tempfile.mkdtemp(prefix="oceanstate-tests-"))
@@ -0,0 +1,151 @@
+"""Cache HTTP local (analysis/cache.py) face à un serveur HTTP de test."""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import os
+import threading
+import time
+
+import pytest
+
+from analysis import cache
+
+
+class Origin:
+    """Serveur HTTP local qui sert des contenus versionnés par ETag."""
+
+    def __init__(self):
+        self.files = {}  # chemin -> contenu
+        self.requests = []  # (chemin, en-têtes)
+        self.fail = False
+        origin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                origin.requests.append((self.path, dict(self.headers)))
+                if origin.fail:
+                    self.send_error(503)
+                    return
+                content = origin.files.get(self.path)
+                if content is None:
+                    self.send_error(404)
+                    return
+                etag = f'"{hash(content) & 0xFFFFFFFF:x}"'
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def url(self, path):
+        return f"http://127.0.0.1:{self.server.server_port}{path}"
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def origin():
+    server = Origin()
+    yield server
+    server.close()
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(cache, "INDEX_DIR", tmp_path / "index")
+    monkeypatch.setattr(cache, "BLOBS_DIR", tmp_path / "blobs")
+    return tmp_path
+
+
+def test_fresh_entry_is_served_from_disk(origin):
+    origin.files["/a.csv"] = b"year,value\n2000,1\n"
+
+    first = cache.fetch(origin.url("/a.csv"), ttl=3600)
+    second = cache.fetch(origin.url("/a.csv"), ttl=3600)
+
+    assert first == second
+    assert first.read_bytes() == b"year,value\n2000,1\n"
+    assert len(origin.requests) == 1
+
+
+def test_expired_entry_is_revalidated(origin):
+    origin.files["/a.csv"] = b"year,value\n2000,1\n"
+    first = cache.fetch(origin.url("/a.csv"), ttl=0)
+
+    second = cache.fetch(origin.url("/a.csv"), ttl=0)
+
+    assert second == first
+    assert len(origin.requests) == 2
+    assert "If-None-Match" in origin.requests[1][1]
+
+
+def test_changed_content_replaces_blob(origin):
+    origin.files["/a.csv"] = b"year,value\n2000,1\n"
+    first = cache.fetch(origin.url("/a.csv"), ttl=0)
+    origin.files["/a.csv"] = b"year,value\n2000,1\n2001,2\n"
+
+    second = cache.fetch(origin.url("/a.csv"), ttl=0)
+
+    assert second != first
+    assert second.read_bytes().endswith(b"2001,2\n")
+    assert not first.exists()
+
+
+def test_offline_fallback_serves_last_copy(origin):
+    origin.files["/a.csv"] = b"year,value\n2000,1\n"
+    first = cache.fetch(origin.url("/a.csv"), ttl=0)
+    origin.fail = True
+
+    assert cache.fetch(origin.url("/a.csv"), ttl=0) == first
+    with pytest.raises(cache.requests.RequestException):
+        cache.fetch(origin.url("/missing.csv"), ttl=0)
+
+
+def _age(url, seconds):
+    """Recule la date d'accès de l'entrée de `url`."""
+    path = cache.INDEX_DIR / f"{cache.cache_key(url)}.json"
+    past = time.time() - seconds
+    os.utime(path, (past, past))
+
+
+def test_lru_eviction(origin, monkeypatch):
+    for name in ("a", "b", "c"):
+        origin.files[f"/{name}.csv"] = name.encode() * 100
+    paths = {name: cache.fetch(origin.url(f"/{name}.csv")) for name in ("a", "b", "c")}
+    _age(origin.url("/a.csv"), 3000)
+    _age(origin.url("/b.csv"), 2000)
+    _age(origin.url("/c.csv"), 1000)
+    monkeypatch.setattr(cache, "EVICT_GRACE", 0)
+
+    # "a" est la moins récemment utilisée : servir "a" depuis le cache la rajeunit
+    cache.fetch(origin.url("/a.csv"))
+    total = cache.evict(max_bytes=200)
+
+    assert total == 200
+    assert paths["a"].exists() and paths["c"].exists()
+    assert not paths["b"].exists()
+    assert cache.cached_path(origin.url("/b.csv")) is None
+
+
+def test_eviction_spares_recently_used_entries(origin):
+    for name in ("a", "b"):
+        origin.files[f"/{name}.csv"] = name.encode() * 100
+    paths = [cache.fetch(origin.url(f"/{name}.csv")) for name in ("a", "b")]
+
+    # Entrées utilisées à l'instant : un autre processus peut être en train de les lire
+    cache.evict(max_bytes=0)
+
+    assert all(path.exists() for path in paths)